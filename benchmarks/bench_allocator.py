@@ -0,0 +1,85 @@
+"""Benchmark the best-available seat allocator on a fragmented hall.
+
+Usage: python benchmarks/bench_allocator.py [fill] [--rows R] [--cols C] [--budget US]
+
+Books a random fraction (default 0.6) of a 26x50 hall so free seats are
+scattered in short runs, then times best_available for group sizes 1-12
+and reports the median, 99th percentile and worst time per call in
+microseconds. The seats picked by each call are booked before the next
+one, as a kiosk would, so every call sees changed rows instead of
+answering from the free-run index; when the hall fills up a new one is
+generated. Calls are timed in CPU time of the benchmark thread, so time
+the process spends descheduled does not count. Exits with status 1 if
+the 99th percentile of any group size is over the budget (default
+1000 us).
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.allocator import best_available
+from utils.seat_map import SeatMap
+
+ROWS = 26
+COLS = 50
+REPEAT = 200
+BUDGET_US = 1000
+
+
+def fragmented_hall(rows, cols, fill, seed=7):
+    rng = random.Random(seed)
+    seat_map = SeatMap(rows, cols)
+    for row in range(rows):
+        for col in range(cols):
+            if rng.random() < fill:
+                seat_map.book(row, col)
+    return seat_map
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    args = sys.argv[1:]
+    rows = int(args[args.index('--rows') + 1]) if '--rows' in args else ROWS
+    cols = int(args[args.index('--cols') + 1]) if '--cols' in args else COLS
+    fill = float(args[0]) if args and not args[0].startswith('--') else 0.6
+    budget = float(args[args.index('--budget') + 1]) if '--budget' in args else BUDGET_US
+
+    seed = 7
+    seat_map = fragmented_hall(rows, cols, fill, seed)
+    print(f"Hall {rows}x{cols}, {seat_map.available} free seats ({fill:.0%} booked)")
+    print(f"{'Seats':>6} | {'Median (us)':>11} | {'p99 (us)':>10} | {'Worst (us)':>10} | Halls")
+    over = []
+    for n in range(1, 13):
+        timings = []
+        halls = 1
+        while len(timings) < REPEAT:
+            start = time.thread_time()
+            seats = best_available(seat_map, n)
+            timings.append(time.thread_time() - start)
+            if seats is None:
+                seed += 1
+                halls += 1
+                seat_map = fragmented_hall(rows, cols, fill, seed)
+                continue
+            seat_map.book_seats(seats)
+        p99 = percentile(timings, 0.99) * 1e6
+        print(f"{n:>6} | {percentile(timings, 0.5) * 1e6:>11.1f} | {p99:>10.1f} | "
+              f"{max(timings) * 1e6:>10.1f} | {halls}")
+        if p99 > budget:
+            over.append(n)
+
+    if over:
+        print(f"Over the {budget:.0f} us p99 budget for groups of {', '.join(map(str, over))}")
+        sys.exit(1)
+    print(f"p99 within the {budget:.0f} us budget")
+
+
+if __name__ == '__main__':
+    main()
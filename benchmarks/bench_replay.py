@@ -0,0 +1,151 @@
+"""Benchmark booking-history replay on a synthetic booking_details.csv.
+
+Usage: python benchmarks/bench_replay.py [rows] [--legacy]
+
+Generates a booking file with the given number of rows (default 1,000,000)
+in a temporary directory, then reports rows/sec for parsing the CSV and for
+replaying it into seat maps. --legacy also times the previous replay
+(ast.literal_eval, linear movie lookup, available_cols.index) on the same rows.
+"""
+import ast
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.replay import movie_id_index, replay_bookings
+from utils.seat_map import SeatMap
+from utils.storage import BOOKING_FIELDS
+
+SCREENS = 40
+ROWS = 26
+COLS = 26
+TIMINGS = ['9:30', '12:30', '15:30', '18:30', '21:30']
+
+
+def build_movies():
+    return {
+        i + 1: {'name': f'Movie {i + 1}', 'price': 150.0, 'screen_id': f'SC{i + 1}'}
+        for i in range(SCREENS)
+    }
+
+
+def build_hall():
+    hall_data = {}
+    for i in range(SCREENS):
+        hall_data[f'SC{i + 1}'] = {
+            'dimensions': {'rows': ROWS, 'cols': COLS},
+            'seating': {
+                time_slot: {
+                    'seat_map': SeatMap(ROWS, COLS),
+                    'booked_seats': {},
+                    'available_rows': [chr(65 + r) for r in range(ROWS)],
+                    'available_cols': [str(c) for c in range(COLS)]
+                }
+                for time_slot in TIMINGS
+            }
+        }
+    return hall_data
+
+
+def write_bookings(file_name, count):
+    rng = random.Random(42)
+    with open(file_name, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(BOOKING_FIELDS)
+        for _ in range(count):
+            screen = rng.randint(1, SCREENS)
+            seats = [f'{chr(65 + rng.randrange(ROWS))}{rng.randrange(COLS)}' for _ in range(rng.randint(1, 4))]
+            writer.writerow([
+                str(uuid.UUID(int=rng.getrandbits(128))), '2025-07-08', '12:00:00', 'User',
+                str(9000000000 + rng.randrange(100000)), f'SC{screen}', rng.choice(TIMINGS), str(seats),
+                f'Movie {screen}', screen, 150.0 * len(seats),
+                'booked' if rng.random() < 0.9 else 'cancelled', ''
+            ])
+
+
+def legacy_replay(rows, hall_data, movie_list):
+    for row in rows:
+        if len(row) < 9 or row.get('Ticket_Status', '').lower() != 'booked':
+            continue
+        seats_str = row.get('Seat_Numbers', '[]')
+        try:
+            seats = ast.literal_eval(seats_str) if seats_str.startswith('[') else [seats_str]
+        except Exception:
+            continue
+        timing_data = hall_data.get(row['ScreenID'], {}).get('seating', {}).get(row['Show_Timing'])
+        if timing_data is None:
+            continue
+        movie_id = None
+        for mid, movie in movie_list.items():
+            if movie['name'] == row['Movie_Name']:
+                movie_id = mid
+                break
+        if not movie_id:
+            continue
+        for seat in seats:
+            col_index = timing_data['available_cols'].index(seat[1:])
+            timing_data['seat_map'].book(ord(seat[0].upper()) - 65, col_index)
+            timing_data['booked_seats'][seat] = {
+                'user_name': row.get('UserName'),
+                'movie_id': movie_id,
+                'seat': seat,
+                'show_time': row['Show_Timing'],
+                'user_id': row.get('UID'),
+                'price_paid': float(row.get('Total_Price', 0)) / len(seats),
+                'screen_id': row['ScreenID'],
+                'booking_date': row.get('Date')
+            }
+
+
+def booked_seats(hall_data):
+    """Booked seats over every show, read from the SeatMap counters"""
+    return sum(
+        timing_data['seat_map'].booked
+        for screen_data in hall_data.values()
+        for timing_data in screen_data['seating'].values()
+    )
+
+
+def report(label, count, elapsed):
+    print(f"{label:<22} {elapsed:>8.2f}s  {count / elapsed:>12,.0f} rows/sec")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    count = int(args[0]) if args else 1000000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join(temp_dir, 'booking_details.csv')
+        print(f"Generating {count:,} bookings...")
+        write_bookings(file_name, count)
+        print(f"File size: {os.path.getsize(file_name):,} bytes\n")
+
+        start = time.perf_counter()
+        with open(file_name, 'r') as f:
+            rows = list(csv.DictReader(f))
+        report("CSV parse", count, time.perf_counter() - start)
+
+        movie_list = build_movies()
+        hall_data = build_hall()
+        history = []
+        start = time.perf_counter()
+        marked = replay_bookings(rows, hall_data, movie_id_index(movie_list), history=history)
+        report("Replay", count, time.perf_counter() - start)
+        print(f"{'Seats marked':<22} {marked:>8,}  ({booked_seats(hall_data):,} booked)")
+
+        if '--legacy' in sys.argv:
+            legacy_hall = build_hall()
+            start = time.perf_counter()
+            legacy_replay(rows, legacy_hall, movie_list)
+            report("Legacy replay", count, time.perf_counter() - start)
+            print(f"{'Legacy seats booked':<22} {booked_seats(legacy_hall):>8,}")
+
+
+if __name__ == '__main__':
+    main()
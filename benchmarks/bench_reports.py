@@ -0,0 +1,124 @@
+"""Benchmark the admin revenue and occupancy reports on synthetic data.
+
+Usage: python benchmarks/bench_reports.py [rows] [--legacy]
+
+Generates booking_details.csv with the given number of rows (default
+1,000,000), about a tenth of them cancelled, in a temporary directory, then
+times loading it into column arrays and building each report. --legacy also
+times grouping the same rows with csv.DictReader and Python dicts, and
+--rows times the load through csv.reader (storage.scan_bookings) instead of
+the array parser.
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from utils.catalog import Catalog
+from utils.reports import BOOKING_COLUMNS, Categories, Reports, load_columns
+from utils.storage import BOOKING_FIELDS, SCREEN_FIELDS, CsvStorage
+
+SCREENS = 40
+ROWS = 26
+COLS = 26
+DAYS = 365
+TIMINGS = ['09:30', '12:30', '15:30', '18:30', '21:30']
+
+
+def write_data(count):
+    rng = random.Random(42)
+    start = date(2025, 1, 1)
+    days = [(start + timedelta(days=offset)).isoformat() for offset in range(DAYS)]
+    with open('csvs/screens.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(SCREEN_FIELDS)
+        for i in range(SCREENS):
+            writer.writerow([f'SC{i + 1}', ROWS, COLS, '2025-01-01', 'Active', ';'.join(TIMINGS)])
+
+    with open('csvs/booking_details.csv', 'w', newline='') as bookings:
+        booking_writer = csv.writer(bookings)
+        booking_writer.writerow(BOOKING_FIELDS)
+        for number in range(count):
+            screen = rng.randint(1, SCREENS)
+            day = rng.choice(days)
+            seats = [f'{chr(65 + rng.randrange(ROWS))}{rng.randrange(COLS)}' for _ in range(rng.randint(1, 4))]
+            price = 150.0 * len(seats)
+            cancelled = rng.random() < 0.1
+            uid = str(9000000000 + rng.randrange(100000))
+            booking_writer.writerow([
+                f'B{number}', day, '12:00:00', 'User', uid, f'SC{screen}', f'{day} {rng.choice(TIMINGS)}',
+                str(seats), f'Movie {screen}', screen, price, 'cancelled' if cancelled else 'booked',
+                day if cancelled else ''
+            ])
+
+
+def legacy_reports():
+    revenue = {}
+    occupancy = {}
+    with open('csvs/booking_details.csv', 'r') as f:
+        for row in csv.DictReader(f):
+            key = (row['Date'], row['Movie_Name'])
+            revenue[key] = revenue.get(key, 0.0) + float(row['Total_Price'])
+            if row['Ticket_Status'].lower() == 'booked':
+                key = (row['ScreenID'], row['Show_Timing'])
+                occupancy[key] = occupancy.get(key, 0) + row['Seat_Numbers'].count(',') + 1
+            elif row['Ticket_Status'].lower() == 'cancelled':
+                key = (row['Cancellation_Date'] or row['Date'], row['Movie_Name'])
+                revenue[key] = revenue.get(key, 0.0) - float(row['Total_Price'])
+    return revenue, occupancy
+
+
+def report(label, count, elapsed):
+    print(f"{label:<22} {elapsed:>8.2f}s  {count / elapsed:>12,.0f} rows/sec")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    count = int(args[0]) if args else 1000000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        os.makedirs('csvs')
+        print(f"Generating {count:,} bookings...")
+        write_data(count)
+        print(f"File size: {os.path.getsize('csvs/booking_details.csv'):,} bytes\n")
+
+        storage = CsvStorage()
+        start = time.perf_counter()
+        reports = Reports(storage, Catalog(storage)).load()
+        report("Load columns", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        revenue = reports.revenue_by_movie_day()
+        report("Revenue per movie/day", count, time.perf_counter() - start)
+        start = time.perf_counter()
+        occupancy = reports.occupancy_by_show()
+        report("Occupancy per show", count, time.perf_counter() - start)
+        start = time.perf_counter()
+        reports.cancellation_by_movie()
+        report("Cancellations", count, time.perf_counter() - start)
+        print(f"{'Groups':<22} {len(revenue):>8,} revenue, {len(occupancy):,} shows")
+
+        if '--rows' in sys.argv:
+            start = time.perf_counter()
+            kinds = [('category', Categories()) for _ in BOOKING_COLUMNS]
+            kinds[4] = ('seats', None)
+            kinds[5] = ('float', None)
+            load_columns(storage.scan_bookings(BOOKING_COLUMNS), kinds)
+            report("Load through csv", count, time.perf_counter() - start)
+
+        if '--legacy' in sys.argv:
+            start = time.perf_counter()
+            legacy_reports()
+            report("Legacy reports", count, time.perf_counter() - start)
+        os.chdir(ROOT)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,33 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.login import Login
 
+def parse_endpoint(args):
+    """Read --port/--socket from the command line; returns (port, socket_path)"""
+    port = 8765
+    socket_path = None
+    if '--port' in args:
+        port = int(args[args.index('--port') + 1])
+    if '--socket' in args:
+        socket_path = args[args.index('--socket') + 1]
+    return port, socket_path
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from utils.server import run_server
+        port, socket_path = parse_endpoint(sys.argv[2:])
+        run_server(port=port, socket_path=socket_path)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'archive':
+        from utils.theatre import Theatre
+        archived, removed = Theatre(Login()).archive_finished_shows()
+        print(f"Archived {archived} bookings and removed {removed} seat rows of finished shows")
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'client':
+        from utils.client import run_client
+        port, socket_path = parse_endpoint(sys.argv[2:])
+        run_client(port=port, socket_path=socket_path)
+        return
+
     print("Welcome to Theater Booking System")
     login_system = Login()
     
@@ -18,6 +44,8 @@ def main():
         elif choice == '2':
             login_system.sign_in()
         elif choice == '3':
+            login_system.booking_log.sync()
+            login_system.booking_log.wallet.snapshot()
             print("Thank you for using our system!")
             break
         else:
@@ -0,0 +1,41 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SEED_FILES = [
+    'booking_details.csv', 'hall_data.csv', 'login_details.csv', 'movies.csv',
+    'screens.csv', 'user_wallets.csv', 'wallet_history.csv', 'bookings',
+]
+
+UID = '9014150918'
+
+
+def seed(path):
+    """Copy the sample csvs/ data into path"""
+    os.makedirs(path / 'csvs')
+    for name in SEED_FILES:
+        source = os.path.join(ROOT, 'csvs', name)
+        if os.path.isdir(source):
+            shutil.copytree(source, path / 'csvs' / name)
+        else:
+            shutil.copy(source, path / 'csvs' / name)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test in a fresh copy of the sample csvs/ data, as the app would from the repo root"""
+    seed(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def backend(request, workdir, monkeypatch):
+    """Both storage backends, selected the way the app does it"""
+    monkeypatch.setenv('TICKET_STORAGE', request.param)
+    return request.param
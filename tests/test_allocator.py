@@ -0,0 +1,34 @@
+from utils.allocator import best_available
+from utils.seat_map import COUNTER, SeatMap, row_runs
+
+
+def test_group_is_seated_together_in_the_middle():
+    assert best_available(SeatMap(5, 9), 3) == ['C3', 'C4', 'C5']
+
+
+def test_blocked_seats_are_skipped():
+    seats = best_available(SeatMap(5, 9), 3, blocked=['C4', 'Z1', 'bad'])
+    assert 'C4' not in seats and len({seat[0] for seat in seats}) == 1
+
+
+def test_group_that_fits_no_row_is_split_over_nearby_rows():
+    seat_map = SeatMap(3, 6)
+    for row in range(3):
+        for col in (2, 3, 4, 5):
+            seat_map.book(row, col)
+    assert sorted(best_available(seat_map, 4)) == ['A0', 'A1', 'B0', 'B1']
+    assert best_available(seat_map, 7) is None
+
+
+def test_run_index_follows_changes_from_this_and_other_maps():
+    seats = bytearray(4 * 6)
+    counter = bytearray(COUNTER.size)
+    kiosk1 = SeatMap.over(memoryview(seats), 4, 6, counter)
+    kiosk2 = SeatMap.over(memoryview(seats), 4, 6, counter)
+    kiosk1.free_runs()
+
+    kiosk1.book_seats(['A1', 'B2'])
+    kiosk2.book_seat('C3')
+    kiosk1.free_seat('B2')
+    assert kiosk1.free_runs() == [row_runs(kiosk1.row(row)) for row in range(4)]
+    assert kiosk1.free_runs()[2] == (3, ((0, 3), (4, 2)))
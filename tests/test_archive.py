@@ -0,0 +1,34 @@
+import csv
+
+from utils.login import Login
+from utils.storage import BookingArchive
+from utils.theatre import Theatre
+
+from conftest import UID
+
+
+def test_user_name_is_remembered_after_archiving(backend):
+    login = Login()
+    name = login.user_names[UID]
+    archived, _ = Theatre(login).archive_finished_shows()
+
+    restarted = Login()
+    assert archived and UID not in restarted.snapshot.user_names
+    assert restarted.user_names[UID] == name
+
+
+def test_archive_index_without_names_is_read_and_upgraded(workdir):
+    archive = BookingArchive()
+    archive.add([{'BookingID': 'old', 'UID': '1', 'UserName': 'Asha', 'Date': '2025-01-01', 'Show_Timing': '2025-01-01 09:30'}])
+    with open(archive.index_file, 'w', newline='') as f:
+        csv.writer(f).writerows([['BookingID', 'UID', 'Partition'], ['old', '1', '2025-01-01']])
+
+    archive = BookingArchive()
+    assert archive.user_names() == {'1': 'Asha'}
+    archive.add([{'BookingID': 'new', 'UID': '2', 'UserName': 'Ravi', 'Date': '2025-01-02', 'Show_Timing': '2025-01-02 09:30'}])
+
+    archive = BookingArchive()
+    assert archive.user_names() == {'1': 'Asha', '2': 'Ravi'}
+    assert archive.get('old')['UserName'] == 'Asha'
+    with open(archive.index_file, 'r', newline='') as f:
+        assert next(csv.reader(f)) == ['BookingID', 'UID', 'UserName', 'Partition']
@@ -0,0 +1,80 @@
+import pytest
+
+from utils.login import Login
+from utils.service import BookingService
+
+from conftest import UID
+
+OTHER_UID = '9440510262'
+
+
+def _shows(kiosk):
+    return kiosk.list_movies()[0]['timings'][-2:]
+
+
+def _booked(kiosk, show_time, seats):
+    seat_map = kiosk.theatre.show_data('SC9', show_time)['seat_map']
+    return [seat for seat in seats if seat_map.is_seat_booked(seat)]
+
+
+def test_batch_books_every_line_with_one_debit(backend):
+    kiosk = BookingService()
+    first, second = _shows(kiosk)
+    before = kiosk.login.check_balance(UID)
+
+    result = kiosk.book_batch(UID, [
+        {'movie_id': 12, 'show_time': first, 'seats': ['a1', 'A2']},
+        {'movie_id': 12, 'show_time': second, 'count': 3},
+    ])
+    kiosk.sync()
+
+    assert [len(booking['seats']) for booking in result['bookings']] == [2, 3]
+    assert result['balance'] == before - 1500
+    assert _booked(kiosk, first, ['A1', 'A2']) == ['A1', 'A2']
+    assert len(_booked(kiosk, second, result['bookings'][1]['seats'])) == 3
+    assert Login().check_balance(UID) == before - 1500
+    history = kiosk.login.storage.wallet_history(UID)
+    assert [row['Description'] for row in history].count('Batch purchase (2 bookings)') == 1
+
+
+@pytest.mark.parametrize('bad_line', [
+    {'movie_id': 12, 'seats': ['A1']},
+    {'movie_id': 12, 'seats': ['Z9']},
+    {'movie_id': 12, 'seats': ['B1', 'B1']},
+    {'movie_id': 12, 'count': 0},
+    {'movie_id': 12, 'count': 26},
+    {'movie_id': 999, 'seats': ['B2']},
+])
+def test_batch_with_a_bad_line_changes_nothing(backend, bad_line):
+    kiosk = BookingService()
+    first, second = _shows(kiosk)
+    kiosk.book(UID, 12, second, ['A1'])
+    kiosk.sync()
+    before = kiosk.login.check_balance(UID)
+    bookings = len(kiosk.login.storage.list_bookings())
+
+    with pytest.raises(ValueError):
+        kiosk.book_batch(UID, [
+            {'movie_id': 12, 'show_time': first, 'seats': ['C1', 'C2']},
+            dict(bad_line, show_time=second),
+        ])
+    kiosk.sync()
+
+    assert _booked(kiosk, first, ['C1', 'C2']) == []
+    assert Login().check_balance(UID) == before
+    assert len(kiosk.login.storage.list_bookings()) == bookings
+
+
+def test_batch_is_refused_without_enough_balance_or_over_a_held_seat(backend):
+    kiosk = BookingService()
+    first, second = _shows(kiosk)
+    kiosk.hold(OTHER_UID, 12, second, ['D1'])
+    before = kiosk.login.check_balance(UID)
+
+    with pytest.raises(ValueError):
+        kiosk.book_batch(UID, [{'movie_id': 12, 'show_time': second, 'seats': ['D0', 'D1']}])
+    with pytest.raises(ValueError):
+        kiosk.book_batch(UID, [{'movie_id': 12, 'show_time': first, 'count': 14}])
+
+    assert _booked(kiosk, second, ['D0']) == []
+    assert kiosk.login.check_balance(UID) == before
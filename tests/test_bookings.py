@@ -0,0 +1,103 @@
+import pytest
+
+import utils.theatre
+from utils.login import Login
+from utils.schedule import parse_show_key
+from utils.service import BookingService
+from utils.theatre import Theatre
+
+from conftest import UID
+
+
+def _book(service, seats):
+    show_time = service.list_movies()[0]['timings'][-1]
+    return service.book(UID, 12, show_time, seats)['booking_id']
+
+
+def test_booking_cancelled_by_another_kiosk_is_not_refunded_twice(backend):
+    kiosk1 = BookingService()
+    kiosk2 = BookingService()
+    booking_id = _book(kiosk1, ['A1'])
+    kiosk1.sync()
+    stale = next(b for b in kiosk2.bookings(UID) if b['booking_id'] == booking_id)
+    balance = kiosk1.login.check_balance(UID)
+
+    kiosk1.cancel(UID, booking_id)
+    kiosk1.sync()
+    with pytest.raises(ValueError):
+        kiosk2.cancel(UID, booking_id)
+    with pytest.raises(ValueError):
+        kiosk2.theatre._commit_cancellation(stale)
+
+    kiosk2.sync()
+    assert Login().check_balance(UID) == balance + 300
+
+
+def test_booking_from_another_kiosk_is_found_by_id(backend):
+    kiosk1 = BookingService()
+    kiosk2 = BookingService()
+    kiosk2.login.storage.get_booking('missing')
+    booking_id = _book(kiosk1, ['A2'])
+    kiosk1.sync()
+
+    assert kiosk2.login.storage.get_booking(booking_id)['Ticket_Status'] == 'booked'
+
+
+def test_date_is_loaded_from_its_own_bookings_and_hall_rows(backend):
+    kiosk1 = BookingService()
+    show_time = kiosk1.list_movies()[0]['timings'][-1]
+    booking_id = _book(kiosk1, ['B3'])
+    kiosk1.sync()
+
+    show_date = parse_show_key(show_time)[0]
+    storage = kiosk1.login.storage
+    assert booking_id in {row['BookingID'] for row in storage.list_bookings_date(show_date)}
+    assert storage.list_bookings_date(show_date) == [
+        row for row in storage.list_bookings() if row['Show_Timing'].startswith(f'{show_date.isoformat()} ')
+    ]
+    assert all(row[1].startswith(f'{show_date.isoformat()} ') for row in storage.load_hall_date(show_date))
+
+    theatre = Theatre(Login())
+    seat_map = theatre.show_data(kiosk1.theatre.movie_list[12]['screen_id'], show_time)['seat_map']
+    assert seat_map.is_seat_booked('B3')
+
+
+def test_replayed_release_does_not_free_a_seat_sold_again(backend):
+    kiosk1 = BookingService()
+    kiosk2 = BookingService()
+    show_time = kiosk1.list_movies()[0]['timings'][-1]
+    screen_id = kiosk1.theatre.movie_list[12]['screen_id']
+    kiosk1.cancel(UID, _book(kiosk1, ['D6']))
+    _book(kiosk2, ['D6'])
+
+    # A sync in a third process that read kiosk1's release before kiosk2 booked
+    kiosk3 = BookingService()
+    seat_map = kiosk3.theatre.show_data(screen_id, show_time)['seat_map']
+    kiosk3.theatre.apply_seat_changes([{'screen_id': screen_id, 'show_time': show_time, 'seats': ['D6'], 'release': True}])
+
+    assert seat_map.is_seat_booked('D6')
+    row = next(row for row in kiosk3.login.storage.load_hall_date(parse_show_key(show_time)[0])
+               if row[:3] == (screen_id, show_time, 'D'))
+    assert row[3].split(',')[6] == 'X'
+
+
+def test_cold_start_replays_each_booking_once(backend, monkeypatch):
+    kiosk = BookingService()
+    show_time = kiosk.list_movies()[0]['timings'][-1]
+    _book(kiosk, ['B4'])
+    kiosk.sync()
+
+    replayed = []
+
+    def counting_replay(rows, *args, **kwargs):
+        rows = list(rows)
+        replayed.extend(row['BookingID'] for row in rows)
+        return replay_bookings(rows, *args, **kwargs)
+
+    replay_bookings = utils.theatre.replay_bookings
+    monkeypatch.setattr(utils.theatre, 'replay_bookings', counting_replay)
+    theatre = Theatre(Login())
+    seat_map = theatre.show_data(kiosk.theatre.movie_list[12]['screen_id'], show_time)['seat_map']
+
+    assert seat_map.is_seat_booked('B4')
+    assert len(replayed) == len(set(replayed))
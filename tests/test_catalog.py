@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from utils.catalog import Catalog
+from utils.storage import get_storage
+
+SCREEN = {'ScreenID': 'SC99', 'Rows': '4', 'Columns': '4', 'LastMaintenance': '2026-10-18', 'Status': 'Active',
+          'Timings': '10:00'}
+
+
+class CountingStorage:
+    def __init__(self, storage):
+        self.storage = storage
+        self.reads = 0
+
+    def list_screens(self):
+        self.reads += 1
+        return self.storage.list_screens()
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+
+def test_catalog_is_read_once_while_storage_is_unchanged(backend):
+    storage = CountingStorage(get_storage())
+    catalog = Catalog(storage)
+
+    assert catalog.screen('SC9')['Rows'] == '5'
+    assert catalog.movie(12)['Title'] == 'Kubera'
+    catalog.screens()
+    catalog.screen_ids('active')
+    assert storage.reads == 1
+
+    edited = catalog.screens()
+    edited[0]['Rows'] = '99'
+    assert catalog.screens()[0]['Rows'] != '99'
+
+
+def test_change_from_another_process_is_picked_up(backend):
+    catalog = Catalog(get_storage())
+    assert catalog.screen('SC99') is None
+
+    get_storage().add_screen(SCREEN)
+    assert catalog.screen('SC99')['Timings'] == '10:00'
+
+
+def test_transaction_commits_every_staged_table(backend):
+    catalog = Catalog(get_storage())
+    with catalog.transaction() as change:
+        change.screens.append(SCREEN)
+        change.movies.append({'MovieID': '99', 'Title': 'New', 'ScreenID': 'SC99', 'Price': '250.0',
+                              'IsActive': 'Yes'})
+
+    assert catalog.screen('SC99') is not None
+    assert catalog.active_movie('SC99')['Title'] == 'New'
+    fresh = Catalog(get_storage())
+    assert fresh.screen('SC99') is not None and fresh.movie(99)['Title'] == 'New'
+
+
+def test_failed_transaction_leaves_the_catalog_as_it_was(backend):
+    storage = get_storage()
+    screens = storage.list_screens()
+    movies = storage.list_movies()
+    catalog = Catalog(storage)
+
+    with pytest.raises(RuntimeError):
+        with catalog.transaction() as change:
+            change.screens.append(SCREEN)
+            raise RuntimeError('admin aborted')
+    # A hall row that cannot be written fails the commit after screens and movies were staged
+    with pytest.raises(Exception):
+        with catalog.transaction() as change:
+            change.screens.append(SCREEN)
+            change.movies[0]['IsActive'] = 'Yes'
+            change.set_hall([None])
+
+    other = get_storage()
+    assert other.list_screens() == screens
+    assert other.list_movies() == movies
+    assert catalog.screen('SC99') is None
+    assert not [name for name in os.listdir('csvs') if name.endswith('.tmp')]
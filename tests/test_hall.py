@@ -0,0 +1,22 @@
+import threading
+
+from utils.storage import CsvStorage
+
+
+def test_concurrent_hall_updates_survive_compaction(workdir):
+    writers = [CsvStorage(), CsvStorage()]
+    for storage in writers:
+        storage.hall_compact_threshold = 7
+
+    def append(number, storage):
+        for index in range(60):
+            storage.update_hall_rows([(f'SCX{number}', f'2026-10-18 {index:02d}:00', 'A', 'O O X')])
+
+    threads = [threading.Thread(target=append, args=pair) for pair in enumerate(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    shows = {(row[0], row[1]) for row in CsvStorage().load_hall() if row[0].startswith('SCX')}
+    assert len(shows) == 120
@@ -0,0 +1,71 @@
+from utils.hall_snapshot import HEADER, read_hall_snapshot, write_hall_snapshot
+from utils.seat_map import SeatMap
+from utils.service import BookingService
+
+from conftest import UID
+
+TOKEN = (('csvs/hall_data.csv', 1, 2),)
+
+
+def _write(file_name):
+    seat_map = SeatMap(2, 3)
+    seat_map.book_seat('B2')
+    hall_data = {'SC1': {'dimensions': {'rows': 2, 'cols': 3}, 'seating': {'2026-10-18 09:30': {'seat_map': seat_map}}}}
+    movies = {'12': {'name': 'Kubera', 'price': 300.0, 'screen_id': 'SC1'}}
+    screens = {'SC1': {'rows': 2, 'columns': 3, 'timings': ['09:30']}}
+    write_hall_snapshot(file_name, TOKEN, movies, screens, hall_data)
+    return movies, screens
+
+
+def test_snapshot_round_trip(tmp_path):
+    file_name = tmp_path / 'hall_state.bin'
+    movies, screens = _write(file_name)
+
+    movie_list, loaded_screens, hall_data = read_hall_snapshot(file_name, TOKEN)
+    assert movie_list == movies and loaded_screens == screens
+    seat_map = hall_data['SC1']['seating']['2026-10-18 09:30']['seat_map']
+    assert seat_map.is_seat_booked('B2') and seat_map.booked == 1
+
+
+def test_corrupt_snapshot_is_rejected(tmp_path, capsys):
+    file_name = tmp_path / 'hall_state.bin'
+    _write(file_name)
+    data = bytearray(file_name.read_bytes())
+    data[-1] ^= 1
+    file_name.write_bytes(bytes(data))
+
+    assert read_hall_snapshot(file_name, TOKEN) is None
+    assert 'checksum mismatch' in capsys.readouterr().out
+
+
+def test_truncated_or_foreign_snapshot_is_rejected(tmp_path):
+    file_name = tmp_path / 'hall_state.bin'
+    assert read_hall_snapshot(file_name, TOKEN) is None
+
+    _write(file_name)
+    data = file_name.read_bytes()
+    file_name.write_bytes(data[:HEADER.size - 1])
+    assert read_hall_snapshot(file_name, TOKEN) is None
+
+    magic, version, checksum, meta_size = HEADER.unpack_from(data)
+    file_name.write_bytes(HEADER.pack(magic, version + 1, checksum, meta_size) + data[HEADER.size:])
+    assert read_hall_snapshot(file_name, TOKEN) is None
+
+
+def test_snapshot_of_other_storage_state_is_rejected(tmp_path):
+    file_name = tmp_path / 'hall_state.bin'
+    _write(file_name)
+
+    assert read_hall_snapshot(file_name, (('csvs/hall_data.csv', 1, 3),)) is None
+
+
+def test_checkpoint_goes_stale_once_storage_changes(backend):
+    kiosk = BookingService()
+    show_time = kiosk.list_movies()[0]['timings'][-1]
+    storage = kiosk.login.storage
+    kiosk.theatre.checkpoint()
+    assert read_hall_snapshot(kiosk.theatre.hall_snapshot_file, storage.state_token()) is not None
+
+    kiosk.book(UID, 12, show_time, ['E4'])
+    kiosk.sync()
+    assert read_hall_snapshot(kiosk.theatre.hall_snapshot_file, storage.state_token()) is None
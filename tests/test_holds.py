@@ -0,0 +1,83 @@
+import pytest
+
+from utils.holds import HoldTable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_seat_held_by_another_customer_is_refused(workdir):
+    clock = Clock()
+    kiosk1 = HoldTable(clock=clock)
+    kiosk2 = HoldTable(clock=clock)
+    kiosk1.hold('SC1', 'show', ['A1', 'A2'], 'alice')
+
+    with pytest.raises(ValueError):
+        kiosk2.hold('SC1', 'show', ['A2', 'A3'], 'bob')
+    with pytest.raises(ValueError):
+        kiosk2.check('SC1', 'show', ['A1'], 'bob')
+    kiosk2.check('SC1', 'show', ['A1'], 'alice')
+    assert kiosk2.held('SC1', 'show') == {'A1': 'alice', 'A2': 'alice'}
+
+
+def test_hold_expires_after_ttl(workdir):
+    clock = Clock()
+    kiosk1 = HoldTable(clock=clock, ttl=60)
+    kiosk2 = HoldTable(clock=clock, ttl=60)
+    kiosk1.hold('SC1', 'show', ['A1'], 'alice')
+
+    clock.now += 59
+    assert kiosk2.held('SC1', 'show') == {'A1': 'alice'}
+    clock.now += 1
+    assert kiosk2.held('SC1', 'show') == {}
+    kiosk2.hold('SC1', 'show', ['A1'], 'bob')
+    assert kiosk1.held('SC1', 'show') == {'A1': 'bob'}
+
+
+def test_extended_hold_does_not_expire_at_the_old_time(workdir):
+    clock = Clock()
+    holds = HoldTable(clock=clock, ttl=60)
+    holds.hold('SC1', 'show', ['A1'], 'alice')
+    clock.now += 30
+    holds.hold('SC1', 'show', ['A1'], 'alice')
+
+    clock.now += 40
+    assert HoldTable(clock=clock, ttl=60).held('SC1', 'show') == {'A1': 'alice'}
+
+
+def test_release_is_seen_by_other_processes(workdir):
+    clock = Clock()
+    kiosk1 = HoldTable(clock=clock)
+    kiosk2 = HoldTable(clock=clock)
+    kiosk1.hold('SC1', 'show', ['A1', 'A2'], 'alice')
+    assert kiosk2.held('SC1', 'show') == {'A1': 'alice', 'A2': 'alice'}
+
+    assert kiosk1.release('SC1', 'show', 'alice', ['A1']) == ['A1']
+    assert kiosk2.release('SC1', 'show', 'bob') == []
+    assert kiosk2.held('SC1', 'show') == {'A2': 'alice'}
+
+
+def test_journal_is_compacted_to_the_live_holds(workdir):
+    clock = Clock()
+    kiosk1 = HoldTable(clock=clock, ttl=60, compact_lines=10)
+    kiosk2 = HoldTable(clock=clock, ttl=60)
+    kiosk2.held('SC1', 'show')
+    for index in range(8):
+        kiosk1.hold('SC1', 'show', [f'B{index}'], 'alice')
+        kiosk1.release('SC1', 'show', 'alice')
+    kiosk1.hold('SC1', 'show', ['A1'], 'alice')
+
+    with open(kiosk1.file_name) as f:
+        assert len(f.readlines()) <= 10
+    assert kiosk2.held('SC1', 'show') == {'A1': 'alice'}
+
+    clock.now += 60
+    assert kiosk1.expire() == 1
+    with open(kiosk1.file_name) as f:
+        assert f.read() == ''
+    assert kiosk2.held('SC1', 'show') == {}
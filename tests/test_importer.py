@@ -0,0 +1,59 @@
+import csv
+
+from utils.importer import BookingImporter
+from utils.service import BookingService
+from utils.storage import BOOKING_FIELDS
+
+from conftest import UID
+
+
+def _row(booking_id, show_time, seats, status='booked', screen_id='SC9'):
+    return {
+        'BookingID': booking_id, 'Date': '2026-10-18', 'Time': '10:00:00', 'UserName': 'partner', 'UID': UID,
+        'ScreenID': screen_id, 'Show_Timing': show_time, 'Seat_Numbers': seats, 'Movie_Name': 'Kubera',
+        'Movie_ID': '12', 'Total_Price': '300.0', 'Ticket_Status': status, 'Cancellation_Date': ''
+    }
+
+
+def _write(file_name, rows):
+    with open(file_name, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=BOOKING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_import_keeps_good_rows_and_rejects_the_rest(backend, workdir):
+    kiosk = BookingService()
+    show_time = kiosk.list_movies()[0]['timings'][-1]
+    kiosk.book(UID, 12, show_time, ['A0'])
+    kiosk.sync()
+    _write(workdir / 'partner.csv', [
+        _row('p1', show_time, "['B1', 'B2']"),
+        _row('p1', show_time, "['B3']"),
+        _row('p2', show_time, "['A0']"),
+        _row('p3', show_time, "['B2']"),
+        _row('p4', show_time, "['Z9']"),
+        _row('p5', '2026-10-18 03:00', "['B4']"),
+        _row('', show_time, "['B4']"),
+        _row('p6', show_time, "['C1']", status='cancelled'),
+        _row('b77f2d17-8571-4a7c-8539-17f23f35ee31', show_time, "['C2']"),
+        _row('p7', show_time, "['C3']"),
+    ])
+
+    stats = BookingImporter(kiosk.theatre, chunk_size=3).run(str(workdir / 'partner.csv'))
+
+    assert stats['read'] == 10 and stats['imported'] == 3
+    assert stats['rejected'] == {'duplicate': 2, 'seat conflict': 2, 'invalid seat': 1, 'unknown show': 1, 'malformed': 1}
+    with open(stats['reject_file']) as f:
+        rejects = {row['Line']: row['Reason'].split(':')[0] for row in csv.DictReader(f)}
+    assert rejects == {
+        '3': 'duplicate', '4': 'seat conflict', '5': 'seat conflict', '6': 'invalid seat',
+        '7': 'unknown show', '8': 'malformed', '10': 'duplicate'
+    }
+
+    storage = kiosk.login.storage
+    assert storage.get_booking('p1')['Seat_Numbers'] == "['B1', 'B2']"
+    assert storage.get_booking('p6')['Ticket_Status'] == 'cancelled'
+    assert storage.get_booking('p3') is None
+    seat_map = BookingService().theatre.show_data('SC9', show_time)['seat_map']
+    assert [seat for seat in ('B1', 'B2', 'B3', 'C1', 'C2', 'C3') if seat_map.is_seat_booked(seat)] == ['B1', 'B2', 'C3']
@@ -0,0 +1,170 @@
+import os
+import threading
+
+import pytest
+
+from utils.login import Login
+from utils.service import BookingService
+
+from conftest import UID, seed
+
+
+def _show(service):
+    return service.list_movies()[0]['timings'][-1]
+
+
+def _seat(service, seat):
+    availability = service.availability(12, _show(service))
+    row = availability['row_labels'].index(seat[0])
+    col = availability['col_labels'].index(seat[1:])
+    return availability['rows'][row][col]
+
+
+@pytest.mark.parametrize('lose_inventory', [False, True])
+def test_booking_survives_a_restart(backend, lose_inventory):
+    kiosk = BookingService()
+    booking = kiosk.book(UID, 12, _show(kiosk), ['D4'])
+    # No sync: the process goes away with the booking only in the log
+    del kiosk
+    if lose_inventory:
+        os.remove('csvs/seat_inventory.bin')
+
+    restarted = BookingService()
+    assert _seat(restarted, 'D4') == 'X'
+    assert booking['booking_id'] in {b['booking_id'] for b in restarted.bookings(UID)}
+    assert restarted.balance(UID)['balance'] == booking['balance']
+
+    restarted.sync()
+    assert _seat(BookingService(), 'D4') == 'X'
+
+
+def test_seat_is_sold_once_across_kiosks(backend):
+    kiosks = [BookingService(), BookingService()]
+    show_time = _show(kiosks[0])
+    start = threading.Barrier(len(kiosks))
+    sold, refused = [], []
+
+    def book(kiosk):
+        start.wait()
+        try:
+            sold.append(kiosk.book(UID, 12, show_time, ['E5'])['booking_id'])
+        except ValueError:
+            refused.append(kiosk)
+
+    threads = [threading.Thread(target=book, args=(kiosk,)) for kiosk in kiosks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sold) == 1 and len(refused) == 1
+    owner = next(kiosk for kiosk in kiosks if kiosk not in refused)
+    balance = owner.balance(UID)['balance']
+
+    # Cancelling on one kiosk frees the seat for the other
+    owner.cancel(UID, sold[0])
+    assert _seat(refused[0], 'E5') == '.'
+    rebooked = refused[0].book(UID, 12, show_time, ['E5'])
+    with pytest.raises(ValueError):
+        owner.book(UID, 12, show_time, ['E5'])
+
+    for kiosk in kiosks:
+        kiosk.sync()
+    restarted = BookingService()
+    assert _seat(restarted, 'E5') == 'X'
+    on_seat = [b['booking_id'] for b in restarted.bookings(UID) if b['time'] == show_time and 'E5' in b['seats']]
+    assert on_seat == [rebooked['booking_id']]
+    assert restarted.balance(UID)['balance'] == balance
+
+
+def _session():
+    kiosk = BookingService()
+    show_time = _show(kiosk)
+    first = kiosk.book(UID, 12, show_time, ['F1', 'F2'])
+    kiosk.book(UID, 12, show_time, ['F3'])
+    kiosk.cancel(UID, first['booking_id'])
+    kiosk.sync()
+
+    restarted = BookingService()
+    bookings = sorted((b['time'], tuple(b['seats']), b['price']) for b in restarted.bookings(UID))
+    availability = restarted.availability(12, show_time)
+    return bookings, restarted.balance(UID)['balance'], availability['rows']
+
+
+def test_csv_and_sqlite_give_the_same_results(tmp_path, monkeypatch):
+    results = {}
+    for name in ['csv', 'sqlite']:
+        seed(tmp_path / name)
+        monkeypatch.chdir(tmp_path / name)
+        monkeypatch.setenv('TICKET_STORAGE', name)
+        results[name] = _session()
+
+    assert results['csv'] == results['sqlite']
+    assert results['csv'][1] == 4045.0 - 300
+
+
+def _fail_after(obj, name):
+    """Make obj.name raise once, after it has done its work"""
+    original = getattr(obj, name)
+
+    def failing(*args, **kwargs):
+        setattr(obj, name, original)
+        original(*args, **kwargs)
+        raise OSError(f"{name} failed")
+
+    setattr(obj, name, failing)
+
+
+def _purchases(storage):
+    return [row for row in storage.wallet_history(UID) if float(row['Amount']) == -300]
+
+
+@pytest.mark.parametrize('step', ['bookings', 'wallet', 'seats'])
+def test_sync_that_failed_part_way_is_not_applied_twice(backend, step):
+    kiosk = BookingService()
+    booking_log = kiosk.login.booking_log
+    storage = kiosk.login.storage
+    purchases = len(_purchases(storage))
+    booking = kiosk.book(UID, 12, _show(kiosk), ['G2'])
+
+    target = {'bookings': (storage, 'append_bookings'), 'wallet': (booking_log.wallet, 'record'),
+              'seats': (booking_log, '_apply_seat_changes')}[step]
+    _fail_after(*target)
+    with pytest.raises(OSError):
+        booking_log.sync()
+
+    restarted = BookingService()
+    restarted.sync()
+    storage = restarted.login.storage
+    assert [row['BookingID'] for row in storage.list_bookings()].count(booking['booking_id']) == 1
+    assert [row['BookingID'] for row in storage.user_bookings(UID)].count(booking['booking_id']) == 1
+    assert len(_purchases(storage)) == purchases + 1
+    assert restarted.balance(UID)['balance'] == booking['balance']
+    assert Login().check_balance(UID) == booking['balance']
+
+
+def test_ledger_rows_written_before_a_failure_are_not_kept_twice(workdir):
+    kiosk = BookingService()
+    storage = kiosk.login.storage
+    ledger_rows = len(storage._read_rows(storage.wallet_history_file))
+    purchases = len(_purchases(storage))
+    booking = kiosk.book(UID, 12, _show(kiosk), ['G3'])
+
+    append_rows = storage._append_rows
+
+    def fail_on_user_file(file_name, rows, fieldnames):
+        if file_name.endswith('_wallet.csv'):
+            raise OSError("disk full")
+        append_rows(file_name, rows, fieldnames)
+
+    storage._append_rows = fail_on_user_file
+    with pytest.raises(OSError):
+        kiosk.login.booking_log.sync()
+    del storage._append_rows
+
+    restarted = BookingService()
+    restarted.sync()
+    storage = restarted.login.storage
+    assert len(storage._read_rows(storage.wallet_history_file)) == ledger_rows + 1
+    assert len(_purchases(storage)) == purchases + 1
+    assert restarted.balance(UID)['balance'] == booking['balance']
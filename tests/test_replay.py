@@ -0,0 +1,50 @@
+from utils.replay import movie_id_index, replay_bookings
+from utils.seat_map import SeatMap, parse_seat_list
+
+
+def _hall():
+    return {'SC1': {'seating': {'2026-10-18 09:30': {'seat_map': SeatMap(3, 4), 'booked_seats': {}}}}}
+
+
+def _row(seats, status='booked', movie='Kubera', show_time='2026-10-18 09:30', price='600.0'):
+    return {
+        'BookingID': 'b1', 'Date': '2026-10-17', 'Time': '10:00:00', 'UserName': 'karthik', 'UID': '9014150918',
+        'ScreenID': 'SC1', 'Show_Timing': show_time, 'Seat_Numbers': seats, 'Movie_Name': movie, 'Movie_ID': '12',
+        'Total_Price': price, 'Ticket_Status': status, 'Cancellation_Date': ''
+    }
+
+
+def test_seat_list_parser():
+    assert parse_seat_list("['A3', 'B5']") == ['A3', 'B5']
+    assert parse_seat_list('["A3"]') == ['A3']
+    assert parse_seat_list(' A3 ') == ['A3']
+    assert parse_seat_list('[]') == []
+    assert parse_seat_list("['A3', B5]") is None
+    assert parse_seat_list("['A3'") is None
+
+
+def test_first_listed_movie_wins_a_repeated_title():
+    movies = {'3': {'name': 'Kubera'}, '12': {'name': 'Kubera'}, '5': {'name': 'Opera'}}
+    assert movie_id_index(movies) == {'Kubera': '3', 'Opera': '5'}
+
+
+def test_only_active_bookings_of_known_shows_are_marked():
+    hall = _hall()
+    history = []
+    rows = [
+        _row("['A1', 'B2']"),
+        _row("['A2']", status='cancelled'),
+        _row("['A3']", movie='Unknown'),
+        _row("['A0', B1]"),
+        _row("['C0']", show_time='2026-10-18 12:30'),
+        _row("['C3', 'Z9']", price='300.0'),
+        {'BookingID': 'short'},
+    ]
+
+    assert replay_bookings(rows, hall, {'Kubera': '12'}, history=history) == 3
+    show = hall['SC1']['seating']['2026-10-18 09:30']
+    assert [seat for seat in ('A1', 'B2', 'A2', 'A3', 'A0', 'C3') if show['seat_map'].is_seat_booked(seat)] == \
+        ['A1', 'B2', 'C3']
+    assert show['booked_seats']['A1']['price_paid'] == 300.0
+    assert show['booked_seats']['B2']['movie_id'] == '12'
+    assert len(history) == 6
@@ -0,0 +1,76 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from utils.catalog import Catalog
+from utils.reports import BOOKING_COLUMNS, Categories, Reports, load_columns, read_csv_columns
+from utils.service import BookingService
+from utils.storage import BOOKING_FIELDS, _scan_rows, get_storage
+
+from conftest import UID
+
+
+def _kinds():
+    dates = Categories()
+    kinds = [('category', dates)] + [('category', Categories()) for _ in range(3)]
+    return kinds + [('seats', None), ('float', None), ('category', Categories()), ('category', dates)]
+
+
+def _decode(columns, kinds):
+    values = [
+        [categories.labels()[code] for code in column.tolist()] if kind == 'category' else column.tolist()
+        for column, (kind, categories) in zip(columns, kinds)
+    ]
+    return list(zip(*values))
+
+
+def _bookings_csv():
+    f = io.StringIO(newline='')
+    writer = csv.writer(f)
+    writer.writerow(BOOKING_FIELDS)
+    titles = ['Kubera', 'Movie, The', 'Say "Hi"', 'Ünï']
+    for number in range(400):
+        seats = [f'A{col}' for col in range(number % 4)]
+        writer.writerow([
+            f'B{number}', f'2025-01-0{number % 3 + 1}', '12:00:00', 'User', UID, f'SC{number % 5}',
+            f'2025-01-0{number % 3 + 1} 09:30', str(seats), titles[number % 4], number % 4,
+            150.0 * len(seats) if number % 17 else 'n/a', 'booked' if number % 7 else 'cancelled',
+            '' if number % 7 else '2025-01-05'
+        ])
+        if number == 350:
+            f.write('\r\n')
+    return f.getvalue().encode('utf-8')
+
+
+@pytest.mark.parametrize('block_size', [200, 1 << 20])
+def test_array_reader_matches_the_csv_module(block_size):
+    data = _bookings_csv()
+    statuses = {'B3': {'Ticket_Status': 'cancelled', 'Cancellation_Date': '2025-02-01'}}
+    skip = {'B4', 'B399'}
+
+    rows_kinds = _kinds()
+    rows = load_columns(_scan_rows(io.StringIO(data.decode('utf-8'), newline=''), BOOKING_COLUMNS, statuses, skip),
+                        rows_kinds)
+    array_kinds = _kinds()
+    arrays = read_csv_columns(io.BytesIO(data), BOOKING_COLUMNS, array_kinds, statuses, skip, block_size=block_size)
+
+    assert _decode(arrays, array_kinds) == _decode(rows, rows_kinds)
+    assert len(arrays[0]) == 398
+
+
+def test_refunds_come_from_cancelled_bookings(backend):
+    service = BookingService()
+    show_time = service.list_movies()[0]['timings'][-1]
+    booking_id = service.book(UID, 12, show_time, ['C1'])['booking_id']
+    service.cancel(UID, booking_id)
+    service.sync()
+
+    storage = get_storage()
+    reports = Reports(storage, Catalog(storage)).load()
+    today = date.today().isoformat()
+    assert (today, 'Kubera', 1, 300.0, 300.0, 0.0) in reports.revenue_by_movie_day(today)
+    assert reports.cancellation_by_movie(today) == [('Kubera', 1, 1, 100.0, 300.0)]
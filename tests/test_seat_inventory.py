@@ -0,0 +1,60 @@
+import os
+import warnings
+
+from utils.seat_inventory import SeatInventory
+from utils.seat_map import SeatMap
+
+
+def _hall(*shows):
+    return {'SC1': {'seating': {show: {'seat_map': SeatMap(4, 5)} for show in shows}}}
+
+
+def test_adding_shows_keeps_seats_flipped_through_an_older_mapping(workdir):
+    kiosk1 = _hall('2026-10-18 09:30')
+    SeatInventory().attach(kiosk1)
+    inode = os.stat('csvs/seat_inventory.bin').st_ino
+    old_map = kiosk1['SC1']['seating']['2026-10-18 09:30']['seat_map']
+    old_map.book_seat('A1')
+
+    # Another kiosk loads a new date while kiosk1 keeps using its mapping
+    SeatInventory().attach(_hall('2026-10-18 09:30', '2026-10-19 09:30'))
+    old_map.book_seat('B2')
+
+    assert os.stat('csvs/seat_inventory.bin').st_ino == inode
+    reader = _hall('2026-10-18 09:30', '2026-10-19 09:30')
+    SeatInventory().attach(reader)
+    seat_map = reader['SC1']['seating']['2026-10-18 09:30']['seat_map']
+    assert seat_map.is_seat_booked('A1') and seat_map.is_seat_booked('B2')
+    assert seat_map.booked == 2
+
+
+def _open_files():
+    return len(os.listdir('/proc/self/fd'))
+
+
+def _mappings():
+    path = os.path.abspath('csvs/seat_inventory.bin')
+    with open('/proc/self/maps') as f:
+        return sum(path in line for line in f)
+
+
+def test_reattaching_does_not_leak_files_or_mappings(workdir):
+    hall = _hall('2026-10-18 09:30')
+    inventory = SeatInventory()
+    inventory.attach(hall)
+    files = _open_files()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        for index in range(20):
+            hall['SC1']['seating'][f'2026-10-{19 + index} 09:30'] = {'seat_map': SeatMap(4, 5)}
+            inventory.attach(hall)
+    assert not [warning for warning in caught if issubclass(warning.category, ResourceWarning)]
+    hall['SC1']['seating']['2026-10-18 09:30']['seat_map'].book_seat('A1')
+
+    assert _open_files() == files
+    assert _mappings() == 1
+
+    inventory.close()
+    del hall
+    assert _mappings() == 0
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.seat_map import SeatMap
+
+
+def test_booking_and_freeing_keep_counts_and_version():
+    seat_map = SeatMap(3, 4)
+    version = seat_map.version
+
+    assert seat_map.book_seat('B2')
+    assert not seat_map.book_seat('B2')
+    assert seat_map.is_seat_booked('B2') and not seat_map.is_seat_booked('B3')
+    assert (seat_map.booked, seat_map.available) == (1, 11)
+    assert seat_map.version != version
+
+    version = seat_map.version
+    assert seat_map.free_seat('B2')
+    assert not seat_map.free_seat('B2')
+    assert (seat_map.booked, seat_map.available) == (0, 12)
+    assert seat_map.version != version
+
+
+def test_seat_outside_the_hall_is_refused():
+    seat_map = SeatMap(2, 3)
+
+    with pytest.raises(IndexError):
+        seat_map.book_seat('C0')
+    with pytest.raises(IndexError):
+        seat_map.book_seat('A3')
+    assert seat_map.book_seats(['A1', 'A1', 'Z9', 'B', 'B2']) == (['A1', 'A1', 'B2'], 2)
+    assert seat_map.booked == 2
+
+
+def test_row_tokens_round_trip():
+    seat_map = SeatMap(2, 4)
+    seat_map.book_seats(['A0', 'A3', 'B1'])
+
+    assert seat_map.row_tokens(0) == 'X,0,0,X'
+    loaded = SeatMap(2, 4)
+    for row in range(2):
+        loaded.load_row_tokens(row, seat_map.row_tokens(row))
+    assert loaded.to_bytes() == seat_map.to_bytes()
+    assert loaded.booked == 3
+
+
+def test_copy_and_bytes_are_independent_of_the_original():
+    seat_map = SeatMap(2, 2)
+    seat_map.book_seat('A0')
+    copy = seat_map.copy()
+    restored = SeatMap.from_bytes(2, 2, seat_map.to_bytes())
+    seat_map.book_seat('B1')
+
+    assert copy.booked == 1 and not copy.is_seat_booked('B1')
+    assert restored.booked == 1 and restored.is_seat_booked('A0')
+
+    seat_map.reset()
+    assert seat_map.booked == 0 and copy.booked == 1
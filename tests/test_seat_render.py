@@ -0,0 +1,49 @@
+from utils.seat_map import SeatMap
+from utils.seat_render import SeatGridRenderer
+
+
+def _show(rows=2, cols=3):
+    return {
+        'seat_map': SeatMap(rows, cols),
+        'available_rows': [chr(65 + row) for row in range(rows)],
+        'available_cols': [str(col) for col in range(cols)]
+    }
+
+
+def test_grid_marks_booked_and_overlaid_seats():
+    show = _show()
+    show['seat_map'].book_seat('A1')
+
+    assert SeatGridRenderer().render('SC1', 'show', show, {'B2': 'H', 'Z9': 'H'}) == (
+        "    0  1  2\n"
+        "A:  .  X  .\n"
+        "B:  .  .  H\n"
+    )
+
+
+def test_cached_grid_is_rebuilt_only_when_the_show_changes():
+    renderer = SeatGridRenderer()
+    show = _show()
+    other = _show()
+    first = renderer.render('SC1', 'show', show)
+    renderer.render('SC1', 'other', other)
+
+    assert renderer.render('SC1', 'show', show) is first
+    assert renderer.hits == 1
+
+    show['seat_map'].book_seat('B0')
+    assert 'B:  X' in renderer.render('SC1', 'show', show)
+    assert renderer.render('SC1', 'other', other)
+    assert renderer.render('SC1', 'show', show, {'A0': 'O'}).startswith("    0  1  2\nA:  O")
+    assert (renderer.hits, renderer.misses) == (2, 4)
+
+
+def test_change_through_another_map_of_the_same_seats_invalidates_the_grid():
+    renderer = SeatGridRenderer()
+    shared = bytearray(6)
+    counter = bytearray(8)
+    show = dict(_show(), seat_map=SeatMap.over(memoryview(shared), 2, 3, counter))
+    renderer.render('SC1', 'show', show)
+
+    SeatMap.over(memoryview(shared), 2, 3, counter).book_seat('A2')
+    assert renderer.render('SC1', 'show', show).splitlines()[1] == "A:  .  .  X"
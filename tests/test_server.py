@@ -0,0 +1,49 @@
+import asyncio
+import json
+import threading
+
+from utils.server import BookingServer
+from utils.service import BookingService
+
+
+async def _exchange(server, lines):
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0, limit=server.line_limit)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    for line in lines:
+        writer.write(line + b'\n')
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return responses
+
+
+def test_overlong_line_gets_an_error_and_the_connection_keeps_working(workdir):
+    server = BookingServer(BookingService(), line_limit=1024)
+    long_line = json.dumps({'op': 'list_movies', 'pad': 'x' * 5000}).encode('utf-8')
+    responses = asyncio.run(_exchange(server, [long_line, b'{"op": "list_movies"}']))
+
+    assert responses[0] == {'ok': False, 'error': 'Request line longer than 1024 bytes'}
+    assert responses[1]['ok'] and responses[1]['result']
+
+
+def test_service_calls_run_off_the_event_loop_thread(workdir):
+    server = BookingServer(BookingService())
+    threads = []
+    server.dispatch = lambda session, request: threads.append(threading.current_thread()) or []
+    asyncio.run(_exchange(server, [b'{"op": "list_movies"}']))
+
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_sqlite_service_built_before_the_worker_thread(workdir, monkeypatch):
+    monkeypatch.setenv('TICKET_STORAGE', 'sqlite')
+    server = BookingServer(BookingService())
+    show_time = server.service.list_movies()[0]['timings'][-1]
+    request = json.dumps({'op': 'availability', 'movie_id': 12, 'show_time': show_time}).encode('utf-8')
+    responses = asyncio.run(_exchange(server, [request]))
+
+    assert responses[0]['ok'], responses[0]
@@ -0,0 +1,56 @@
+from utils.login import Login
+from utils.snapshot import StartupSnapshot
+from utils.storage import get_storage
+
+from conftest import UID
+
+
+class CountingStorage:
+    def __init__(self, storage):
+        self.storage = storage
+        self.calls = {}
+
+    def __getattr__(self, name):
+        method = getattr(self.storage, name)
+
+        def counted(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return method(*args, **kwargs)
+        return counted
+
+
+def test_each_table_is_read_once(backend):
+    storage = CountingStorage(get_storage())
+    snapshot = StartupSnapshot(storage)
+    assert 'list_bookings' not in storage.calls
+
+    assert snapshot.user_names[UID]
+    assert snapshot.bookings is snapshot.bookings
+    assert snapshot.users[UID][0] == UID
+    assert snapshot.screens_by_id['SC9']['Rows'] == '5'
+    for name in ('load_login_rows', 'list_screens', 'list_movies', 'list_bookings'):
+        assert storage.calls[name] == 1
+
+
+def test_snapshot_is_reused_until_storage_changes(backend):
+    login = Login()
+    snapshot = login.current_snapshot()
+    assert login.current_snapshot() is snapshot
+
+    other = get_storage()
+    other.add_screen({'ScreenID': 'SC99', 'Rows': '4', 'Columns': '4', 'LastMaintenance': '2026-10-18',
+                      'Status': 'Active', 'Timings': '10:00'})
+
+    reloaded = login.current_snapshot()
+    assert reloaded is not snapshot
+    assert 'SC99' in reloaded.screens_by_id
+
+
+def test_report_lists_every_table_read(workdir, capsys):
+    snapshot = StartupSnapshot(get_storage())
+    snapshot.bookings
+    snapshot.report()
+
+    out = capsys.readouterr().out
+    for name in ('login', 'screens', 'movies', 'bookings'):
+        assert f'\n{name} ' in out
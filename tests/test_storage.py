@@ -0,0 +1,40 @@
+from utils.storage import CsvStorage, SqliteStorage, get_storage
+
+from conftest import UID
+
+
+def _record(booking_id, seats="['C1']"):
+    return {
+        'BookingID': booking_id, 'Date': '2026-10-18', 'Time': '10:00:00', 'UserName': 'karthik',
+        'UID': UID, 'ScreenID': 'SC9', 'Show_Timing': '2026-10-19 16:00', 'Seat_Numbers': seats,
+        'Movie_Name': 'Kubera', 'Movie_ID': '12', 'Total_Price': '300.0', 'Ticket_Status': 'booked',
+        'Cancellation_Date': ''
+    }
+
+
+def test_sqlite_is_seeded_from_the_csv_files(workdir):
+    csv_storage = CsvStorage()
+    sqlite_storage = SqliteStorage()
+
+    assert sqlite_storage.list_screens() == csv_storage.list_screens()
+    assert sqlite_storage.list_movies() == csv_storage.list_movies()
+    assert sqlite_storage.get_screen('SC9') == csv_storage.get_screen('SC9')
+    assert sqlite_storage.get_screen('missing') is None
+    assert sqlite_storage.get_balance(UID) == csv_storage.get_balance(UID)
+    assert sorted(row['BookingID'] for row in sqlite_storage.user_bookings(UID)) == \
+        sorted(row['BookingID'] for row in csv_storage.user_bookings(UID))
+
+
+def test_booking_round_trip(backend):
+    storage = get_storage()
+    storage.append_bookings([_record('round-trip-1'), _record('round-trip-2', "['C2']")])
+
+    assert storage.get_booking('round-trip-1')['Seat_Numbers'] == "['C1']"
+    assert storage.get_booking('missing') is None
+    storage.update_booking_status('round-trip-1', UID, 'cancelled', '2026-10-18')
+
+    booking = get_storage().get_booking('round-trip-1')
+    assert (booking['Ticket_Status'], booking['Cancellation_Date']) == ('cancelled', '2026-10-18')
+    statuses = {row['BookingID']: row['Ticket_Status'] for row in get_storage().user_bookings(UID)}
+    assert statuses['round-trip-1'] == 'cancelled' and statuses['round-trip-2'] == 'booked'
+
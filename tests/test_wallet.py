@@ -0,0 +1,99 @@
+import os
+import threading
+
+from utils.login import Login
+from utils.storage import CsvStorage
+
+from conftest import UID
+
+
+def test_top_up_survives_restart(backend):
+    login = Login()
+    before = login.check_balance(UID)
+    login.add_to_wallet(UID, 500)
+    login.booking_log.sync()
+
+    assert Login().check_balance(UID) == before + 500
+    assert Login().check_balance(UID) == before + 500
+
+
+def test_unsynced_top_up_survives_restart(backend):
+    login = Login()
+    before = login.check_balance(UID)
+    login.add_to_wallet(UID, 500)
+
+    assert Login().check_balance(UID) == before + 500
+
+
+def test_restart_after_snapshot_replays_only_the_tail(backend):
+    login = Login()
+    before = login.check_balance(UID)
+    login.add_to_wallet(UID, 100)
+    login.booking_log.sync()
+    login.booking_log.wallet.snapshot()
+    login.add_to_wallet(UID, 50)
+    login.booking_log.sync()
+
+    assert Login().check_balance(UID) == before + 150
+
+
+def test_top_up_logged_by_another_kiosk_is_not_lost(backend):
+    from utils.service import BookingService
+
+    kiosk1 = Login()
+    kiosk2 = BookingService()
+    before = kiosk2.login.check_balance(UID)
+    kiosk1.add_to_wallet(UID, 500)
+    show_time = kiosk2.list_movies()[0]['timings'][-1]
+    kiosk2.book(UID, 12, show_time, ['A1'])
+    kiosk2.sync()
+
+    assert Login().check_balance(UID) == before + 500 - 300
+
+
+def test_cached_balance_sees_unsynced_event_from_another_kiosk(backend):
+    kiosk1 = Login()
+    kiosk2 = Login()
+    before = kiosk2.check_balance(UID)
+    assert kiosk2.check_balance(UID) == before
+    assert kiosk2.balance_cache_stats()['hits'] == 1
+
+    kiosk1.add_to_wallet(UID, 500)
+    assert kiosk2.check_balance(UID) == before + 500
+
+
+def test_own_top_up_keeps_the_balance_cache(backend):
+    login = Login()
+    before = login.check_balance(UID)
+    login.add_to_wallet(UID, 200)
+    login.add_to_wallet(UID, 100)
+    misses = login.balance_cache_stats()['misses']
+
+    assert login.check_balance(UID) == before + 300
+    assert login.balance_cache_stats()['misses'] == misses
+
+    Login().add_to_wallet(UID, 50)
+    assert login.check_balance(UID) == before + 350
+    assert login.balance_cache_stats()['misses'] == misses + 1
+
+
+def test_concurrent_first_reads_split_the_history_once(workdir):
+    expected = [row for row in CsvStorage()._read_rows('csvs/wallet_history.csv') if row['Username'] == UID]
+    results = []
+    errors = []
+
+    def read():
+        try:
+            results.append(CsvStorage().wallet_history(UID))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert results == [expected] * 6
+    assert sorted(name for name in os.listdir('csvs') if name.startswith('wallet_history')) == ['wallet_history', 'wallet_history.csv']
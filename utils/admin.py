@@ -1,11 +1,15 @@
 import csv
 import os
 from datetime import datetime
+from utils.importer import BookingImporter
+from utils.reports import Reports
 from utils.theatre import Theatre
 
 class Admin:
     def __init__(self, theatre_instance):
         self.theatre = theatre_instance
+        self.storage = theatre_instance.login.storage
+        self.catalog = theatre_instance.catalog
         self.screens_file = 'csvs/screens.csv'
         self.movies_file = 'csvs/movies.csv'
         self._initialize_files()
@@ -137,19 +141,28 @@ class Admin:
         
         timings_str = ';'.join(show_timings)
         
-        with open(self.screens_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                screen_id,
-                rows,
-                cols,
-                datetime.now().strftime('%Y-%m-%d'),
-                'Active',
-                timings_str
-            ])
+        is_new_screen = screen_id not in self.theatre.hall_data
+        self.theatre.add_screen_shows(screen_id, rows, cols, show_timings)
         
-        self._init_screen_seating(screen_id, rows, cols, show_timings)
-        self.theatre.save_hall_data() 
+        try:
+            with self.catalog.transaction() as change:
+                change.screens.append({
+                    'ScreenID': screen_id,
+                    'Rows': rows,
+                    'Columns': cols,
+                    'LastMaintenance': datetime.now().strftime('%Y-%m-%d'),
+                    'Status': 'Active',
+                    'Timings': timings_str
+                })
+                change.set_hall(self.theatre.hall_rows(full=True))
+        except Exception as e:
+            if is_new_screen:
+                self.theatre.remove_screen_shows(screen_id)
+            print(f"\nError adding screen: {str(e)}")
+            return
+        
+        self.theatre.mark_hall_saved()
+        self.theatre.attach_seat_inventory(rebuild=True)
         
         print(f"\nScreen {screen_id} added successfully with {rows}x{cols} seating")
         print(f"Show timings: {', '.join(show_timings)}")
@@ -159,11 +172,7 @@ class Admin:
         print("\n--- Remove Screen ---")
         self.view_screens()
         
-        available_screens = []
-        if os.path.exists(self.screens_file):
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                available_screens = [row['ScreenID'] for row in reader if row]
+        available_screens = self.catalog.screen_ids()
         
         if not available_screens:
             print("No screens available to remove.")
@@ -190,77 +199,33 @@ class Admin:
         try:
             refunded_bookings = []
             
-            screens = []
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
+            with self.catalog.transaction() as change:
+                for row in change.screens:
                     if row['ScreenID'] == screen_id:
                         row['Status'] = 'Inactive'
                         row['LastMaintenance'] = datetime.now().strftime('%Y-%m-%d')
-                    screens.append(row)
-            
-            with open(self.screens_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(screens)
-            
-            movies = []
-            if os.path.exists(self.movies_file):
-                with open(self.movies_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    fieldnames = reader.fieldnames
-                    for row in reader:
-                        if row['ScreenID'] == screen_id:
-                            row['IsActive'] = 'No'
-                        movies.append(row)
                 
-                with open(self.movies_file, 'w', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(movies)
+                for row in change.movies:
+                    if row['ScreenID'] == screen_id:
+                        row['IsActive'] = 'No'
+                
+                if screen_id in self.theatre.hall_data:
+                    change.set_hall(self.theatre.hall_rows(full=True, exclude=(screen_id,)))
             
-            if screen_id in self.theatre.hall_data:
-                del self.theatre.hall_data[screen_id]
-                self.theatre.save_hall_data()
+            had_seating = screen_id in self.theatre.hall_data
+            self.theatre.remove_screen_shows(screen_id)
+            if had_seating:
+                self.theatre.mark_hall_saved()
+                self.theatre.attach_seat_inventory(rebuild=True)
             
             self.theatre.movie_list = {k:v for k,v in self.theatre.movie_list.items() if v['screen_id'] != screen_id}
             
-            if screen_id in self.theatre.screens:
-                del self.theatre.screens[screen_id]
-            
             print(f"\nScreen {screen_id} and all the data realted to it have been removed successfully.")
         
         except Exception as e:
             print(f"\nError removing screen: {str(e)}")
 
 
-    def _init_screen_seating(self, screen_id, rows, cols, timings):
-        available_rows = [chr(65 + i) for i in range(rows)]
-        available_cols = [str(i) for i in range(cols)]
-        
-        if screen_id not in self.theatre.hall_data:
-            self.theatre.hall_data[screen_id] = {
-                'dimensions': {'rows': rows, 'cols': cols},
-                'seating': {}
-            }
-        
-        for time in timings:
-            alpha_dict = {row: [0]*cols for row in available_rows}
-            booked_seats = {}
-            
-            initial_booked = 0
-            for row in alpha_dict.values():
-                initial_booked += row.count('X')
-            
-            self.theatre.hall_data[screen_id]['seating'][time] = {
-                'alpha_dict': alpha_dict,
-                'booked_seats': booked_seats,
-                'ticket_count': rows * cols - initial_booked,
-                'available_rows': available_rows,
-                'available_cols': available_cols
-            }
-
     def view_screens(self, show_all=False):
         print("\n--- Theatre Screens ---")
         if show_all:
@@ -270,22 +235,14 @@ class Admin:
         
         screens = []
         try:
-            if os.path.exists(self.screens_file):
-                with open(self.screens_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    if reader.fieldnames:
-                        screens = [
-                            row for row in reader 
-                            if row and (show_all or row.get('Status', '').lower() == 'active')
-                        ]
+            screens = [
+                row for row in self.catalog.screens()
+                if show_all or row.get('Status', '').lower() == 'active'
+            ]
             
-            active_movies = {}
-            if os.path.exists(self.movies_file):
-                with open(self.movies_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get('IsActive', '').lower() == 'yes':
-                            active_movies[row['ScreenID']] = row['Title']
+            active_movies = {
+                screen_id: row['Title'] for screen_id, row in self.catalog.active_movie_by_screen.items()
+            }
         
         except Exception as e:
             print(f"Error reading data: {str(e)}")
@@ -358,11 +315,7 @@ class Admin:
             
             for show_time, timing_data in self.theatre.hall_data[screen_id]['seating'].items():
                 print(f"\n{show_time} Show:")
-                print("  ", " ".join(f"{col:>2}" for col in timing_data['available_cols']))
-                
-                for row_label in timing_data['available_rows']:
-                    seats = timing_data['alpha_dict'][row_label]
-                    print(f"{row_label}:", " ".join(' X' if seat == 'X' else ' .' for seat in seats))
+                self.theatre.seat_renderer.show(screen_id, show_time, timing_data)
 
         except ValueError:
             print("Please enter a valid number.")
@@ -381,14 +334,11 @@ class Admin:
                 print("Error: Title too long (max 100 characters).")
                 continue
                 
-            if os.path.exists(self.movies_file):
-                with open(self.movies_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row['Title'].lower() == title.lower() and row['IsActive'].lower() == 'yes':
-                            print(f"Error: Active movie '{row['Title']}' already exists (ID: {row['MovieID']}).")
-                            print("Please deactivate the existing movie first or choose a different title.")
-                            return
+            for row in self.catalog.movies():
+                if row['Title'].lower() == title.lower() and row['IsActive'].lower() == 'yes':
+                    print(f"Error: Active movie '{row['Title']}' already exists (ID: {row['MovieID']}).")
+                    print("Please deactivate the existing movie first or choose a different title.")
+                    return
             break
         
         while True:
@@ -406,14 +356,7 @@ class Admin:
             except ValueError:
                 print("Error: Please enter a valid number for the price.")
         
-        active_screens = []
-        if os.path.exists(self.screens_file):
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                active_screens = [
-                    row['ScreenID'] for row in reader 
-                    if row and row.get('Status', '').lower() == 'active'
-                ]
+        active_screens = self.catalog.screen_ids('active')
         
         if not active_screens:
             print("Error: No active screens available to assign movie.")
@@ -431,45 +374,28 @@ class Admin:
                 print(f"Error: Invalid screen ID. Please choose from active screens: {', '.join(active_screens)}")
                 continue
                 
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['ScreenID'] == screen_id and row.get('Status', '').lower() == 'maintenance':
-                        print(f"Error: Screen {screen_id} is under maintenance and cannot be assigned movies.")
-                        return
+            if self.catalog.screen_has_status(screen_id, 'maintenance'):
+                print(f"Error: Screen {screen_id} is under maintenance and cannot be assigned movies.")
+                return
             break
         
-        updated_movies = []
-        if os.path.exists(self.movies_file):
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
+        try:
+            with self.catalog.transaction() as change:
+                for row in change.movies:
                     if row['ScreenID'] == screen_id and row['IsActive'].lower() == 'yes':
                         row['IsActive'] = 'No'
                         print(f"Deactivated previous movie: {row['Title']} (ID: {row['MovieID']})")
-                    updated_movies.append(row)
-            
-            with open(self.movies_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(updated_movies)
-        
-        new_id = 1
-        if updated_movies:
-            existing_ids = [int(row['MovieID']) for row in updated_movies if row['MovieID'].isdigit()]
-            new_id = max(existing_ids) + 1 if existing_ids else 1
-        
-        try:
-            with open(self.movies_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    new_id,
-                    title,
-                    screen_id,
-                    price,
-                    'Yes'
-                ])
+                
+                existing_ids = [int(row['MovieID']) for row in change.movies if row['MovieID'].isdigit()]
+                new_id = max(existing_ids) + 1 if existing_ids else 1
+                
+                change.movies.append({
+                    'MovieID': new_id,
+                    'Title': title,
+                    'ScreenID': screen_id,
+                    'Price': price,
+                    'IsActive': 'Yes'
+                })
             
             self.theatre.movie_list[new_id] = {
                 'name': title,
@@ -498,37 +424,17 @@ class Admin:
                 print("Operation cancelled.")
                 return
                 
-            movie_exists = False
-            movie_active = False
-            screen_id = None
-            
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if int(row['MovieID']) == movie_id:
-                        movie_exists = True
-                        if row.get('IsActive', '').lower() == 'yes':
-                            movie_active = True
-                            screen_id = row['ScreenID']
-                        break
-            
-            if not movie_exists:
+            movie = self.catalog.movie(movie_id)
+            if movie is None:
                 print(f"Error: Movie ID {movie_id} not found.")
                 return
                 
-            if not movie_active:
+            if movie.get('IsActive', '').lower() != 'yes':
                 print(f"Error: Movie ID {movie_id} is already inactive.")
                 return
                 
-            screen_active = False
-            with open(self.screens_file, 'r') as f:
-                screen_reader = csv.DictReader(f)
-                for screen in screen_reader:
-                    if screen['ScreenID'] == screen_id and screen.get('Status', '').lower() == 'active':
-                        screen_active = True
-                        break
-            
-            if not screen_active:
+            screen_id = movie['ScreenID']
+            if not self.catalog.screen_has_status(screen_id, 'active'):
                 print(f"Error: Screen {screen_id} for this movie is not active.")
                 return
                 
@@ -537,20 +443,11 @@ class Admin:
                 print("Operation cancelled.")
                 return
                 
-            movies = []
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
-                    if int(row['MovieID']) == movie_id:
+            with self.catalog.transaction() as change:
+                for row in change.movies:
+                    if row['MovieID'].isdigit() and int(row['MovieID']) == movie_id:
                         row['IsActive'] = 'No'
                         print(f"Deactivating: {row['Title']} (Screen: {row['ScreenID']})")
-                    movies.append(row)
-            
-            with open(self.movies_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(movies)
             
             if movie_id in self.theatre.movie_list:
                 del self.theatre.movie_list[movie_id]
@@ -566,25 +463,20 @@ class Admin:
     def list_movies(self):
         print("\n--- Current Movies ---")
         try:
-            if not os.path.exists(self.movies_file):
+            movies = self.catalog.movies()
+            if not movies:
                 print("No movies found")
                 return
                 
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    print("No movies available")
-                    return
+            has_movies = False
+            for row in movies:
+                if row.get('IsActive', 'yes').lower() == 'yes':
+                    print(f"\nID: {row.get('MovieID', 'N/A')} | {row.get('Title', 'Untitled')}")
+                    print(f"Screen: {row.get('ScreenID', 'N/A')} | Price: ₹{row.get('Price', '0')}")
+                    has_movies = True
                     
-                has_movies = False
-                for row in reader:
-                    if row and row.get('IsActive', 'yes').lower() == 'yes':
-                        print(f"\nID: {row.get('MovieID', 'N/A')} | {row.get('Title', 'Untitled')}")
-                        print(f"Screen: {row.get('ScreenID', 'N/A')} | Price: ₹{row.get('Price', '0')}")
-                        has_movies = True
-                        
-                if not has_movies:
-                    print("No active movies found")
+            if not has_movies:
+                print("No active movies found")
                     
         except Exception as e:
             print(f"Error listing movies: {str(e)}")
@@ -592,11 +484,7 @@ class Admin:
     def screen_maintenance(self):
         self.view_screens(show_all=True)
         
-        available_screens = []
-        if os.path.exists(self.screens_file):
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                available_screens = [row['ScreenID'] for row in reader if row]
+        available_screens = self.catalog.screen_ids()
         
         if not available_screens:
             print("No screens available for maintenance.")
@@ -614,14 +502,12 @@ class Admin:
             
             break
         
-        screens = []
         status_changed = False
         new_status = None
+        movies_updated = False
         
-        with open(self.screens_file, 'r') as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames
-            for screen in reader:
+        with self.catalog.transaction() as change:
+            for screen in change.screens:
                 if screen['ScreenID'] == screen_id:
                     if screen['Status'].lower() == 'active':
                         screen['Status'] = 'Maintenance'
@@ -631,40 +517,22 @@ class Admin:
                         screen['Status'] = 'Active'
                         new_status = 'Active'
                     status_changed = True
-                screens.append(screen)
-        
-        if status_changed:
-            with open(self.screens_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(screens)
             
             if new_status == 'Maintenance':
-                movies = []
-                movies_updated = False
-                if os.path.exists(self.movies_file):
-                    with open(self.movies_file, 'r') as f:
-                        reader = csv.DictReader(f)
-                        fieldnames = reader.fieldnames
-                        for row in reader:
-                            if row['ScreenID'] == screen_id and row['IsActive'].lower() == 'yes':
-                                row['IsActive'] = 'No'
-                                print(f"Deactivating movie: {row['Title']} (MovieID: {row['MovieID']})")
-                                movies_updated = True
-                            movies.append(row)
-                    
-                    if movies_updated:
-                        with open(self.movies_file, 'w', newline='') as f:
-                            writer = csv.DictWriter(f, fieldnames=fieldnames)
-                            writer.writeheader()
-                            writer.writerows(movies)
-                        
-                        movies_to_remove = [
-                            movie_id for movie_id, movie_data in self.theatre.movie_list.items() 
-                            if movie_data['screen_id'] == screen_id
-                        ]
-                        for movie_id in movies_to_remove:
-                            del self.theatre.movie_list[movie_id]
+                for row in change.movies:
+                    if row['ScreenID'] == screen_id and row['IsActive'].lower() == 'yes':
+                        row['IsActive'] = 'No'
+                        print(f"Deactivating movie: {row['Title']} (MovieID: {row['MovieID']})")
+                        movies_updated = True
+        
+        if status_changed:
+            if movies_updated:
+                movies_to_remove = [
+                    movie_id for movie_id, movie_data in self.theatre.movie_list.items() 
+                    if movie_data['screen_id'] == screen_id
+                ]
+                for movie_id in movies_to_remove:
+                    del self.theatre.movie_list[movie_id]
             
             print(f"\nScreen {screen_id} status changed to {new_status}.")
             if new_status == 'Maintenance':
@@ -674,15 +542,7 @@ class Admin:
 
 
     def _get_active_screens(self):
-        active_screens = []
-        if os.path.exists(self.screens_file):
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                active_screens = [
-                    row['ScreenID'] for row in reader 
-                    if row and row.get('Status', '').lower() == 'active'
-                ]
-        return active_screens
+        return self.catalog.screen_ids('active')
 
     def _get_active_screens_with_movies(self):
         """Returns dict of {screen_id: movie_name} for active screens with movies"""
@@ -694,28 +554,22 @@ class Admin:
             if screen_id in active_screens:
                 screens[screen_id] = movie_data['name']
         
-        if os.path.exists(self.movies_file):
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if (row['ScreenID'] in active_screens and 
-                        row['IsActive'].lower() == 'yes' and 
-                        row['ScreenID'] not in screens):
-                        screens[row['ScreenID']] = row['Title']
+        for screen_id in active_screens:
+            row = self.catalog.active_movie(screen_id)
+            if row and screen_id not in screens:
+                screens[screen_id] = row['Title']
         
         return screens
 
-    def _get_screen_timings(self, screen_id):
-        """Get available timings for a screen from hall_data"""
-        if not hasattr(self.theatre, 'hall_data') or screen_id not in self.theatre.hall_data:
-            print(f"Error: Screen {screen_id} not found in theatre data")
-            return []
-        
-        if 'seating' not in self.theatre.hall_data[screen_id]:
-            print(f"Error: No seating data for screen {screen_id}")
+    def _get_screen_timings(self, screen_id, show_date):
+        """Show keys of a screen on one date from its schedule, with that date's seat maps loaded"""
+        timings = self.theatre.schedule.shows_on(screen_id, show_date)
+        if not timings:
+            print(f"Error: No shows scheduled for screen {screen_id}")
             return []
         
-        return list(self.theatre.hall_data[screen_id]['seating'].keys())
+        self.theatre.load_date(show_date)
+        return timings
 
     def reset_seats(self):
         """Main menu for seat reset operations"""
@@ -756,7 +610,11 @@ class Admin:
             if not screen_id:
                 return
                 
-            timings = self._get_screen_timings(screen_id)
+            show_date = self.theatre._select_show_date()
+            if not show_date:
+                return
+                
+            timings = self._get_screen_timings(screen_id, show_date)
             if not timings:
                 return
                 
@@ -789,10 +647,14 @@ class Admin:
                 
             movie_name = screens[screen_id]
             
-            if not self._confirm_action(f"reset ALL timings for Screen {screen_id} ({movie_name})"):
+            show_date = self.theatre._select_show_date()
+            if not show_date:
+                return
+                
+            if not self._confirm_action(f"reset ALL timings for Screen {screen_id} ({movie_name}) on {show_date}"):
                 return
                 
-            timings = self._get_screen_timings(screen_id)
+            timings = self._get_screen_timings(screen_id, show_date)
             if not timings:
                 return
                 
@@ -808,7 +670,11 @@ class Admin:
     def _reset_all_screens(self):
         """Reset all timings on all screens"""
         try:
-            if not self._confirm_action("reset ALL seats in ALL screens", warning=True):
+            show_date = self.theatre._select_show_date()
+            if not show_date:
+                return
+                
+            if not self._confirm_action(f"reset ALL seats in ALL screens on {show_date}", warning=True):
                 return
                 
             active_screens = self._get_active_screens()
@@ -817,13 +683,13 @@ class Admin:
                 return
                 
             for screen_id in active_screens:
-                timings = self._get_screen_timings(screen_id)
+                timings = self._get_screen_timings(screen_id, show_date)
                 if timings:
                     for timing in timings:
                         self._do_reset(screen_id, timing)
                         
             self.theatre.save_hall_data()
-            print("\n✓ All screens and timings have been reset")
+            print(f"\n✓ All screens and timings on {show_date} have been reset")
             
         except Exception as e:
             print(f"\nError during full reset: {str(e)}")
@@ -838,13 +704,11 @@ class Admin:
                 raise ValueError(f"Timing {timing} not found for screen {screen_id}")
                 
             seating_data = self.theatre.hall_data[screen_id]['seating'][timing]
-            rows = self.theatre.hall_data[screen_id]['dimensions']['rows']
-            cols = self.theatre.hall_data[screen_id]['dimensions']['cols']
             
             # Reset all seats to available (0)
-            seating_data['alpha_dict'] = {chr(65 + i): [0]*cols for i in range(rows)}
+            seating_data['seat_map'].reset()
             seating_data['booked_seats'] = {}
-            seating_data['ticket_count'] = rows * cols
+            self.theatre.mark_show_dirty(screen_id, timing)
             
         except Exception as e:
             raise ValueError(f"Error resetting seats: {str(e)}")
@@ -932,15 +796,7 @@ class Admin:
 
     def _get_active_screens(self):
         """Get list of active screen IDs from screens.csv"""
-        active_screens = []
-        if os.path.exists(self.screens_file):
-            with open(self.screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                active_screens = [
-                    row['ScreenID'] for row in reader 
-                    if row and row.get('Status', '').lower() == 'active'
-                ]
-        return active_screens
+        return self.catalog.screen_ids('active')
 
     def _get_active_screens_with_movies(self):
         """Get active screens with their assigned movies"""
@@ -954,29 +810,13 @@ class Admin:
                 screens[screen_id] = movie_data['name']
         
         # Check movies.csv for any additional movies
-        if os.path.exists(self.movies_file):
-            with open(self.movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if (row['ScreenID'] in active_screens and 
-                        row['IsActive'].lower() == 'yes' and 
-                        row['ScreenID'] not in screens):
-                        screens[row['ScreenID']] = row['Title']
+        for screen_id in active_screens:
+            row = self.catalog.active_movie(screen_id)
+            if row and screen_id not in screens:
+                screens[screen_id] = row['Title']
         
         return screens
 
-    def _get_screen_timings(self, screen_id):
-        """Get available timings for a specific screen"""
-        if (not hasattr(self.theatre, 'hall_data') or (screen_id not in self.theatre.hall_data)):
-            print(f"Error: No data found for screen {screen_id}")
-            return []
-        
-        if 'seating' not in self.theatre.hall_data[screen_id]:
-            print(f"Error: No seating data for screen {screen_id}")
-            return []
-        
-        return list(self.theatre.hall_data[screen_id]['seating'].keys())
-
     def _do_reset(self, screen_id, timing):
         """Perform the actual seat reset for a screen and timing"""
         try:
@@ -987,13 +827,11 @@ class Admin:
                 raise ValueError(f"Timing {timing} not found for screen {screen_id}")
                 
             seating_data = self.theatre.hall_data[screen_id]['seating'][timing]
-            rows = self.theatre.hall_data[screen_id]['dimensions']['rows']
-            cols = self.theatre.hall_data[screen_id]['dimensions']['cols']
             
             # Reset all seats to available (0)
-            seating_data['alpha_dict'] = {chr(65 + i): [0]*cols for i in range(rows)}
+            seating_data['seat_map'].reset()
             seating_data['booked_seats'] = {}
-            seating_data['ticket_count'] = rows * cols
+            self.theatre.mark_show_dirty(screen_id, timing)
             
         except Exception as e:
             raise ValueError(f"Error resetting seats: {str(e)}")
@@ -1010,6 +848,48 @@ class Admin:
                 print("Please enter a valid number.")
 
 
+    def import_bookings(self):
+        """Import a partner CSV export of bookings, writing conflicting rows to a reject file"""
+        file_name = input("Enter the path of the booking CSV to import: ").strip()
+        if not os.path.exists(file_name):
+            print(f"File not found: {file_name}")
+            return
+
+        importer = BookingImporter(self.theatre)
+        try:
+            importer.run(file_name)
+        except Exception as e:
+            print(f"\nImport stopped: {str(e)}")
+            print(f"{importer.stats['imported']} bookings were imported before the error.")
+            return
+        importer.report()
+
+    def archive_finished_shows(self):
+        """Move bookings of past shows into the dated archive and drop their seat rows"""
+        if not self._confirm_action("archive bookings and seat data of shows before today"):
+            return
+        try:
+            archived, removed = self.theatre.archive_finished_shows()
+        except Exception as e:
+            print(f"\nError archiving bookings: {str(e)}")
+            return
+        print(f"\n✓ Archived {archived} bookings and removed {removed} seat rows of finished shows")
+
+    def view_reports(self):
+        """Revenue, refund, occupancy and cancellation reports over all bookings, archived ones included"""
+        since = input("Report from date (YYYY-MM-DD, press Enter for all dates): ").strip() or None
+        if since:
+            try:
+                since = datetime.strptime(since, '%Y-%m-%d').strftime('%Y-%m-%d')
+            except ValueError:
+                print("Invalid date. Please use YYYY-MM-DD.")
+                return
+        try:
+            self.theatre.login.booking_log.sync()
+            Reports(self.storage, self.catalog).load().report(since)
+        except Exception as e:
+            print(f"\nError building reports: {str(e)}")
+
     def admin_menu(self):
         while True:
             print("\n=== ADMIN MENU ===")
@@ -1022,9 +902,12 @@ class Admin:
             print("7. List All Movies")
             print("8. Screen Maintenance")
             print("9. Reset Seats")
-            print("10. Exit Admin Panel")
+            print("10. Import Bookings from CSV")
+            print("11. Archive Finished Shows")
+            print("12. Revenue & Occupancy Reports")
+            print("13. Exit Admin Panel")
             
-            choice = input("Enter your choice (1-10): ")
+            choice = input("Enter your choice (1-13): ")
             
             if choice == '1':
                 self.add_screen()
@@ -1045,6 +928,12 @@ class Admin:
             elif choice == '9':
                 self.reset_seats()
             elif choice == '10':
+                self.import_bookings()
+            elif choice == '11':
+                self.archive_finished_shows()
+            elif choice == '12':
+                self.view_reports()
+            elif choice == '13':
                 print("Exiting admin panel...")
                 break
             else:
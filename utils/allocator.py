@@ -0,0 +1,209 @@
+from bisect import bisect_left
+from functools import lru_cache
+
+from utils.seat_map import BOOKED, parse_seat, row_label, row_runs
+
+ROW_WEIGHT = 1.0
+
+
+def _overlay(seat_map, blocked):
+    """Blocked seats that are still free, as {row: {col, ...}}"""
+    rows = {}
+    for seat in blocked:
+        try:
+            row, col = parse_seat(seat)
+        except (ValueError, IndexError):
+            continue
+        if 0 <= row < seat_map.rows and 0 <= col < seat_map.cols and not seat_map.is_booked(row, col):
+            rows.setdefault(row, set()).add(col)
+    return rows
+
+
+def free_runs(seat_map, blocked=()):
+    """Per-row index of free seat runs: one row_runs() entry per row.
+
+    blocked lists seat labels to treat as taken, such as seats held by
+    other customers.
+    """
+    return _free_runs(seat_map, _overlay(seat_map, blocked))
+
+
+def _free_runs(seat_map, overlay):
+    """The seat map's run index with the overlay rows rescanned"""
+    runs = seat_map.free_runs()
+    if not overlay:
+        return runs
+    runs = list(runs)
+    for row, cols in overlay.items():
+        data = bytearray(seat_map.row(row))
+        for col in cols:
+            data[col] = BOOKED
+        runs[row] = row_runs(bytes(data))
+    return runs
+
+
+@lru_cache(maxsize=256)
+def _outwards(rows, middle):
+    """(row, row penalty) pairs ordered by distance from the middle row"""
+    return tuple((row, ROW_WEIGHT * abs(row - middle)) for row in sorted(range(rows), key=lambda row: abs(row - middle)))
+
+
+def _place(start, length, n, center):
+    """Leftmost column of n seats inside a run, as close to center as the run allows"""
+    return min(max(round(center - (n - 1) / 2), start), start + length - n)
+
+
+def _labels(row, start, n):
+    return [f"{row_label(row)}{col}" for col in range(start, start + n)]
+
+
+def best_available(seat_map, n, blocked=()):
+    """Pick n seats, together in one row if possible, nearest the centre of the hall.
+
+    A block is scored by its distance from the centre column plus ROW_WEIGHT
+    times its distance from the middle row. Rows come from the seat map's
+    run index (SeatMap.free_runs) and are visited from the middle outwards;
+    rows whose longest free run is shorter than n are skipped without
+    looking at their runs, and the best block of a row is cached on its runs
+    (see _row_block). When no row has n free seats side by side, the group
+    is split over nearby rows (see _split). Returns a list of
+    seat labels, or None if the show has fewer than n free seats.
+    """
+    if n <= 0:
+        return None
+    rows, cols = seat_map.rows, seat_map.cols
+    overlay = _overlay(seat_map, blocked)
+    if seat_map.available - sum(len(row_cols) for row_cols in overlay.values()) < n:
+        return None
+    runs = _free_runs(seat_map, overlay)
+
+    center_col = (cols - 1) / 2
+    center_row = (rows - 1) / 2
+    best = None
+    for row, row_penalty in _outwards(rows, center_row):
+        if best is not None and row_penalty >= best[0]:
+            break
+        longest, row_free = runs[row]
+        if longest < n:
+            continue
+        distance, col = _row_block(row_free, n, center_col)
+        if best is None or distance + row_penalty < best[0]:
+            best = (distance + row_penalty, row, col)
+
+    if best is not None:
+        return _labels(best[1], best[2], n)
+    return _split(runs, n, rows, cols)
+
+
+@lru_cache(maxsize=4096)
+def _row_block(row_free, n, center_col):
+    """(distance, col) of the block of n seats in a row's free runs closest to center_col.
+
+    The runs are walked outwards from the centre column while a closer
+    block is still possible. The row must have a run of at least n seats.
+    """
+    best = None
+    middle = bisect_left(row_free, (center_col,))
+    for indexes in (range(middle - 1, -1, -1), range(middle, len(row_free))):
+        for index in indexes:
+            start, length = row_free[index]
+            gap = max(start - center_col, center_col - (start + length - 1), 0)
+            if best is not None and gap >= best[0]:
+                break
+            if length < n:
+                continue
+            col = _place(start, length, n, center_col)
+            distance = abs(col + (n - 1) / 2 - center_col)
+            if best is None or distance < best[0]:
+                best = (distance, col)
+    return best
+
+
+def _split(runs, n, rows, cols):
+    """Seat a group that fits in no single row as a few blocks close together.
+
+    The first block is a longest free run, nearest the centre. Each next
+    block is the free run closest to the first one, measured in rows
+    (weighted by ROW_WEIGHT) and in columns from its centre, until n seats
+    are placed. Each row's nearest block (see _nearest) is kept until that
+    row is used, so a step only searches the rows it has to compare.
+    """
+    free = [list(row_free) for _, row_free in runs]
+    longests = [row_longest for row_longest, _ in runs]
+    center_col = (cols - 1) / 2
+    center_row = (rows - 1) / 2
+
+    longest = max(row_longest for row_longest, _ in runs)
+    anchor = None
+    for row, (row_longest, row_free) in enumerate(runs):
+        if row_longest != longest:
+            continue
+        for index, (start, length) in enumerate(row_free):
+            if length != longest:
+                continue
+            score = abs(start + (length - 1) / 2 - center_col) + ROW_WEIGHT * abs(row - center_row)
+            if anchor is None or score < anchor[0]:
+                anchor = (score, row, index, start)
+
+    _, anchor_row, index, col = anchor
+    anchor_col = col + (longest - 1) / 2
+    seats = _labels(anchor_row, col, longest)
+    _use(free[anchor_row], index, col, longest)
+    longests[anchor_row] = max((length for _, length in free[anchor_row]), default=0)
+    remaining = n - longest
+
+    nearest = {}
+    while remaining:
+        best = None
+        for row, row_penalty in _outwards(rows, anchor_row):
+            if best is not None and row_penalty >= best[0]:
+                break
+            # A row's nearest block only changes when the row is used or
+            # remaining drops below its longest run
+            limit = min(remaining, longests[row])
+            cached = nearest.get(row)
+            if cached is None or cached[0] != limit:
+                cached = (limit, _nearest(free[row], remaining, anchor_col))
+                nearest[row] = cached
+            block = cached[1]
+            if block is not None and (best is None or block[0] + row_penalty < best[0]):
+                best = (block[0] + row_penalty, row) + block[1:]
+        _, row, index, col, take = best
+        seats.extend(_labels(row, col, take))
+        _use(free[row], index, col, take)
+        longests[row] = max((length for _, length in free[row]), default=0)
+        del nearest[row]
+        remaining -= take
+    return seats
+
+
+def _nearest(row_free, remaining, anchor_col):
+    """(distance, index, col, take) of the block of up to remaining seats in a row closest to anchor_col.
+
+    The search starts at the anchor column and walks outwards only while a
+    closer block is still possible. None if the row has no free seats.
+    """
+    best = None
+    middle = bisect_left(row_free, (anchor_col,))
+    for indexes in (range(middle - 1, -1, -1), range(middle, len(row_free))):
+        for index in indexes:
+            start, length = row_free[index]
+            gap = max(start - anchor_col, anchor_col - (start + length - 1), 0)
+            if best is not None and gap >= best[0]:
+                break
+            take = min(length, remaining)
+            col = _place(start, length, take, anchor_col)
+            score = abs(col + (take - 1) / 2 - anchor_col)
+            if best is None or score < best[0]:
+                best = (score, index, col, take)
+    return best
+
+
+def _use(row_free, index, col, take):
+    """Remove seats col..col+take-1 from run index of a row's free list"""
+    start, length = row_free.pop(index)
+    if col > start:
+        row_free.insert(index, (start, col - start))
+        index += 1
+    if start + length > col + take:
+        row_free.insert(index, (col + take, start + length - col - take))
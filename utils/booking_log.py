@@ -0,0 +1,246 @@
+import json
+import os
+
+from utils.locks import file_lock
+from utils.wallet import DEFAULT_BALANCE, WalletLedger
+
+
+class BookingLog:
+    """Append-only event log for bookings and wallet changes.
+
+    Every confirmed booking, cancellation or wallet transaction is written
+    here as one JSON line; a batch order is a single line carrying all of its
+    bookings, so it is either entirely in the log or not at all. The booking,
+    wallet and hall tables in the storage backend are derived from the log
+    and are brought up to date in batches by sync().
+
+    Wallet events carry a signed Amount; the Balance in them is only what
+    the logging process saw. balance() adds the amounts of every logged
+    but unsynced event, from any process, to the ledger balance, and sync()
+    recomputes Balance from the amounts in log order.
+    """
+
+    def __init__(self, storage, log_file='csvs/booking_events.log', checkpoint_file='csvs/booking_events.ckpt',
+                 journal_file='csvs/booking_events.sync'):
+        self.storage = storage
+        self.log_file = log_file
+        self.checkpoint_file = checkpoint_file
+        self.journal_file = journal_file
+        self.hall_state = None
+        self._pending_checkpoint = None
+        self._pending_offset = 0
+        self._pending_amounts = {}
+        os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+        self.wallet = WalletLedger(storage)
+
+    def append(self, event):
+        """Durably append a single event to the log and return the log version (before, after) it.
+
+        after is None when another process appended at the same time, so
+        the change from before to after was not only this event.
+        """
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+        with open(self.log_file, 'ab') as f:
+            before = os.fstat(f.fileno())
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            after = os.fstat(f.fileno())
+        if after.st_size != before.st_size + len(line):
+            return self._version(before), None
+        return self._version(before), self._version(after)
+
+    def version(self):
+        """Change marker for the log file; moves whenever any process appends an event"""
+        try:
+            stat = os.stat(self.log_file)
+        except OSError:
+            return None
+        return self._version(stat)
+
+    def _version(self, stat):
+        return stat.st_mtime_ns, stat.st_size
+
+    def balance(self, username):
+        """Balance of username including wallet events not synced yet; None if the user has no wallet activity.
+
+        Hold wallet_lock(username) across this and the append of any event
+        computed from it.
+        """
+        with file_lock('booking_log'):
+            self.wallet.refresh_if_changed()
+            balance = self.wallet.balance(username)
+            pending = self._pending_wallet_amounts().get(username)
+        if pending is None:
+            return balance
+        return (DEFAULT_BALANCE if balance is None else balance) + pending
+
+    def _pending_wallet_amounts(self):
+        """Sum of logged wallet amounts per user after the checkpoint; the booking_log lock must be held.
+
+        Only log bytes appended since the previous call are parsed, unless a
+        sync has moved the checkpoint since.
+        """
+        checkpoint = self._read_checkpoint()
+        if checkpoint != self._pending_checkpoint:
+            self._pending_checkpoint = checkpoint
+            self._pending_offset = checkpoint
+            self._pending_amounts = {}
+
+        events, self._pending_offset = self._read_events(self._pending_offset)
+        for event in events:
+            wallet = event.get('wallet')
+            if not wallet or not wallet.get('Username'):
+                continue
+            try:
+                amount = float(wallet['Amount'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._pending_amounts[wallet['Username']] = self._pending_amounts.get(wallet['Username'], 0) + amount
+        return self._pending_amounts
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_checkpoint(self, offset):
+        temp_file = f'{self.checkpoint_file}.tmp'
+        with open(temp_file, 'w') as f:
+            f.write(str(offset))
+        os.replace(temp_file, self.checkpoint_file)
+
+    def _read_pending(self):
+        """Return (events, end_offset) for complete log lines after the checkpoint"""
+        return self._read_events(self._read_checkpoint())
+
+    def _read_events(self, offset, end=None):
+        """Return (events, end_offset) for complete log lines after a byte offset, stopping at end if given"""
+        events = []
+        if not os.path.exists(self.log_file):
+            return events, offset
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n') or (end is not None and offset + len(line) > end):
+                    break
+                offset += len(line)
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    print(f"[Warning] Skipping corrupt booking log entry at offset {offset - len(line)}")
+        return events, offset
+
+    def _read_journal(self):
+        try:
+            with open(self.journal_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_journal(self, journal):
+        temp_file = f'{self.journal_file}.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(journal, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.journal_file)
+
+    def sync(self):
+        """Materialize pending log events into the storage backend.
+
+        The log is shared by every kiosk process, so syncing holds a lock that
+        keeps two processes from applying the same events.
+        """
+        with file_lock('booking_log'):
+            return self._sync()
+
+    def _sync(self):
+        """Apply the events after the checkpoint, picking up a sync that failed part way.
+
+        Before the first write, the journal file records which events are
+        being synced and where the wallet ledger ended. Bookings already
+        stored, status updates and seat rows can safely be written again, but
+        wallet rows cannot, so a sync that finds the journal of a failed one
+        restores the ledger to that mark (see restore_wallet_history) and
+        syncs the same events again. Errors are raised to the caller; the
+        checkpoint only moves once every step has succeeded.
+        """
+        checkpoint = self._read_checkpoint()
+        journal = self._read_journal()
+        if journal is not None and journal.get('start') != checkpoint:
+            journal = None
+        events, end_offset = self._read_events(checkpoint, journal['end'] if journal else None)
+        if not events:
+            return 0
+
+        bookings = []
+        statuses = []
+        transactions = []
+        seat_changes = []
+        for event in events:
+            if event.get('booking'):
+                bookings.append(event['booking'])
+            if event.get('bookings'):
+                bookings.extend(event['bookings'])
+            if event.get('status'):
+                statuses.append(event['status'])
+            if event.get('wallet'):
+                transactions.append(event['wallet'])
+            if event.get('seats'):
+                seat_changes.append(event['seats'])
+            if event.get('seat_changes'):
+                seat_changes.extend(event['seat_changes'])
+
+        wallet_done = False
+        if journal is None:
+            usernames = sorted({t['Username'] for t in transactions if t.get('Username')})
+            self._write_journal({
+                'start': checkpoint,
+                'end': end_offset,
+                'wallet': self.storage.wallet_history_mark(usernames)
+            })
+        else:
+            print("[Warning] Resuming a booking log sync that did not finish")
+            wallet_done = self.storage.restore_wallet_history(journal['wallet'])
+            self.wallet.reload()
+
+        self.storage.append_bookings(bookings)
+        self.storage.update_booking_statuses(statuses)
+        if not wallet_done:
+            self.wallet.record(transactions)
+        self._apply_seat_changes(seat_changes)
+        self._write_checkpoint(end_offset)
+        os.remove(self.journal_file)
+        self.wallet.snapshot_if_due()
+        return len(events)
+
+    def _apply_seat_changes(self, seat_changes):
+        if seat_changes and self.hall_state is not None:
+            seat_changes = self.hall_state.apply_seat_changes(seat_changes)
+        if not seat_changes:
+            return
+
+        changes = {}
+        for change in seat_changes:
+            key = (change['screen_id'], change['show_time'])
+            token = '0' if change.get('release') else 'X'
+            for seat in change['seats']:
+                changes.setdefault((key, seat[0].upper()), {})[int(seat[1:])] = token
+
+        updated = []
+        for screen_id, show_time, row_char, seat_status in self.storage.load_hall():
+            cols = changes.get(((screen_id, show_time), row_char))
+            if not cols:
+                continue
+            seats = seat_status.split(',')
+            for col, token in cols.items():
+                if 0 <= col < len(seats):
+                    seats[col] = token
+            updated.append((screen_id, show_time, row_char, ','.join(seats)))
+
+        if updated:
+            self.storage.update_hall_rows(updated)
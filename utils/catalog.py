@@ -0,0 +1,140 @@
+from contextlib import contextmanager
+
+from utils.locks import file_lock
+
+
+class CatalogChange:
+    """Screen, movie and hall edits staged inside Catalog.transaction().
+
+    screens and movies are copies of the current tables, loaded on first
+    access; edit or append to them in place. Only the tables that were
+    touched (and the hall rows, if set_hall was called) are written on
+    commit.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._screens = None
+        self._movies = None
+        self.hall = None
+
+    @property
+    def screens(self):
+        if self._screens is None:
+            self._screens = self.catalog.screens()
+        return self._screens
+
+    @property
+    def movies(self):
+        if self._movies is None:
+            self._movies = self.catalog.movies()
+        return self._movies
+
+    def set_hall(self, rows):
+        """Stage a full hall snapshot of (screen_id, show_time, row, seat_status) tuples"""
+        self.hall = rows
+
+    def commit(self):
+        self.catalog.storage.commit_catalog(screens=self._screens, movies=self._movies, hall=self.hall)
+        self.catalog.invalidate()
+
+
+class Catalog:
+    """In-memory copy of the screens and movies tables with lookup indexes.
+
+    The tables are read from storage once and kept until storage reports a
+    different version for them (file mtime/size for CSV storage, the data
+    version for SQLite), so repeated lookups in one admin action or across
+    actions do not reparse the files. Writes go through the catalog so the
+    cache is dropped as soon as this process changes a table. Changes are
+    made in a transaction(), which commits every staged table together.
+
+    screens() and movies() return copies of the rows, since callers edit
+    them before saving; the single-row lookups return the cached rows and
+    must not be modified.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._version = None
+        self._screens = []
+        self._movies = []
+        self.screens_by_id = {}
+        self.screen_statuses = {}
+        self.movies_by_id = {}
+        self.active_movie_by_screen = {}
+
+    def refresh(self):
+        """Reload both tables if either changed since they were last read"""
+        version = self.storage.data_version(('screens', 'movies'))
+        if version == self._version:
+            return
+        self._screens = self.storage.list_screens()
+        self._movies = self.storage.list_movies()
+        self._version = version
+
+        self.screens_by_id = {}
+        self.screen_statuses = {}
+        for row in self._screens:
+            self.screens_by_id.setdefault(row.get('ScreenID'), row)
+            self.screen_statuses.setdefault(row.get('ScreenID'), set()).add(row.get('Status', '').lower())
+
+        self.movies_by_id = {}
+        self.active_movie_by_screen = {}
+        for row in self._movies:
+            movie_id = str(row.get('MovieID', ''))
+            if movie_id.isdigit():
+                self.movies_by_id.setdefault(int(movie_id), row)
+            if row.get('IsActive', '').lower() == 'yes':
+                self.active_movie_by_screen[row.get('ScreenID')] = row
+
+    def invalidate(self):
+        self._version = None
+
+    def screens(self):
+        self.refresh()
+        return [dict(row) for row in self._screens]
+
+    def movies(self):
+        self.refresh()
+        return [dict(row) for row in self._movies]
+
+    def screen(self, screen_id):
+        """First row for screen_id, matching storage.get_screen"""
+        self.refresh()
+        return self.screens_by_id.get(screen_id)
+
+    def screen_has_status(self, screen_id, status):
+        """Whether any row for screen_id has the given status; screens.csv may list an ID more than once"""
+        self.refresh()
+        return status in self.screen_statuses.get(screen_id, ())
+
+    def movie(self, movie_id):
+        self.refresh()
+        return self.movies_by_id.get(movie_id)
+
+    def active_movie(self, screen_id):
+        """Active movie row showing on screen_id, or None"""
+        self.refresh()
+        return self.active_movie_by_screen.get(screen_id)
+
+    def screen_ids(self, status=None):
+        """Screen IDs in file order, optionally only those with the given status"""
+        self.refresh()
+        return [
+            row['ScreenID'] for row in self._screens
+            if status is None or row.get('Status', '').lower() == status
+        ]
+
+    @contextmanager
+    def transaction(self):
+        """Stage catalog edits on the yielded CatalogChange and commit them when the block ends.
+
+        The catalog lock is held for the whole block so edits from another
+        process cannot be lost in between; an exception in the block
+        discards the staged edits.
+        """
+        with file_lock('catalog'):
+            change = CatalogChange(self)
+            yield change
+            change.commit()
@@ -0,0 +1,188 @@
+import json
+import socket
+
+
+class BookingClient:
+    """Terminal client for the booking service; all state lives in the server"""
+
+    def __init__(self, host='127.0.0.1', port=8765, socket_path=None):
+        if socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(socket_path)
+        else:
+            self.sock = socket.create_connection((host, port))
+        self.stream = self.sock.makefile('rwb')
+        self.uid = None
+
+    def request(self, op, **params):
+        """Send one request and return its result; raises ValueError with the server's error"""
+        params['op'] = op
+        self.stream.write(json.dumps(params).encode('utf-8') + b'\n')
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("Booking service closed the connection")
+        response = json.loads(line)
+        if not response['ok']:
+            raise ValueError(response['error'])
+        return response['result']
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def sign_in(self):
+        print("\t\t ---- SIGN-IN ----")
+        uid = input("Enter your mobile number: ")
+        password = input("Enter your password: ")
+        try:
+            result = self.request('login', uid=uid, password=password)
+        except ValueError as e:
+            print(str(e))
+            return False
+        self.uid = result['uid']
+        print(f"\nWelcome back, {result['name']}!" if result['name'] else "\nSigned in successfully")
+        return True
+
+    def _choose_show(self):
+        movies = self.request('list_movies')
+        print("\nAvailable Movies:")
+        for movie in movies:
+            print(f"{movie['id']}. {movie['name']} ₹{movie['price']} (Screen: {movie['screen_id']})")
+
+        try:
+            movie_id = int(input("Enter the serial number of the movie: "))
+        except ValueError:
+            print("Please enter a number only.")
+            return None
+        movie = next((movie for movie in movies if movie['id'] == movie_id), None)
+        if movie is None or not movie['timings']:
+            print("Please enter a valid movie serial number.")
+            return None
+
+        for i, timing in enumerate(movie['timings'], 1):
+            print(f"  {i:>2}. {timing}")
+        choice = input(f"Select timing (1-{len(movie['timings'])}): ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(movie['timings']):
+            print(f"Please select between 1 and {len(movie['timings'])}")
+            return None
+        return movie, movie['timings'][int(choice) - 1]
+
+    def _print_seats(self, seats):
+        print(f"\n--- Seating at {seats['show_time']} ({seats['available']} of {seats['capacity']} available) ---")
+        print("   ", " ".join(f"{col:>2}" for col in seats['col_labels']))
+        for row_label, row in zip(seats['row_labels'], seats['rows']):
+            print(f"{row_label}:", " ".join(f"{seat:>2}" for seat in row))
+        print("\nSeats marked 'X' are booked, 'H' are held, '.' are available")
+
+    def display_seats(self):
+        selection = self._choose_show()
+        if selection:
+            movie, show_time = selection
+            self._print_seats(self.request('availability', movie_id=movie['id'], show_time=show_time))
+
+    def book_ticket(self):
+        selection = self._choose_show()
+        if not selection:
+            return
+        movie, show_time = selection
+        self._print_seats(self.request('availability', movie_id=movie['id'], show_time=show_time))
+
+        choice = input("Enter seats separated by commas (e.g. A1,A2), or a number of seats to pick the best: ").strip()
+        try:
+            if choice.isdigit():
+                seats = self.request('hold', movie_id=movie['id'], show_time=show_time, count=int(choice))['seats']
+                print(f"\nBest available seats: {', '.join(seats)}")
+            else:
+                seats = [seat.strip().upper() for seat in choice.split(',') if seat.strip()]
+                self.request('hold', movie_id=movie['id'], show_time=show_time, seats=seats)
+        except ValueError as e:
+            print(f"\n{str(e)}")
+            return
+
+        print(f"\nTOTAL AMOUNT: ₹{movie['price'] * len(seats)} for {len(seats)} seat(s) at {show_time}")
+        if input("Confirm payment and book tickets? (y/n): ").lower() != 'y':
+            self.request('release', movie_id=movie['id'], show_time=show_time, seats=seats)
+            print("Booking cancelled. Seats released.")
+            return
+
+        try:
+            result = self.request('book', movie_id=movie['id'], show_time=show_time, seats=seats)
+        except ValueError as e:
+            self.request('release', movie_id=movie['id'], show_time=show_time, seats=seats)
+            print(f"\nError processing booking: {str(e)}")
+            return
+        print(f"\nBOOKING CONFIRMED: {result['movie']} at {result['show_time']}, seats {', '.join(result['seats'])}")
+        print(f"₹{result['total_price']} deducted. New balance: ₹{result['balance']}")
+
+    def cancel_ticket(self):
+        bookings = self.request('bookings')
+        if not bookings:
+            print("\nYou have no active bookings to cancel.")
+            return
+        for i, booking in enumerate(bookings, 1):
+            print(f"{i:<3} | {booking['movie'][:24]:<25} | {booking['screen']:<8} | {booking['time']:<8} | "
+                  f"{', '.join(booking['seats']):<20} | ₹{booking['price']:.2f}")
+
+        choice = input("\nEnter booking number to cancel (0 to return): ").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= len(bookings):
+            return
+        try:
+            result = self.request('cancel', booking_id=bookings[int(choice) - 1]['booking_id'])
+        except ValueError as e:
+            print(f"\nError during cancellation: {str(e)}")
+            return
+        print(f"₹{result['refund']:.2f} added to wallet. New balance: ₹{result['balance']:.2f}")
+
+    def view_wallet_history(self):
+        rows = self.request('history', limit=10)
+        if not rows:
+            print("\nNo wallet transactions found.")
+            return
+        print(f"{'Date':<12} | {'Time':<10} | {'Amount':<15} | {'Balance':<15} | {'Description'}")
+        for row in rows:
+            print(f"{row['Date']:<12} | {row['Time']:<10} | {row['Amount']:<15} | {row.get('Balance', ''):<15} | {row.get('Description', '')}")
+
+    def user_menu(self):
+        while True:
+            print("\n--- Theatre Booking System ---")
+            print("1. Book Tickets")
+            print("2. Display Seats")
+            print("3. Cancel Ticket")
+            print("4. Check Balance")
+            print("5. View Wallet History")
+            print("6. Exit")
+
+            choice = input("Enter your choice (1-6): ")
+            try:
+                if choice == '1':
+                    self.book_ticket()
+                elif choice == '2':
+                    self.display_seats()
+                elif choice == '3':
+                    self.cancel_ticket()
+                elif choice == '4':
+                    print(f"\nYour current balance: ₹{self.request('balance')['balance']:.2f}")
+                elif choice == '5':
+                    self.view_wallet_history()
+                elif choice == '6':
+                    self.request('logout')
+                    print("Exiting the system. Thank you!")
+                    return
+                else:
+                    print("Invalid choice. Please enter a number between 1 and 6.")
+            except ValueError as e:
+                print(f"\n{str(e)}")
+
+
+def run_client(host='127.0.0.1', port=8765, socket_path=None):
+    try:
+        client = BookingClient(host, port, socket_path)
+    except OSError as e:
+        print(f"Could not reach the booking service: {str(e)}")
+        return
+    try:
+        if client.sign_in():
+            client.user_menu()
+    finally:
+        client.close()
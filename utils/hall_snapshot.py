@@ -0,0 +1,94 @@
+import json
+import os
+import struct
+import zlib
+
+from utils.seat_map import SeatMap
+
+MAGIC = b'TBHS'
+FORMAT_VERSION = 3
+HEADER = struct.Struct('<4sHII')
+
+
+def _normalize(token):
+    return json.loads(json.dumps(token))
+
+
+def write_hall_snapshot(file_name, token, movie_list, screens, hall_data):
+    """Write movies, screens and every seat map to a binary snapshot.
+
+    Layout: header (magic, format version, crc32 of the payload, metadata
+    length) followed by the payload, which is JSON metadata and then the raw
+    seat bytes of every show in metadata order. token identifies the storage
+    state the snapshot was taken from.
+    """
+    halls = []
+    seat_data = []
+    for screen_id, screen_data in hall_data.items():
+        shows = []
+        for show_time, timing_data in screen_data['seating'].items():
+            seat_map = timing_data['seat_map']
+            shows.append([show_time, seat_map.rows, seat_map.cols])
+            seat_data.append(seat_map.to_bytes())
+        dimensions = screen_data['dimensions']
+        halls.append([screen_id, dimensions['rows'], dimensions['cols'], shows])
+
+    meta = json.dumps({
+        'token': token,
+        'movies': [[movie_id, movie] for movie_id, movie in movie_list.items()],
+        'screens': screens,
+        'halls': halls
+    }, separators=(',', ':')).encode('utf-8')
+    payload = meta + b''.join(seat_data)
+
+    temp_file = f'{file_name}.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(payload), len(meta)))
+        f.write(payload)
+    os.replace(temp_file, file_name)
+
+
+def read_hall_snapshot(file_name, token):
+    """Return (movie_list, screens, hall_data) if the snapshot is intact and matches token, else None"""
+    try:
+        with open(file_name, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < HEADER.size:
+        print("[Warning] Hall snapshot is truncated, rebuilding from storage")
+        return None
+    magic, version, checksum, meta_size = HEADER.unpack_from(data)
+    payload = memoryview(data)[HEADER.size:]
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    if zlib.crc32(payload) != checksum:
+        print("[Warning] Hall snapshot checksum mismatch, rebuilding from storage")
+        return None
+
+    meta = json.loads(bytes(payload[:meta_size]))
+    if meta['token'] != _normalize(token):
+        return None
+
+    movie_list = {movie_id: movie for movie_id, movie in meta['movies']}
+    hall_data = {}
+    offset = meta_size
+    for screen_id, rows, cols, shows in meta['halls']:
+        available_rows = [chr(65 + i) for i in range(rows)]
+        available_cols = [str(i) for i in range(cols)]
+        seating = {}
+        for show_time, show_rows, show_cols in shows:
+            size = show_rows * show_cols
+            seating[show_time] = {
+                'seat_map': SeatMap(show_rows, show_cols, payload[offset:offset + size]),
+                'booked_seats': {},
+                'available_rows': available_rows,
+                'available_cols': available_cols
+            }
+            offset += size
+        hall_data[screen_id] = {
+            'dimensions': {'rows': rows, 'cols': cols},
+            'seating': seating
+        }
+    return movie_list, meta['screens'], hall_data
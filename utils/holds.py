@@ -0,0 +1,206 @@
+import heapq
+import json
+import os
+import time
+
+from utils.locks import file_lock
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class HoldTable:
+    """Temporary seat reservations per (screen, show) that expire after ttl seconds.
+
+    Holds are kept in a dict per show plus a min-heap of expiry times, so
+    expiring is a pop per expired hold rather than a scan of every hold.
+    Replaced or released holds stay in the heap and are skipped when popped.
+
+    The table is shared by every process through an append-only journal of
+    hold and release entries written under a file lock. Each process reads
+    only the entries added since it last looked. Expiry needs no entry since
+    every process drops a hold at the same time; the journal is rewritten
+    with only the live holds when holds expire or it grows past
+    compact_lines. Each hold records the pid that took it, and recover()
+    drops holds of processes that are no longer running.
+    """
+
+    def __init__(self, file_name='csvs/seat_holds.log', ttl=300, clock=time.time, compact_lines=1000):
+        self.file_name = file_name
+        self.ttl = ttl
+        self.clock = clock
+        self.compact_lines = compact_lines
+        self._holds = {}
+        self._heap = []
+        self._inode = None
+        self._offset = 0
+        self._lines = 0
+
+    def _load(self):
+        """Apply the journal entries other processes have added since the last read"""
+        try:
+            f = open(self.file_name, 'rb')
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset(None)
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset(stat.st_ino)
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                self._lines += 1
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, TypeError) as e:
+                    print(f"[Warning] Skipping corrupt seat hold entry: {str(e)}")
+
+    def _reset(self, inode):
+        self._holds = {}
+        self._heap = []
+        self._inode = inode
+        self._offset = 0
+        self._lines = 0
+
+    def _apply(self, entry):
+        if entry[0] == 'hold':
+            _, screen_id, show_time, seat, owner, pid, expires = entry
+            self._set(screen_id, show_time, seat, owner, pid, expires)
+        elif entry[0] == 'release':
+            _, screen_id, show_time, seat = entry
+            self._drop(screen_id, show_time, seat)
+
+    def _write(self, entries):
+        """Append entries already applied in memory, or compact the journal once it is long enough"""
+        if self._lines + len(entries) > self.compact_lines:
+            self._compact()
+            return
+        with open(self.file_name, 'ab') as f:
+            f.write(b''.join(json.dumps(entry).encode('utf-8') + b'\n' for entry in entries))
+            self._offset = f.tell()
+            self._inode = os.fstat(f.fileno()).st_ino
+        self._lines += len(entries)
+
+    def _compact(self):
+        """Rewrite the journal as one hold entry per live hold"""
+        entries = [
+            ['hold', screen_id, show_time, seat, owner, pid, expires]
+            for (screen_id, show_time), seats in self._holds.items()
+            for seat, (owner, pid, expires) in seats.items()
+        ]
+        temp_file = f'{self.file_name}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(b''.join(json.dumps(entry).encode('utf-8') + b'\n' for entry in entries))
+            self._offset = f.tell()
+            self._inode = os.fstat(f.fileno()).st_ino
+        os.replace(temp_file, self.file_name)
+        self._lines = len(entries)
+
+    def _set(self, screen_id, show_time, seat, owner, pid, expires):
+        self._holds.setdefault((screen_id, show_time), {})[seat] = (owner, pid, expires)
+        heapq.heappush(self._heap, (expires, screen_id, show_time, seat))
+
+    def _drop(self, screen_id, show_time, seat):
+        seats = self._holds.get((screen_id, show_time))
+        if seats and seat in seats:
+            del seats[seat]
+            if not seats:
+                del self._holds[(screen_id, show_time)]
+
+    def _expire(self):
+        """Drop holds whose time is up; returns the number dropped"""
+        now = self.clock()
+        dropped = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires, screen_id, show_time, seat = heapq.heappop(self._heap)
+            seats = self._holds.get((screen_id, show_time))
+            if seats and seat in seats and seats[seat][2] == expires:
+                del seats[seat]
+                dropped += 1
+                if not seats:
+                    del self._holds[(screen_id, show_time)]
+        return dropped
+
+    def hold(self, screen_id, show_time, seats, owner):
+        """Hold seats for owner, or extend owner's existing holds; raises ValueError if another owner holds one"""
+        with file_lock('seat_holds'):
+            self._load()
+            self._expire()
+            held = self._holds.get((screen_id, show_time), {})
+            for seat in seats:
+                if seat in held and held[seat][0] != owner:
+                    raise ValueError(f"Seat {seat} is held by another customer")
+
+            expires = self.clock() + self.ttl
+            entries = [['hold', screen_id, show_time, seat, owner, os.getpid(), expires] for seat in seats]
+            for entry in entries:
+                self._apply(entry)
+            self._write(entries)
+        return expires
+
+    def release(self, screen_id, show_time, owner, seats=None):
+        """Release owner's holds on a show, or only the given seats; returns the released seats"""
+        with file_lock('seat_holds'):
+            self._load()
+            self._expire()
+            held = self._holds.get((screen_id, show_time), {})
+            released = [
+                seat for seat, (seat_owner, _, _) in held.items()
+                if seat_owner == owner and (seats is None or seat in seats)
+            ]
+            for seat in released:
+                self._drop(screen_id, show_time, seat)
+            if released:
+                self._write([['release', screen_id, show_time, seat] for seat in released])
+        return released
+
+    def held(self, screen_id, show_time):
+        """{seat: owner} of the live holds on one show"""
+        self._load()
+        self._expire()
+        return {seat: owner for seat, (owner, _, _) in self._holds.get((screen_id, show_time), {}).items()}
+
+    def check(self, screen_id, show_time, seats, owner):
+        """Raise ValueError if any seat is held by someone other than owner"""
+        held = self.held(screen_id, show_time)
+        for seat in seats:
+            if held.get(seat, owner) != owner:
+                raise ValueError(f"Seat {seat} is held by another customer")
+
+    def expire(self):
+        """Drop expired holds and compact the journal; called periodically by long-running processes"""
+        with file_lock('seat_holds'):
+            self._load()
+            dropped = self._expire()
+            if dropped:
+                self._compact()
+        return dropped
+
+    def recover(self):
+        """Drop expired holds and holds left behind by processes that have exited"""
+        with file_lock('seat_holds'):
+            self._load()
+            dropped = self._expire()
+            for key, seats in list(self._holds.items()):
+                for seat, (_, pid, _) in list(seats.items()):
+                    if pid != os.getpid() and not _process_alive(pid):
+                        del seats[seat]
+                        dropped += 1
+                if not seats:
+                    del self._holds[key]
+            if dropped:
+                self._compact()
+        return dropped
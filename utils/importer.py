@@ -0,0 +1,176 @@
+import csv
+import os
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from utils.locks import show_lock
+from utils.seat_map import parse_seat_list
+from utils.storage import BOOKING_FIELDS
+
+REJECT_FIELDS = ['Line', 'Reason'] + BOOKING_FIELDS
+
+
+def read_rows(file_name):
+    """Yield (line_number, row) from a CSV export one row at a time"""
+    with open(file_name, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing = [field for field in ('BookingID', 'ScreenID', 'Show_Timing', 'Seat_Numbers') if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{file_name} is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, row
+
+
+def chunked(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BookingImporter:
+    """Streams a partner CSV export of bookings into the system in fixed-size chunks.
+
+    The file is read chunk_size rows at a time and each chunk flows through
+    a generator pipeline: parse -> dedupe -> validate -> apply. Only one
+    chunk is in memory at a time: dedupe checks BookingIDs
+    against storage (earlier chunks are already synced there) and against
+    the current chunk, and validate tracks the seats claimed by the chunk in
+    progress. Each chunk is written as one booking log event and synced, so
+    an interrupted import keeps every chunk that completed. Rejected rows go
+    to the reject file with their line number and reason.
+    """
+
+    def __init__(self, theatre, chunk_size=1000):
+        self.theatre = theatre
+        self.storage = theatre.login.storage
+        self.booking_log = theatre.login.booking_log
+        self.chunk_size = chunk_size
+        self._reject_writer = None
+        self._chunk_ids = set()
+        self._chunk_seats = set()
+        self.stats = {'read': 0, 'imported': 0, 'rejected': {}}
+
+    def _reject(self, line, row, reason):
+        kind = reason.split(':')[0]
+        self.stats['rejected'][kind] = self.stats['rejected'].get(kind, 0) + 1
+        self._reject_writer.writerow([line, reason] + [row.get(field, '') for field in BOOKING_FIELDS])
+
+    def parse(self, rows):
+        for line, row in rows:
+            self.stats['read'] += 1
+            seats = parse_seat_list(row.get('Seat_Numbers') or '')
+            if not row.get('BookingID') or not seats:
+                self._reject(line, row, "malformed: missing BookingID or seats")
+                continue
+            yield line, row, [seat.strip().upper() for seat in seats]
+
+    def dedupe(self, items):
+        for line, row, seats in items:
+            booking_id = row['BookingID']
+            if booking_id in self._chunk_ids or self.storage.get_booking(booking_id) is not None:
+                self._reject(line, row, "duplicate: BookingID already exists")
+                continue
+            self._chunk_ids.add(booking_id)
+            yield line, row, seats
+
+    def validate(self, items):
+        for line, row, seats in items:
+            screen_id = row['ScreenID']
+            show_time = row['Show_Timing']
+            timing_data = self.theatre.show_data(screen_id, show_time)
+            if timing_data is None:
+                self._reject(line, row, f"unknown show: {screen_id} {show_time}")
+                continue
+            if (row.get('Ticket_Status') or 'booked').lower() != 'booked':
+                yield line, row, seats
+                continue
+
+            seat_map = timing_data['seat_map']
+            problem = None
+            for seat in seats:
+                try:
+                    booked = seat_map.is_seat_booked(seat)
+                except (ValueError, IndexError):
+                    problem = f"invalid seat: {seat}"
+                    break
+                if booked or (screen_id, show_time, seat) in self._chunk_seats:
+                    problem = f"seat conflict: {seat} is already booked"
+                    break
+            if problem:
+                self._reject(line, row, problem)
+                continue
+
+            self._chunk_seats.update((screen_id, show_time, seat) for seat in seats)
+            yield line, row, seats
+
+    def apply(self, chunk):
+        """Lock the chunk's shows, re-check seats against other processes and log the chunk as one event"""
+        shows = sorted({(row['ScreenID'], row['Show_Timing']) for _, row, _ in chunk})
+        with ExitStack() as stack:
+            for screen_id, show_time in shows:
+                stack.enter_context(show_lock(screen_id, show_time))
+                self.theatre._reload_show(screen_id, show_time)
+
+            records = []
+            seat_changes = []
+            for line, row, seats in chunk:
+                record = {field: row.get(field, '') for field in BOOKING_FIELDS}
+                record['Ticket_Status'] = record['Ticket_Status'] or 'booked'
+                if record['Ticket_Status'].lower() == 'booked':
+                    seat_map = self.theatre.hall_data[row['ScreenID']]['seating'][row['Show_Timing']]['seat_map']
+                    taken = next((seat for seat in seats if seat_map.is_seat_booked(seat)), None)
+                    if taken:
+                        self._reject(line, row, f"seat conflict: {taken} is already booked")
+                        continue
+                    seat_changes.append({'screen_id': row['ScreenID'], 'show_time': row['Show_Timing'], 'seats': seats})
+                records.append(record)
+
+            if records:
+                self.booking_log.append({'type': 'import', 'bookings': records, 'seat_changes': seat_changes})
+            for change in seat_changes:
+                seat_map = self.theatre.hall_data[change['screen_id']]['seating'][change['show_time']]['seat_map']
+                for seat in change['seats']:
+                    seat_map.book_seat(seat)
+
+        for screen_id, show_time in shows:
+            self.theatre.mark_show_dirty(screen_id, show_time)
+        self.booking_log.sync()
+        self.stats['imported'] += len(records)
+
+    def run(self, file_name, reject_file=None):
+        """Import file_name; returns the stats dict with elapsed time and rows/sec added"""
+        reject_file = reject_file or f"{os.path.splitext(file_name)[0]}_rejects.csv"
+        start = time.perf_counter()
+        with open(reject_file, 'w', newline='', encoding='utf-8') as f:
+            self._reject_writer = csv.writer(f)
+            self._reject_writer.writerow(REJECT_FIELDS)
+            for rows in chunked(read_rows(file_name), self.chunk_size):
+                chunk = list(self.validate(self.dedupe(self.parse(rows))))
+                if chunk:
+                    self.apply(chunk)
+                self._chunk_ids.clear()
+                self._chunk_seats.clear()
+
+        elapsed = time.perf_counter() - start
+        self.stats['elapsed'] = elapsed
+        self.stats['rows_per_sec'] = self.stats['read'] / elapsed if elapsed > 0 else 0
+        self.stats['reject_file'] = reject_file
+        return self.stats
+
+    def report(self):
+        stats = self.stats
+        print("\n" + "="*60)
+        print("BOOKING IMPORT".center(60))
+        print("="*60)
+        print(f"{'Rows read:':<20} {stats['read']:,}")
+        print(f"{'Imported:':<20} {stats['imported']:,}")
+        print(f"{'Rejected:':<20} {sum(stats['rejected'].values()):,}")
+        for reason, count in sorted(stats['rejected'].items()):
+            print(f"  {reason:<18} {count:,}")
+        print(f"{'Time:':<20} {stats['elapsed']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+        print(f"{'Reject file:':<20} {stats['reject_file']}")
+        print("="*60)
@@ -0,0 +1,45 @@
+import os
+import re
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = 'csvs/locks'
+
+
+def _safe_name(value):
+    return re.sub(r'[^A-Za-z0-9_-]', '_', str(value))
+
+
+@contextmanager
+def file_lock(name, lock_dir=LOCK_DIR):
+    """Hold an exclusive advisory lock on lock_dir/<name>.lock for the duration of the block"""
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f'{_safe_name(name)}.lock'), 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def show_lock(screen_id, show_time):
+    """Lock one (screen, show) so only buyers of the same show wait on each other"""
+    return file_lock(f'show_{_safe_name(screen_id)}_{_safe_name(show_time)}')
+
+
+def wallet_lock(username):
+    """Lock one user's wallet so a balance check and the change logged from it cannot interleave with another process's"""
+    return file_lock(f'wallet_{_safe_name(username)}')
@@ -5,23 +5,36 @@ from datetime import datetime
 
 from utils.theatre import Theatre
 from utils.admin import Admin
+from utils.booking_log import BookingLog
+from utils.locks import wallet_lock
+from utils.snapshot import StartupSnapshot
+from utils.storage import get_storage
+from utils.wallet import DEFAULT_BALANCE
 
 class Login:
-    def __init__(self, file1='csvs/login_details.csv', file2='csvs/booking_details.csv'):
+    def __init__(self, file1='csvs/login_details.csv', file2='csvs/booking_details.csv', storage=None):
         self.file1 = file1
         self.file2 = file2
         self.current_user = None
         self.is_admin = False
-        self.login_data = self.load_login_data()
-        self.booking_data = self.load_booking_data()
+        self.storage = storage or get_storage(login_file=file1, booking_file=file2)
+        self.booking_log = BookingLog(self.storage)
+        self.booking_log.sync()
+        self.snapshot = StartupSnapshot(self.storage)
+        if os.environ.get('TICKET_STARTUP_REPORT'):
+            self.snapshot.report()
+        self.login_data = list(self.snapshot.login_rows)
+        self._booking_data = None
         self.user_wallets = {}
+        self._balance_cache = {}
+        self._balance_log_version = None
+        self.balance_cache_hits = 0
+        self.balance_cache_misses = 0
         self.wallet_history_file = 'csvs/wallet_history.csv' 
         self._init_files()
         self._load_wallets() 
         self.login_size = len(self.login_data)
-        self.booking_size = len(self.booking_data)
-        self.user_names = {} 
-        self._load_user_names()
+        self._user_names = None
         self._init_wallet_history_file() 
 
     def _init_wallet_history_file(self):
@@ -56,31 +69,44 @@ class Login:
         except Exception as e:
             print(f"Warning: Could not initialize wallet history - {str(e)}")
 
-    def _load_user_names(self):
-        """Load user names from booking history"""
-        if os.path.exists(self.file2):
-            with open(self.file2, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('UserName') and row.get('UID'):
-                        self.user_names[row['UID']] = row['UserName']
+    @property
+    def user_names(self):
+        """User names from booking history, archived bookings included, loaded on first use"""
+        if self._user_names is None:
+            self._user_names = self.storage.archived_user_names()
+            self._user_names.update(self.snapshot.user_names)
+        return self._user_names
+
+    @property
+    def booking_data(self):
+        if self._booking_data is None:
+            self._booking_data = self.snapshot.booking_rows()
+        return self._booking_data
+
+    @property
+    def booking_size(self):
+        return len(self.booking_data)
+
+    def current_snapshot(self):
+        """Startup snapshot, reloaded if storage has changed since it was read"""
+        if not self.snapshot.is_current():
+            self.snapshot = StartupSnapshot(self.storage)
+        return self.snapshot
 
     def _load_wallets(self):
         self.user_wallets = {}  
-        if os.path.exists(self.file1):
-            with open(self.file1, 'r') as f:
-                reader = csv.reader(f)
-                headers = next(reader, [])
-                wallet_index = headers.index('WalletBalance') if 'WalletBalance' in headers else 2
-                
-                for row in reader:
-                    if row: 
-                        username = row[0]
-                        try:
-                            balance = int(row[wallet_index]) if len(row) > wallet_index else 1000
-                            self.user_wallets[username] = balance
-                        except (ValueError, IndexError):
-                            self.user_wallets[username] = 1000
+        rows = self.login_data
+        headers = rows[0] if rows else []
+        wallet_index = headers.index('WalletBalance') if 'WalletBalance' in headers else 2
+        
+        for row in rows[1:]:
+            if row: 
+                username = row[0]
+                try:
+                    balance = int(row[wallet_index]) if len(row) > wallet_index else 1000
+                    self.user_wallets[username] = balance
+                except (ValueError, IndexError):
+                    self.user_wallets[username] = 1000
 
     def add_to_wallet(self, username, amount, description=""):
         try:
@@ -88,58 +114,13 @@ class Login:
                 print("Invalid username/mobile number")
                 return self.check_balance(username)
 
-            current_balance = self.check_balance(username)
-            new_balance = current_balance + amount
-            
-            self.user_wallets[username] = new_balance
-            
-            wallet_file = 'csvs/user_wallets.csv'
-            wallet_data = []
-            fieldnames = ['Username', 'WalletBalance']
-            
-            if os.path.exists(wallet_file):
-                with open(wallet_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    wallet_data = [row for row in reader if row.get('Username')]
-            
-            user_found = False
-            for record in wallet_data:
-                if record['Username'] == username:
-                    record['WalletBalance'] = str(new_balance)
-                    user_found = True
-                    break
-            
-            if not user_found:
-                wallet_data.append({'Username': username, 'WalletBalance': str(new_balance)})
-            
-            with open(wallet_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for record in wallet_data:
-                    if not record.get('Username'):
-                        continue
-                    writer.writerow({
-                        'Username': record['Username'],
-                        'WalletBalance': record['WalletBalance']
-                    })
-            
-            now = datetime.now()
-            transaction = {
-                'Date': now.strftime('%Y-%m-%d'),
-                'Time': now.strftime('%H:%M:%S'),
-                'Username': username,
-                'Amount': amount,
-                'Balance': new_balance,
-                'Description': description
-            }
-            
-            history_file = self.wallet_history_file
-            file_exists = os.path.exists(history_file)
-            with open(history_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=transaction.keys())
-                if not file_exists or os.stat(history_file).st_size == 0:
-                    writer.writeheader()
-                writer.writerow(transaction)
+            with wallet_lock(username):
+                current_balance = self.check_balance(username)
+                new_balance = current_balance + amount
+
+                transaction = self._wallet_transaction(username, amount, new_balance, description)
+                appended = self.booking_log.append({'type': 'wallet', 'wallet': transaction})
+                self.set_balance(username, new_balance, appended)
             
             print(f"₹{abs(amount):.2f} {'added to' if amount > 0 else 'deducted from'} wallet successfully.")
             print(f"New balance: ₹{new_balance:.2f}")
@@ -149,46 +130,63 @@ class Login:
             print(f"\nError processing transaction: {str(e)}")
             print("Your balance remains unchanged.")
             return current_balance
+
+    def _wallet_transaction(self, username, amount, balance, description=""):
+        now = datetime.now()
+        return {
+            'Date': now.strftime('%Y-%m-%d'),
+            'Time': now.strftime('%H:%M:%S'),
+            'Username': username,
+            'Amount': amount,
+            'Balance': balance,
+            'Description': description
+        }
         
 
-    def get_wallet_history(self, username):
-        """Retrieve and display wallet history for the current user"""
+    def get_wallet_history(self, username, page_size=10):
+        """Retrieve and display wallet history for the current user, newest first, one page at a time"""
         try:
-            transactions = []
-            if os.path.exists(self.wallet_history_file):
-                with open(self.wallet_history_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    if not reader.fieldnames or 'Balance' not in reader.fieldnames:
-                        print("\nWallet history format is invalid")
-                        return
-                        
-                    transactions = [
-                        {
-                            'date': row['Date'],
-                            'time': row['Time'],
-                            'amount': float(row['Amount']),
-                            'balance': float(row['Balance']) if 'Balance' in row else 0,
-                            'description': row.get('Description', '')
-                        }
-                        for row in reader if row.get('Username') == username
-                    ]
-                    transactions.sort(key=lambda x: (x['date'], x['time']), reverse=True)
-            
-            if not transactions:
-                print("\nNo wallet transactions found.")
-                return
+            self.booking_log.sync()
+            page = 0
+            while True:
+                try:
+                    rows = self.storage.latest_wallet_history(username, page_size, skip=page * page_size)
+                except ValueError as e:
+                    print(f"\n{str(e)}")
+                    return
 
-            print("\n" + "="*85)
-            print(f"WALLET TRANSACTION HISTORY: {username}".center(85))
-            print("="*85)
-            print(f"{'Date':<12} | {'Time':<10} | {'Amount':<15} | {'Balance':<15} | {'Description'}")
-            print("-"*85)
-            
-            for t in transactions:
-                amount_str = f"+₹{t['amount']:,.2f}" if t['amount'] >= 0 else f"-₹{abs(t['amount']):,.2f}"
-                print(f"{t['date']:<12} | {t['time']:<10} | {amount_str:<15} | ₹{t['balance']:<14} | {t['description']}")
-            
-            print("="*85)
+                transactions = [
+                    {
+                        'date': row['Date'],
+                        'time': row['Time'],
+                        'amount': float(row['Amount']),
+                        'balance': float(row['Balance']) if row.get('Balance') else 0,
+                        'description': row.get('Description', '')
+                    }
+                    for row in rows
+                ]
+                
+                if not transactions:
+                    print("\nNo wallet transactions found." if page == 0 else "\nNo older transactions.")
+                    return
+
+                print("\n" + "="*85)
+                print(f"WALLET TRANSACTION HISTORY: {username}".center(85))
+                print("="*85)
+                print(f"{'Date':<12} | {'Time':<10} | {'Amount':<15} | {'Balance':<15} | {'Description'}")
+                print("-"*85)
+                
+                for t in transactions:
+                    amount_str = f"+₹{t['amount']:,.2f}" if t['amount'] >= 0 else f"-₹{abs(t['amount']):,.2f}"
+                    print(f"{t['date']:<12} | {t['time']:<10} | {amount_str:<15} | ₹{t['balance']:<14} | {t['description']}")
+                
+                print("="*85)
+
+                if len(transactions) < page_size:
+                    return
+                if input("Show older transactions? (y/n): ").lower() != 'y':
+                    return
+                page += 1
             
         except Exception as e:
             print(f"\nError retrieving wallet history: {str(e)}")
@@ -196,63 +194,61 @@ class Login:
 
     def check_balance(self, username):
         try:
-            # if username in self.user_wallets:
-            #     return self.user_wallets[username]
-            
-            wallet_file = 'csvs/user_wallets.csv'
-            if os.path.exists(wallet_file):
-                with open(wallet_file, 'r') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row.get('Username') == username:
-                            try:
-                                balance = float(row['WalletBalance'])
-                                self.user_wallets[username] = balance
-                                return balance
-                            except (ValueError, KeyError):
-                                continue
-            
-            self.user_wallets[username] = 1000
-            return 1000
+            log_version = self.booking_log.version()
+            if self.booking_log.wallet.refresh_if_changed() or log_version != self._balance_log_version:
+                self._balance_cache.clear()
+                self._balance_log_version = log_version
+
+            if username in self._balance_cache:
+                self.balance_cache_hits += 1
+                return self._balance_cache[username]
+            self.balance_cache_misses += 1
+
+            balance = self.booking_log.balance(username)
+            if balance is None:
+                balance = DEFAULT_BALANCE
+            self.set_balance(username, balance)
+            return balance
             
         except Exception as e:
             print(f"Error checking balance: {e}")
             return 1000
+
+    def set_balance(self, username, balance, appended=None):
+        """Write-through update of the balance cache after a logged wallet change.
+
+        appended is the (before, after) log version returned by the append
+        of that change. When no other process wrote to the log since the
+        cache was last checked, the cache stays valid at the new version.
+        """
+        self._balance_cache[username] = balance
+        self.user_wallets[username] = balance
+        if appended is not None and appended[0] == self._balance_log_version:
+            self._balance_log_version = appended[1]
+
+    def balance_cache_stats(self):
+        return {
+            'hits': self.balance_cache_hits,
+            'misses': self.balance_cache_misses,
+            'size': len(self._balance_cache)
+        }
         
     def _init_files(self):
-        if os.path.exists(self.file1):
-            with open(self.file1, 'r') as f:
-                reader = csv.reader(f)
-                next(reader)
-                for row in reader:
-                    if len(row) == 2:
-                        self.user_wallets[row[0]] = 1000
+        for row in self.login_data[1:]:
+            if len(row) == 2:
+                self.user_wallets[row[0]] = 1000
 
     def load_login_data(self):
-        try:
-            with open(self.file1, 'r') as csvfile:
-                reader1 = csv.reader(csvfile)
-                return list(reader1)
-        except FileNotFoundError:
-            return [['Username', 'Password']]
+        return self.storage.load_login_rows()
 
     def load_booking_data(self):
-        try:
-            with open(self.file2, 'r') as csvfile:
-                reader2 = csv.reader(csvfile)
-                return list(reader2)
-        except FileNotFoundError:
-            return [['Date', 'UserName', 'UID', 'Show_Timing', 'No_of_Seats', 'Seat_Numbers', 'Movie_Name', 'Ticket_Status']]
+        return self.storage.load_booking_rows()
 
     def save_login_data(self):
-        with open(self.file1, 'w', newline='') as csvfile:
-            writer1 = csv.writer(csvfile)
-            writer1.writerows(self.login_data)
+        self.storage.save_login_rows(self.login_data)
 
     def save_booking_data(self):
-        with open(self.file2, 'w', newline='') as csvfile:
-            writer2 = csv.writer(csvfile)
-            writer2.writerows(self.booking_data)
+        self.storage.save_booking_rows(self.booking_data)
 
     def is_validate_mobile_number(self, mobile):
         pattern = r'^[6-9]\d{9}$'
@@ -303,6 +299,7 @@ class Login:
                     print("Admin login successful")
                     self.current_user = "admin"
                     self.is_admin = True
+                    self.booking_log.sync()
                     theatre = Theatre(self)
                     theatre.current_user = username
                     admin = Admin(theatre)
@@ -342,10 +339,8 @@ class Login:
 
     def _get_user_name(self, username):
         """Retrieve user's name from booking history"""
-        if os.path.exists(self.file2):
-            with open(self.file2, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('UID') == username and row.get('UserName'):
-                        return row['UserName']
+        self.booking_log.sync()
+        for row in self.storage.user_bookings(username, archived=True):
+            if row.get('UserName'):
+                return row['UserName']
         return None
@@ -0,0 +1,75 @@
+from utils.seat_map import parse_seat_list
+
+
+def movie_id_index(movie_list):
+    """Map each movie title to its ID; the first listed movie wins when titles repeat"""
+    index = {}
+    for movie_id, movie in movie_list.items():
+        index.setdefault(movie['name'], movie_id)
+    return index
+
+
+def replay_bookings(rows, hall_data, movie_ids, history=None, missing_screen=None):
+    """Mark the seats of every active booking in hall_data and return how many were marked.
+
+    rows are booking dicts in booking_details.csv order. Every row is also
+    appended to history when one is given. missing_screen(screen_id, show_time)
+    is called for screens that are not in hall_data yet so they can be set up.
+    """
+    marked = 0
+    for row in rows:
+        if len(row) < 9:
+            continue
+        if history is not None:
+            history.append(row)
+
+        status = row.get('Ticket_Status') or ''
+        if status != 'booked' and status.lower() != 'booked':
+            continue
+
+        screen_id = row.get('ScreenID')
+        show_time = row.get('Show_Timing')
+        seats = parse_seat_list(row.get('Seat_Numbers') or '[]')
+        if not seats:
+            continue
+
+        screen = hall_data.get(screen_id)
+        if screen is None and missing_screen is not None:
+            missing_screen(screen_id, show_time)
+            screen = hall_data.get(screen_id)
+        if screen is None:
+            continue
+        timing_data = screen['seating'].get(show_time)
+        if timing_data is None:
+            continue
+
+        movie_id = movie_ids.get(row.get('Movie_Name'))
+        if not movie_id:
+            continue
+
+        try:
+            price = float(row.get('Total_Price', 0)) / len(seats)
+        except ValueError:
+            price = None
+
+        seats, booked = timing_data['seat_map'].book_seats(seats)
+        marked += booked
+        if price is None:
+            continue
+
+        booked_seats = timing_data['booked_seats']
+        user_name = row.get('UserName')
+        user_id = row.get('UID')
+        booking_date = row.get('Date')
+        for seat in seats:
+            booked_seats[seat] = {
+                'user_name': user_name,
+                'movie_id': movie_id,
+                'seat': seat,
+                'show_time': show_time,
+                'user_id': user_id,
+                'price_paid': price,
+                'screen_id': screen_id,
+                'booking_date': booking_date
+            }
+    return marked
@@ -0,0 +1,464 @@
+import csv
+import gc
+import io
+import time
+from itertools import islice, repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from utils.schedule import parse_show_key
+from utils.storage import _scan_rows
+
+BOOKING_COLUMNS = [
+    'Date', 'ScreenID', 'Show_Timing', 'Movie_Name', 'Seat_Numbers', 'Total_Price', 'Ticket_Status',
+    'Cancellation_Date'
+]
+EMPTY_SEATS = {'', '[]'}
+BLOCK_SIZE = 1 << 24
+MAX_FIELD_WIDTH = 256
+COMMA = ord(',')
+NEWLINE = ord('\n')
+QUOTE = ord('"')
+RETURN = ord('\r')
+if np is not None:
+    HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+    WORD_MASKS = np.array([(1 << (8 * size)) - 1 for size in range(9)], dtype=np.uint64)
+
+
+class Categories(dict):
+    """Maps each distinct value to a small integer code, assigning codes in order of first appearance"""
+
+    def __missing__(self, value):
+        code = self[value] = len(self)
+        return code
+
+    def labels(self):
+        return list(self)
+
+
+def _codes(values, categories):
+    return np.fromiter(map(categories.__getitem__, values), np.int32, count=len(values))
+
+
+def _floats(values):
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        return np.fromiter(map(_float, values), np.float64, count=len(values))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _seat_counts(values):
+    """Seats per booking from Seat_Numbers, counting separators instead of parsing each list"""
+    commas = np.fromiter(map(str.count, values, repeat(',')), np.int32, count=len(values))
+    empty = np.fromiter(map(EMPTY_SEATS.__contains__, values), np.bool_, count=len(values))
+    return np.where(empty, 0, commas + 1)
+
+
+def _matches(categories, codes, value):
+    """Whether each code's label equals value, ignoring case"""
+    return np.array([label.lower() == value for label in categories.labels()] or [False], dtype=np.bool_)[codes]
+
+
+def _empty_columns(kinds):
+    dtypes = {'category': np.int32, 'float': np.float64, 'seats': np.int32}
+    return [np.zeros(0, dtypes[kind]) for kind, _ in kinds]
+
+
+def _concatenate(parts, kinds):
+    """Join per-chunk column arrays; parts holds one list of column arrays per chunk"""
+    if not parts:
+        return _empty_columns(kinds)
+    return [np.concatenate(column) for column in zip(*parts)]
+
+
+def load_columns(rows, kinds, chunk_size=100000):
+    """Read rows of string values into one NumPy array per column.
+
+    kinds lists a (kind, categories) pair per column: kind is 'category'
+    (int32 codes into the given Categories), 'float' or 'seats' (seat
+    counts). Rows are converted chunk_size at a time, so only one chunk of
+    Python strings is alive at once. The cyclic garbage collector is paused
+    while loading; the row tuples hold only strings, and scanning them over
+    and over made loading about a quarter slower.
+    """
+    parts = []
+    rows = iter(rows)
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            columns = []
+            for (kind, categories), values in zip(kinds, zip(*chunk)):
+                if kind == 'category':
+                    columns.append(_codes(values, categories))
+                elif kind == 'float':
+                    columns.append(_floats(values))
+                else:
+                    columns.append(_seat_counts(values))
+            parts.append(columns)
+    finally:
+        if collecting:
+            gc.enable()
+    return _concatenate(parts, kinds)
+
+
+def _label(raw):
+    """Text of one raw CSV field, without its quotes"""
+    text = raw.decode('utf-8', 'replace')
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        text = text[1:-1].replace('""', '"')
+    return text
+
+
+class Block:
+    """Bytes of complete CSV lines, readable as single bytes and as a little-endian uint64 at every offset"""
+
+    def __init__(self, data):
+        padded = data + bytes(8)
+        self.size = len(data)
+        self.buf = np.frombuffer(padded, dtype=np.uint8)[:self.size]
+        self.words = np.ndarray((self.size,), dtype='<u8', buffer=padded, strides=(1,))
+
+    def word(self, starts, lengths, offset):
+        """Bytes offset to offset+8 of each field as one uint64, zero past the field's end"""
+        word = self.words[np.minimum(starts + offset, self.size - 1)]
+        return word & WORD_MASKS[np.clip(lengths - offset, 0, 8)]
+
+
+def _group(block, starts, ends):
+    """(first, inverse) grouping the fields block.buf[starts[i]:ends[i]] by value.
+
+    first holds one row per distinct value and inverse numbers each row's
+    value. Fields are read as 8-byte integer words and hashed into one
+    integer per row, so the sort behind np.unique is over integers rather
+    than strings; if two different fields share a hash, they are grouped
+    by their words exactly instead.
+    """
+    lengths = ends - starts
+    width = int(lengths.max()) if len(lengths) else 0
+    words = [block.word(starts, lengths, offset) for offset in range(0, max(width, 1), 8)]
+    key = words[0]
+    for word in words[1:]:
+        key = key * HASH_MULTIPLIER + word
+    values, inverse = np.unique(key, return_inverse=True)
+    first = np.empty(len(values), dtype=np.intp)
+    first[inverse] = np.arange(len(key))
+    if len(words) > 1 and not all((word[first][inverse] == word).all() for word in words):
+        _, first, inverse = np.unique(np.stack(words, axis=1), axis=0, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def _distinct(block, starts, ends, convert, dtype):
+    """convert() applied once per distinct field value, spread back over every row"""
+    first, inverse = _group(block, starts, ends)
+    return np.array([
+        convert(_label(bytes(block.buf[starts[row]:ends[row]]))) for row in first.tolist()
+    ], dtype=dtype)[inverse]
+
+
+def _matching_ids(block, starts, ends, wanted):
+    """Rows whose field is one of the wanted strings, as (row, text) pairs"""
+    keys = np.array([
+        int.from_bytes(key.encode('utf-8')[:8].ljust(8, b'\0'), 'little') for key in wanted
+    ], dtype=np.uint64)
+    candidates = np.flatnonzero(np.isin(block.word(starts, ends - starts, 0), keys))
+    matches = []
+    for row in candidates.tolist():
+        text = _label(bytes(block.buf[starts[row]:ends[row]]))
+        if text in wanted:
+            matches.append((row, text))
+    return matches
+
+
+def _block_columns(block, columns, kinds, fields, width, id_position, statuses, skip):
+    """Column arrays for one Block, or None if it needs the csv module.
+
+    Commas and newlines count as separators unless an odd number of quotes
+    precedes them. Every line must then have exactly as many fields as the
+    header, so the separator positions reshape into one row per line.
+    """
+    buf = block.buf
+    special = np.flatnonzero((buf == COMMA) | (buf == NEWLINE) | (buf == QUOTE))
+    chars = buf[special]
+    is_quote = chars == QUOTE
+    quoted = (np.cumsum(is_quote, dtype=np.int32) & 1).astype(np.bool_)
+    is_separator = ~quoted & ~is_quote
+    separators = special[is_separator]
+    if len(separators) % width or not (chars[is_separator][width - 1::width] == NEWLINE).all():
+        return None
+
+    ends = separators.reshape(-1, width)
+    starts = np.empty_like(ends)
+    starts.flat[0] = 0
+    starts.flat[1:] = separators[:-1] + 1
+    last = ends[:, -1]
+    ends[:, -1] = np.where((last > starts[:, -1]) & (buf[last - 1] == RETURN), last - 1, last)
+    if int((ends - starts).max()) > MAX_FIELD_WIDTH:
+        return None
+
+    keep = None
+    overrides = {}
+    if id_position is not None:
+        wanted = set(statuses or ()) | set(skip or ())
+        for row, booking_id in _matching_ids(block, starts[:, id_position], ends[:, id_position], wanted):
+            if skip and booking_id in skip:
+                if keep is None:
+                    keep = np.ones(len(ends), dtype=np.bool_)
+                keep[row] = False
+            elif statuses and booking_id in statuses:
+                overrides[row] = statuses[booking_id]
+
+    result = []
+    for (kind, categories), field, column in zip(kinds, fields, columns):
+        if column is None:
+            if kind == 'float':
+                result.append(np.zeros(len(ends), dtype=np.float64))
+            else:
+                result.append(np.full(len(ends), categories[''] if kind == 'category' else 0, dtype=np.int32))
+            continue
+        field_starts, field_ends = starts[:, column], ends[:, column]
+        if kind == 'seats':
+            inner_commas = special[quoted & (chars == COMMA)]
+            content_starts = field_starts + (buf[np.minimum(field_starts, len(buf) - 1)] == QUOTE)
+            lengths = field_ends - content_starts - (buf[field_ends - 1] == QUOTE)
+            empty = (lengths <= 0) | ((lengths == 2) & (buf[content_starts] == ord('[')))
+            commas = np.searchsorted(inner_commas, field_ends) - np.searchsorted(inner_commas, field_starts)
+            result.append(np.where(empty, 0, commas + 1).astype(np.int32))
+        elif kind == 'category':
+            values = _distinct(block, field_starts, field_ends, categories.__getitem__, np.int32)
+            for row, update in overrides.items():
+                if field in update:
+                    values[row] = categories[update[field]]
+            result.append(values)
+        else:
+            result.append(_distinct(block, field_starts, field_ends, _float, np.float64))
+
+    if keep is not None:
+        result = [values[keep] for values in result]
+    return result
+
+
+def _line_end(block):
+    """Length of block up to its last line end outside quotes, 0 if it holds no complete line"""
+    cut = len(block)
+    while True:
+        cut = block.rfind(b'\n', 0, cut)
+        if cut < 0 or block.count(b'"', 0, cut) % 2 == 0:
+            return cut + 1
+
+
+def read_csv_columns(f, fields, kinds, statuses=None, skip=None, block_size=BLOCK_SIZE):
+    """Read the given fields of a CSV file opened in binary mode into one NumPy array per column.
+
+    kinds is as for load_columns(), and statuses and skip act as they do
+    for storage.scan_bookings(). The file is read block_size bytes at a
+    time, each block cut after its last line end outside quotes, and the
+    fields are located with array operations over the raw bytes instead of
+    the csv module. Each distinct value is decoded once, so Python code runs
+    per distinct value rather than per row. A block that does not split
+    cleanly (short rows, blank lines, very wide fields) is read through
+    storage's row scanner instead.
+    """
+    header_line = f.readline()
+    header = next(csv.reader([header_line.decode('utf-8', 'replace')]), [])
+    columns = [header.index(field) if field in header else None for field in fields]
+    id_position = header.index('BookingID') if 'BookingID' in header and (statuses or skip) else None
+
+    parts = []
+    rest = b''
+    while True:
+        data = f.read(block_size)
+        if not data and not rest:
+            break
+        block = rest + data
+        if data:
+            cut = _line_end(block)
+            if not cut:
+                rest = block
+                continue
+            block, rest = block[:cut], block[cut:]
+        else:
+            rest = b''
+            if not block.endswith(b'\n'):
+                block += b'\n'
+
+        part = _block_columns(Block(block), columns, kinds, fields, len(header), id_position, statuses, skip)
+        if part is None:
+            text = io.StringIO((header_line + block).decode('utf-8', 'replace'), newline='')
+            part = load_columns(_scan_rows(text, fields, statuses, skip), kinds)
+        parts.append(part)
+    return _concatenate(parts, kinds)
+
+
+class Reports:
+    """Revenue, refund, occupancy and cancellation reports over every booking.
+
+    Bookings (archived ones included) are loaded once into column arrays,
+    with screens, shows, movies, statuses and dates held as integer codes;
+    CSV files are parsed with read_csv_columns(), other storage through
+    scan_bookings(). Each report combines the codes of its grouping columns
+    into one integer key and sums with np.unique and np.bincount, so no
+    Python code runs per row once the data is loaded. Revenue is counted on
+    the booking date. A cancelled booking refunds its Total_Price to the
+    same movie on its cancellation date (the booking date when that is
+    missing), so refunds follow the booking rather than wallet text.
+    """
+
+    def __init__(self, storage, catalog):
+        if np is None:
+            raise RuntimeError("Reports need NumPy; install it with 'pip install numpy'")
+        self.storage = storage
+        self.catalog = catalog
+        self.dates = Categories()
+        self.screens = Categories()
+        self.shows = Categories()
+        self.movies = Categories()
+        self.statuses = Categories()
+        self.load_time = 0.0
+
+    def _load_bookings(self, kinds):
+        sources = self.storage.booking_sources()
+        if sources is None:
+            return load_columns(self.storage.scan_bookings(BOOKING_COLUMNS), kinds)
+        parts = []
+        for file_name, opener, statuses, skip in sources:
+            with opener(file_name, 'rb') as f:
+                parts.append(read_csv_columns(f, BOOKING_COLUMNS, kinds, statuses, skip))
+        return _concatenate(parts, kinds)
+
+    def load(self):
+        start = time.perf_counter()
+        (self.booking_date, self.screen, self.show, self.movie,
+         self.seats, self.price, self.status, cancel_date) = self._load_bookings([
+            ('category', self.dates), ('category', self.screens), ('category', self.shows),
+            ('category', self.movies), ('seats', None), ('float', None), ('category', self.statuses),
+            ('category', self.dates),
+        ])
+
+        self.booked = _matches(self.statuses, self.status, 'booked')
+        self.cancelled = _matches(self.statuses, self.status, 'cancelled')
+        undated = np.array([not label for label in self.dates.labels()] or [False], dtype=np.bool_)[cancel_date]
+        self.refund_date = np.where(undated, self.booking_date, cancel_date)[self.cancelled]
+        self.refund_movie = self.movie[self.cancelled]
+        self.refund_amount = self.price[self.cancelled]
+        self.load_time = time.perf_counter() - start
+        return self
+
+    def _date_mask(self, since):
+        """Per date code, whether the date is on or after since (an ISO date string, or None for all)"""
+        return np.array([since is None or label >= since for label in self.dates.labels()], dtype=np.bool_)
+
+    def revenue_by_movie_day(self, since=None):
+        """(date, movie, bookings, gross, refunds, net) per day and movie with any sales or refunds"""
+        days = len(self.dates)
+        sales = len(self.movie)
+        groups, inverse = np.unique(np.concatenate([
+            self.movie.astype(np.int64) * days + self.booking_date,
+            self.refund_movie.astype(np.int64) * days + self.refund_date,
+        ]), return_inverse=True)
+        bookings = np.bincount(inverse[:sales], minlength=len(groups))
+        gross = np.bincount(inverse[:sales], weights=self.price, minlength=len(groups))
+        refunds = np.bincount(inverse[sales:], weights=self.refund_amount, minlength=len(groups))
+
+        dates = self.dates.labels()
+        movies = self.movies.labels()
+        in_range = self._date_mask(since)[groups % days]
+        return sorted(
+            (dates[key % days], movies[key // days], int(bookings[group]), float(gross[group]),
+             float(refunds[group]), float(gross[group] - refunds[group]))
+            for group, key in enumerate(groups.tolist()) if in_range[group]
+        )
+
+    def _capacities(self):
+        """Seats per screen, taken from the active row when screens.csv lists a screen more than once"""
+        capacities = {}
+        for row in self.catalog.screens():
+            try:
+                seats = int(row['Rows']) * int(row['Columns'])
+            except (TypeError, ValueError, KeyError):
+                continue
+            if row['ScreenID'] not in capacities or row.get('Status', '').lower() == 'active':
+                capacities[row['ScreenID']] = seats
+        return capacities
+
+    def occupancy_by_show(self, since=None):
+        """(screen, show, seats sold, capacity, occupancy %) per show with booked seats; capacity is None for unknown screens"""
+        shows = len(self.shows)
+        groups, inverse = np.unique(self.screen[self.booked].astype(np.int64) * shows + self.show[self.booked],
+                                    return_inverse=True)
+        sold = np.bincount(inverse, weights=self.seats[self.booked], minlength=len(groups))
+
+        capacities = self._capacities()
+        screens = self.screens.labels()
+        show_labels = self.shows.labels()
+        rows = []
+        for group, key in enumerate(groups.tolist()):
+            screen_id, show_time = screens[key // shows], show_labels[key % shows]
+            try:
+                show_date, minute = parse_show_key(show_time)
+            except ValueError:
+                show_date, minute = None, -1
+            if since is not None and (show_date is None or show_date.isoformat() < since):
+                continue
+            capacity = capacities.get(screen_id)
+            occupancy = float(sold[group] * 100 / capacity) if capacity else None
+            rows.append(((screen_id, show_date.isoformat() if show_date else '', minute),
+                         (screen_id, show_time, int(sold[group]), capacity, occupancy)))
+        return [row for _, row in sorted(rows)]
+
+    def cancellation_by_movie(self, since=None):
+        """(movie, bookings, cancelled, cancellation %, refunds) per movie, over bookings made on or after since"""
+        in_range = self._date_mask(since)[self.booking_date]
+        size = len(self.movies)
+        bookings = np.bincount(self.movie[in_range], minlength=size)
+        cancelled = np.bincount(self.movie[in_range & self.cancelled], minlength=size)
+        refunded = self._date_mask(since)[self.refund_date]
+        refunds = np.bincount(self.refund_movie[refunded], weights=self.refund_amount[refunded], minlength=size)
+
+        movies = self.movies.labels()
+        return sorted(
+            (movies[code], int(bookings[code]), int(cancelled[code]),
+             float(cancelled[code] * 100 / bookings[code]) if bookings[code] else 0.0, float(refunds[code]))
+            for code in np.flatnonzero((bookings > 0) | (refunds != 0)).tolist()
+        )
+
+    def report(self, since=None):
+        print("\n" + "="*83)
+        title = "REVENUE & OCCUPANCY REPORT" + (f" (FROM {since})" if since else "")
+        print(title.center(83))
+        print("="*83)
+        print(f"{len(self.price):,} bookings loaded in {self.load_time:.2f}s")
+
+        print("\n--- Revenue per Movie per Day ---")
+        print(f"{'Date':<12} | {'Movie':<25} | {'Bookings':>8} | {'Gross':>10} | {'Refunds':>10} | {'Net':>10}")
+        print("-"*83)
+        for day, movie, bookings, gross, refunds, net in self.revenue_by_movie_day(since):
+            print(f"{day:<12} | {movie[:25]:<25} | {bookings:>8,} | {gross:>10,.2f} | {refunds:>10,.2f} | {net:>10,.2f}")
+
+        print("\n--- Occupancy per Screen per Show ---")
+        print(f"{'Screen':<8} | {'Show':<16} | {'Sold':>6} | {'Capacity':>8} | {'Occupancy':>9}")
+        print("-"*83)
+        for screen_id, show_time, sold, capacity, occupancy in self.occupancy_by_show(since):
+            capacity_text = f"{capacity:>8}" if capacity else f"{'-':>8}"
+            occupancy_text = f"{occupancy:>8.1f}%" if occupancy is not None else f"{'-':>9}"
+            print(f"{screen_id:<8} | {show_time:<16} | {sold:>6,} | {capacity_text} | {occupancy_text}")
+
+        print("\n--- Cancellations per Movie ---")
+        print(f"{'Movie':<25} | {'Bookings':>8} | {'Cancelled':>9} | {'Rate':>7} | {'Refunds':>10}")
+        print("-"*83)
+        for movie, bookings, cancelled, rate, refunds in self.cancellation_by_movie(since):
+            print(f"{movie[:25]:<25} | {bookings:>8,} | {cancelled:>9,} | {rate:>6.1f}% | {refunds:>10,.2f}")
+        print("="*83)
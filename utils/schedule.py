@@ -0,0 +1,98 @@
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+SELL_AHEAD_DAYS = 7
+
+
+def parse_time(text):
+    """Minute of the day for 'H:MM' or 'HH:MM'; raises ValueError for anything else"""
+    hours, sep, minutes = str(text).strip().partition(':')
+    if not sep or not hours.isdigit() or len(minutes) != 2 or not minutes.isdigit():
+        raise ValueError(f"Invalid show time: {text}")
+    hours, minutes = int(hours), int(minutes)
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"Invalid show time: {text}")
+    return hours * 60 + minutes
+
+
+def format_time(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def show_key(show_date, minute):
+    """Key of one dated show, e.g. '2025-07-08 09:30'; used wherever a show time string is stored"""
+    return f"{show_date.isoformat()} {format_time(minute)}"
+
+
+def parse_show_key(key):
+    """(date, minute) of a show key; date is None for undated keys written before shows had dates"""
+    day, sep, clock = str(key).strip().partition(' ')
+    if not sep:
+        return None, parse_time(day)
+    return date.fromisoformat(day), parse_time(clock)
+
+
+def selling_dates(today=None, days=SELL_AHEAD_DAYS):
+    today = today or date.today()
+    return [today + timedelta(days=offset) for offset in range(days)]
+
+
+class Schedule:
+    """Daily show times per screen, as sorted minutes of the day.
+
+    Timings from screens.csv are normalised on the way in, so '9:30' and
+    '09:30' are the same show. A show on a given day is identified by
+    (screen, date, minute) and keyed by show_key(); next_shows() answers
+    "what is on next" with a bisect into the screen's sorted times.
+    """
+
+    def __init__(self, screens=None):
+        self.times = {}
+        for screen_id, screen in (screens or {}).items():
+            self.set_times(screen_id, screen.get('timings', []))
+
+    def set_times(self, screen_id, timings):
+        """Replace a screen's daily times; unparseable entries are skipped with a warning"""
+        minutes = set()
+        for timing in timings:
+            if not str(timing).strip():
+                continue
+            try:
+                minutes.add(parse_time(timing))
+            except ValueError as e:
+                print(f"[Warning] Screen {screen_id}: {str(e)}")
+        self.times[screen_id] = sorted(minutes)
+
+    def remove(self, screen_id):
+        self.times.pop(screen_id, None)
+
+    def timings(self, screen_id):
+        return [format_time(minute) for minute in self.times.get(screen_id, [])]
+
+    def shows_on(self, screen_id, show_date, after=None):
+        """Show keys for one screen on one date, only those starting after the given minute if set"""
+        minutes = self.times.get(screen_id, [])
+        start = bisect_left(minutes, after + 1) if after is not None else 0
+        return [show_key(show_date, minute) for minute in minutes[start:]]
+
+    def next_shows(self, screen_id, now=None, days=SELL_AHEAD_DAYS, limit=None):
+        """Upcoming show keys for a screen from now through the selling window, in order"""
+        now = now or datetime.now()
+        keys = []
+        for offset, show_date in enumerate(selling_dates(now.date(), days)):
+            after = now.hour * 60 + now.minute if offset == 0 else None
+            keys.extend(self.shows_on(screen_id, show_date, after))
+            if limit is not None and len(keys) >= limit:
+                return keys[:limit]
+        return keys
+
+    def is_scheduled(self, screen_id, key):
+        try:
+            show_date, minute = parse_show_key(key)
+        except ValueError:
+            return False
+        if show_date is None:
+            return False
+        minutes = self.times.get(screen_id, [])
+        index = bisect_left(minutes, minute)
+        return index < len(minutes) and minutes[index] == minute
@@ -0,0 +1,200 @@
+import mmap
+import os
+import struct
+from contextlib import ExitStack
+
+from utils.locks import file_lock, show_lock
+from utils.seat_map import COUNTER, SeatMap
+
+MAGIC = b'TBSI'
+FORMAT_VERSION = 4
+HEADER = struct.Struct('<4sHHI')
+ENTRY = struct.Struct('<32s32sHHIII')
+COUNTER_FIELD = ENTRY.size - COUNTER.size
+
+
+def _pack_name(value):
+    return value.encode('utf-8')[:32]
+
+
+def _unmap(mapping):
+    """Close a mapping no seat map uses any more.
+
+    While seat maps over it are still referenced somewhere, closing fails
+    and the mapping is left to go away with the last of them.
+    """
+    if mapping is None:
+        return
+    try:
+        mapping.close()
+    except BufferError:
+        pass
+
+
+class SeatInventory:
+    """Fixed-layout binary seat file shared by every process through mmap.
+
+    The file starts with a header holding the number of shows, followed by
+    one record per (screen, show): an entry with screen ID, show time, rows,
+    cols, the offset of the show's seats and its SeatMap counter block
+    (booked seats and version), then the seats as one byte each. New shows
+    are appended as further records, so existing seats never move. Every
+    SeatMap handed out by attach() is a view into the mapping, so a booking
+    or cancellation flips the byte in the file itself and other processes
+    see it on their next read.
+    """
+
+    def __init__(self, file_name='csvs/seat_inventory.bin'):
+        self.file_name = file_name
+        self._mmap = None
+        self._inode = None
+
+    def _layout(self, hall_data):
+        entries = []
+        for screen_id, screen_data in hall_data.items():
+            for show_time, timing_data in screen_data['seating'].items():
+                seat_map = timing_data['seat_map']
+                entries.append((screen_id, show_time, seat_map.rows, seat_map.cols))
+        return entries
+
+    def _read_layout(self, data):
+        """(entries, offsets, end) of the records in data, or None if it is not a readable inventory"""
+        if len(data) < HEADER.size:
+            return None
+        magic, version, _, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+
+        entries = []
+        offsets = []
+        position = HEADER.size
+        for _ in range(count):
+            if position + ENTRY.size > len(data):
+                return None
+            screen_id, show_time, rows, cols, offset, _, _ = ENTRY.unpack_from(data, position)
+            position = offset + rows * cols
+            if position > len(data):
+                return None
+            entries.append((
+                screen_id.rstrip(b'\0').decode('utf-8'),
+                show_time.rstrip(b'\0').decode('utf-8'),
+                rows,
+                cols
+            ))
+            offsets.append(offset)
+        return entries, offsets, position
+
+    def _records(self, shows, position):
+        """Pack (entry, seat bytes) pairs into records starting at position in the file"""
+        records = []
+        for (screen_id, show_time, rows, cols), seats in shows:
+            booked = len(seats) - bytes(seats).count(0)
+            position += ENTRY.size
+            records.append(ENTRY.pack(_pack_name(screen_id), _pack_name(show_time), rows, cols, position, booked, 0))
+            records.append(seats)
+            position += rows * cols
+        return records
+
+    def _write(self, shows):
+        """Write a new file from (entry, seat bytes) pairs and swap it in"""
+        temp_file = f'{self.file_name}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(b''.join([HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(shows))] + self._records(shows, HEADER.size)))
+        os.replace(temp_file, self.file_name)
+
+    def _append(self, shows, count, end):
+        """Add records after the last one in place, then count them in the header.
+
+        The file keeps its inode and existing seats keep their offsets, so
+        maps other processes hold stay valid. Bytes past end are left over
+        from an append that died before updating the header and are
+        overwritten.
+        """
+        with open(self.file_name, 'r+b') as f:
+            f.seek(end)
+            f.write(b''.join(self._records(shows, end)))
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count + len(shows)))
+
+    def attach(self, hall_data, rebuild=False):
+        """Back every seat map in hall_data with the shared file.
+
+        Shows already in the file keep the seat bytes stored there, since
+        other processes update them in place; shows missing from the file are
+        appended from hall_data without moving the others. rebuild=True
+        writes a new file from hall_data alone, for when the admin has added
+        or removed shows. Seats are only flipped under their show lock after
+        checking the file was not replaced, so a rebuild holds every show
+        lock (in sorted order, like batch bookings) and no flip made through
+        the old mapping can land after its seats were copied.
+        """
+        with ExitStack() as stack:
+            if rebuild:
+                for screen_id, show_time, _, _ in sorted(self._layout(hall_data)):
+                    stack.enter_context(show_lock(screen_id, show_time))
+            stack.enter_context(file_lock('seat_inventory'))
+            self._attach(hall_data, rebuild)
+
+    def _attach(self, hall_data, rebuild):
+        entries = self._layout(hall_data)
+        layout = None
+        if not rebuild and os.path.exists(self.file_name):
+            with open(self.file_name, 'rb') as f:
+                data = f.read()
+            layout = self._read_layout(data)
+
+        if layout is None:
+            self._write([
+                (entry, hall_data[entry[0]]['seating'][entry[1]]['seat_map'].to_bytes())
+                for entry in entries
+            ])
+        else:
+            known = set(layout[0])
+            missing = [entry for entry in entries if entry not in known]
+            if missing:
+                self._append([
+                    (entry, hall_data[entry[0]]['seating'][entry[1]]['seat_map'].to_bytes())
+                    for entry in missing
+                ], len(layout[0]), layout[2])
+
+        old_mmap = self._mmap
+        with open(self.file_name, 'r+b') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0)
+            self._inode = os.fstat(f.fileno()).st_ino
+        view = memoryview(self._mmap)
+
+        file_entries, offsets, _ = self._read_layout(self._mmap)
+        positions = {
+            entry: (offset, offset - ENTRY.size + COUNTER_FIELD)
+            for entry, offset in zip(file_entries, offsets)
+        }
+        for entry in entries:
+            screen_id, show_time, rows, cols = entry
+            offset, counter_offset = positions[entry]
+            seat_map = SeatMap.over(view[offset:offset + rows * cols], rows, cols, self._mmap, counter_offset)
+            # A process that died between flipping a seat and bumping the counter leaves it off by one
+            seat_map.recount()
+            hall_data[screen_id]['seating'][show_time]['seat_map'] = seat_map
+        _unmap(old_mmap)
+
+    def is_attached(self):
+        return self._mmap is not None
+
+    def is_stale(self):
+        """True when another process has rebuilt the file since it was mapped"""
+        try:
+            return os.stat(self.file_name).st_ino != self._inode
+        except OSError:
+            return True
+
+    def flush(self):
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self):
+        """Flush and drop the mapping; seat maps handed out by attach() keep it until they are gone"""
+        self.flush()
+        mapping, self._mmap, self._inode = self._mmap, None, None
+        _unmap(mapping)
@@ -0,0 +1,256 @@
+import struct
+
+AVAILABLE = 0
+BOOKED = 1
+COUNTER = struct.Struct('<II')
+
+
+def row_label(row):
+    return chr(65 + row)
+
+
+def parse_seat(seat):
+    """Split a seat label such as 'B3' into (row_index, col_index)"""
+    return ord(seat[0].upper()) - 65, int(seat[1:])
+
+
+def row_runs(row):
+    """Free runs of one row's seat bytes as (longest, ((start_col, length), ...))"""
+    runs = []
+    col = 0
+    for chunk in row.split(b'\x01'):
+        if chunk:
+            runs.append((col, len(chunk)))
+        col += len(chunk) + 1
+    return max((length for _, length in runs), default=0), tuple(runs)
+
+
+def parse_seat_list(text):
+    """Parse a Seat_Numbers cell such as "['A3', 'B5']" or a bare 'A3'; None if malformed"""
+    text = text.strip()
+    if not text.startswith('['):
+        return [text]
+    if not text.endswith(']'):
+        return None
+    inner = text[1:-1].strip()
+    if not inner:
+        return []
+    parts = inner.split(',')
+    if inner.count("'") + inner.count('"') != 2 * len(parts):
+        return None
+    return [part.strip()[1:-1] for part in parts]
+
+
+class SeatMap:
+    """Seat state for one show, stored as one byte per seat in a flat buffer.
+
+    Row r starts at offset r * cols, so testing or flipping a seat is a single
+    index operation. The buffer is a private bytearray, or a writable
+    memoryview when the map is a view into the shared seat inventory (see
+    SeatMap.over).
+
+    Every mutation updates a small counter block holding the number of
+    booked seats and a version that increases on each change, so
+    available/booked are O(1) reads and callers can cache anything derived
+    from the seats by version. For shared maps the block lives in the
+    inventory file next to the seats, so all processes see the same values.
+
+    free_runs() keeps a per-row index of free seat runs. A change made
+    through the map drops only its row from the index; when the version
+    shows another process changed the seats, rows whose bytes differ from
+    the indexed ones are rescanned.
+    """
+
+    def __init__(self, rows, cols, data=None):
+        self.rows = rows
+        self.cols = cols
+        if data is None:
+            self._seats = bytearray(rows * cols)
+        else:
+            if len(data) != rows * cols:
+                raise ValueError(f"Seat data has {len(data)} seats, expected {rows * cols}")
+            self._seats = bytearray(data)
+        self._counter = bytearray(COUNTER.size)
+        self._counter_offset = 0
+        self._runs = None
+        self.recount()
+
+    @classmethod
+    def over(cls, buffer, rows, cols, counter=None, counter_offset=0):
+        """Wrap a writable buffer of rows * cols bytes without copying it.
+
+        counter is a writable buffer holding the counter block at
+        counter_offset; without one the map keeps a private block.
+        """
+        if len(buffer) != rows * cols:
+            raise ValueError(f"Seat data has {len(buffer)} seats, expected {rows * cols}")
+        seat_map = cls.__new__(cls)
+        seat_map.rows = rows
+        seat_map.cols = cols
+        seat_map._seats = buffer
+        seat_map._runs = None
+        if counter is None:
+            seat_map._counter = bytearray(COUNTER.size)
+            seat_map._counter_offset = 0
+            seat_map.recount()
+        else:
+            seat_map._counter = counter
+            seat_map._counter_offset = counter_offset
+        return seat_map
+
+    @property
+    def shared(self):
+        """True when the seats are a view into the shared seat inventory"""
+        return isinstance(self._seats, memoryview)
+
+    def recount(self):
+        """Recount booked seats from the buffer; returns True if the counter was wrong"""
+        booked = self.capacity - bytes(self._seats).count(AVAILABLE)
+        if booked == self.booked:
+            return False
+        self._set_booked(booked)
+        return True
+
+    def _set_booked(self, booked):
+        version = COUNTER.unpack_from(self._counter, self._counter_offset)[1]
+        COUNTER.pack_into(self._counter, self._counter_offset, booked, (version + 1) & 0xFFFFFFFF)
+
+    def _update(self, booked, rows):
+        """Store a new booked count after seats in rows changed, keeping the run index in step"""
+        in_step = self._runs is not None and self._runs_version == self.version
+        self._set_booked(booked)
+        if in_step:
+            for row in rows:
+                self._runs[row] = None
+            self._runs_version = self.version
+
+    def free_runs(self):
+        """Per-row index of free seat runs: one row_runs() entry per row; callers must not modify it"""
+        if self._runs is None:
+            self._runs = [None] * self.rows
+            self._run_rows = [None] * self.rows
+        elif self._runs_version != self.version:
+            for row in range(self.rows):
+                if self._run_rows[row] != self.row(row):
+                    self._runs[row] = None
+        self._runs_version = self.version
+        for row, runs in enumerate(self._runs):
+            if runs is None:
+                data = self.row(row)
+                self._run_rows[row] = data
+                self._runs[row] = row_runs(data)
+        return self._runs
+
+    @property
+    def version(self):
+        """Changes whenever any seat of the map changes"""
+        return COUNTER.unpack_from(self._counter, self._counter_offset)[1]
+
+    def _offset(self, row, col):
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Seat {row_label(row)}{col} is outside a {self.rows}x{self.cols} hall")
+        return row * self.cols + col
+
+    @property
+    def capacity(self):
+        return self.rows * self.cols
+
+    @property
+    def available(self):
+        return self.capacity - self.booked
+
+    @property
+    def booked(self):
+        return COUNTER.unpack_from(self._counter, self._counter_offset)[0]
+
+    def is_booked(self, row, col):
+        return self._seats[self._offset(row, col)] != AVAILABLE
+
+    def book(self, row, col):
+        """Mark a seat booked; returns False if it already was"""
+        offset = self._offset(row, col)
+        if self._seats[offset] != AVAILABLE:
+            return False
+        self._seats[offset] = BOOKED
+        self._update(self.booked + 1, (row,))
+        return True
+
+    def free(self, row, col):
+        """Mark a seat available; returns False if it already was"""
+        offset = self._offset(row, col)
+        if self._seats[offset] == AVAILABLE:
+            return False
+        self._seats[offset] = AVAILABLE
+        self._update(self.booked - 1, (row,))
+        return True
+
+    def is_seat_booked(self, seat):
+        return self.is_booked(*parse_seat(seat))
+
+    def book_seat(self, seat):
+        return self.book(*parse_seat(seat))
+
+    def free_seat(self, seat):
+        return self.free(*parse_seat(seat))
+
+    def book_seats(self, seats):
+        """Book seats by label in one pass; returns (valid labels, number newly booked)"""
+        data = self._seats
+        rows = self.rows
+        cols = self.cols
+        valid = []
+        changed = set()
+        booked = 0
+        for seat in seats:
+            try:
+                row = ord(seat[0].upper()) - 65
+                col = int(seat[1:])
+            except (ValueError, IndexError, TypeError):
+                continue
+            if not (0 <= row < rows and 0 <= col < cols):
+                continue
+            offset = row * cols + col
+            if data[offset] == AVAILABLE:
+                data[offset] = BOOKED
+                changed.add(row)
+                booked += 1
+            valid.append(seat)
+        if booked:
+            self._update(self.booked + booked, changed)
+        return valid, booked
+
+    def reset(self):
+        self._seats[:] = bytes(self.capacity)
+        self._update(0, range(self.rows))
+
+    def row(self, row):
+        """Seat states of one row as a bytes object"""
+        start = row * self.cols
+        return bytes(self._seats[start:start + self.cols])
+
+    def row_labels(self):
+        return [row_label(r) for r in range(self.rows)]
+
+    def col_labels(self):
+        return [str(c) for c in range(self.cols)]
+
+    def row_tokens(self, row):
+        """Serialize a row in the hall_data.csv SeatStatus format ('0' or 'X' per seat)"""
+        return ','.join('X' if s else '0' for s in self.row(row))
+
+    def load_row_tokens(self, row, tokens):
+        start = row * self.cols
+        before = self.row(row).count(AVAILABLE)
+        for col, token in enumerate(tokens.split(',')[:self.cols]):
+            self._seats[start + col] = BOOKED if token.strip() == 'X' else AVAILABLE
+        self._update(self.booked + before - self.row(row).count(AVAILABLE), (row,))
+
+    def copy(self):
+        return SeatMap(self.rows, self.cols, self._seats)
+
+    def to_bytes(self):
+        return bytes(self._seats)
+
+    @classmethod
+    def from_bytes(cls, rows, cols, data):
+        return cls(rows, cols, data)
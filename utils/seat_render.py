@@ -0,0 +1,62 @@
+import sys
+
+from utils.seat_map import parse_seat
+
+CELLS = bytes.maketrans(b'\x00\x01', b'.X')
+
+
+class SeatGridRenderer:
+    """Renders seat grids as text and caches them per show.
+
+    A cached grid is reused while the show's SeatMap is the same object at
+    the same version and the same marks are overlaid, so redrawing an
+    unchanged show costs a dict lookup. Booking, cancelling or resetting any
+    seat of the show (in this or another process) bumps the version and the
+    next render rebuilds only that show's grid.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, screen_id, show_time, timing_data, marks=None):
+        """Grid text for one show; marks maps seat labels to a character drawn over the seat"""
+        seat_map = timing_data['seat_map']
+        marks_key = frozenset(marks.items()) if marks else None
+        cached = self._cache.get((screen_id, show_time))
+        if cached and cached[0] is seat_map and cached[1] == seat_map.version and cached[2] == marks_key:
+            self.hits += 1
+            return cached[3]
+
+        self.misses += 1
+        version = seat_map.version
+        text = self._build(timing_data, marks)
+        self._cache[(screen_id, show_time)] = (seat_map, version, marks_key, text)
+        return text
+
+    def _build(self, timing_data, marks):
+        seat_map = timing_data['seat_map']
+        marks_by_row = {}
+        for seat, mark in (marks or {}).items():
+            try:
+                row, col = parse_seat(seat)
+            except (ValueError, IndexError):
+                continue
+            marks_by_row.setdefault(row, {})[col] = mark
+
+        lines = ["   " + " ".join(f"{col:>2}" for col in timing_data['available_cols'])]
+        for row_index, row_label in enumerate(timing_data['available_rows']):
+            cells = seat_map.row(row_index).translate(CELLS).decode('ascii')
+            if row_index in marks_by_row:
+                cells = list(cells)
+                for col, mark in marks_by_row[row_index].items():
+                    if 0 <= col < len(cells):
+                        cells[col] = mark
+            lines.append(f"{row_label}:  " + "  ".join(cells))
+        return "\n".join(lines) + "\n"
+
+    def show(self, screen_id, show_time, timing_data, marks=None):
+        """Write the grid to stdout in a single write"""
+        sys.stdout.write(self.render(screen_id, show_time, timing_data, marks))
+        sys.stdout.flush()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.service import BookingService
+
+SESSION_OPS = {'hold', 'release', 'book', 'book_batch', 'bookings', 'cancel', 'balance', 'history'}
+LINE_LIMIT = 2 ** 16
+
+
+class BookingServer:
+    """Line-delimited JSON front end for BookingService.
+
+    Each request is one JSON object per line, {"op": ..., ...params}, and
+    gets one response line, {"ok": true, "result": ...} or
+    {"ok": false, "error": "..."}. "login" binds a user to the connection;
+    the user operations in SESSION_OPS then act on that user. Service calls
+    wait on file locks and fsync, so they run on a single worker thread:
+    the event loop keeps reading and writing for every client meanwhile,
+    and requests are still applied one at a time without extra locking
+    inside the process. A request line longer than line_limit bytes is
+    skipped and answered with an error.
+    """
+
+    def __init__(self, service=None, host='127.0.0.1', port=8765, socket_path=None, sync_interval=5,
+                 line_limit=LINE_LIMIT):
+        self.service = service or BookingService()
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.sync_interval = sync_interval
+        self.line_limit = line_limit
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.clients = 0
+
+    async def _call(self, func, *args):
+        """Run a service call on the worker thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def dispatch(self, session, request):
+        op = request.pop('op', None)
+        if op == 'login':
+            result = self.service.authenticate(request.get('uid'), request.get('password'))
+            session['uid'] = result['uid']
+            return result
+        if op == 'logout':
+            session['uid'] = None
+            return None
+        if op == 'list_movies':
+            return self.service.list_movies()
+        if op == 'availability':
+            return self.service.availability(request.get('movie_id'), request.get('show_time'))
+        if op in SESSION_OPS:
+            return getattr(self.service, op)(session.get('uid'), **request)
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _read_line(self, reader):
+        """Next request line, or b'' at end of input.
+
+        Raises ValueError once the rest of an overlong line has been read
+        and thrown away, so the next line is parsed from its start.
+        """
+        try:
+            return await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            overrun = e
+        while True:
+            await reader.readexactly(overrun.consumed)
+            try:
+                await reader.readuntil(b'\n')
+                break
+            except asyncio.LimitOverrunError as e:
+                overrun = e
+        raise ValueError(f"Request line longer than {self.line_limit} bytes")
+
+    async def _respond(self, session, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            return {'ok': True, 'result': await self._call(self.dispatch, session, request)}
+        except TypeError as e:
+            return {'ok': False, 'error': f"Bad parameters: {str(e)}"}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    async def handle(self, reader, writer):
+        session = {'uid': None}
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    line = await self._read_line(reader)
+                except ValueError as e:
+                    response = {'ok': False, 'error': str(e)}
+                else:
+                    if not line:
+                        break
+                    response = await self._respond(session, line)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _sync_periodically(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self._call(self.service.sync)
+            except Exception as e:
+                print(f"[Warning] Booking log sync failed: {str(e)}")
+
+    async def serve(self):
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            server = await asyncio.start_unix_server(self.handle, path=self.socket_path, limit=self.line_limit)
+            print(f"Booking service listening on {self.socket_path}")
+        else:
+            server = await asyncio.start_server(self.handle, self.host, self.port, limit=self.line_limit)
+            print(f"Booking service listening on {self.host}:{self.port}")
+
+        sync_task = asyncio.ensure_future(self._sync_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sync_task.cancel()
+            self.executor.shutdown(wait=True)
+            self.service.theatre.checkpoint()
+
+
+def run_server(host='127.0.0.1', port=8765, socket_path=None):
+    server = BookingServer(host=host, port=port, socket_path=socket_path)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nBooking service stopped.")
@@ -0,0 +1,204 @@
+from utils.allocator import best_available
+from utils.login import Login
+from utils.seat_map import parse_seat_list
+from utils.theatre import Theatre
+
+
+class BookingService:
+    """Booking operations without input()/print(), for callers that are not a terminal.
+
+    Every method takes the user explicitly, validates its arguments, raises
+    ValueError with a user-facing message on failure and returns plain
+    dicts/lists that serialize to JSON. The service shares one Login and
+    Theatre, so it must be driven from a single thread (the asyncio server
+    calls it from one worker thread).
+    """
+
+    def __init__(self, login=None):
+        self.login = login or Login()
+        self.theatre = Theatre(self.login)
+        self.holds = self.theatre.holds
+
+    def _as_user(self, uid):
+        if not uid:
+            raise ValueError("Not signed in")
+        self.login.current_user = uid
+        self.login.is_admin = False
+        return uid
+
+    def _show(self, movie_id, show_time):
+        try:
+            movie_id = int(movie_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid movie number: {movie_id}")
+        if movie_id not in self.theatre.movie_list:
+            raise ValueError(f"Movie {movie_id} not found")
+
+        movie_data = self.theatre.movie_list[movie_id]
+        screen_id = movie_data['screen_id']
+        if screen_id not in self.theatre.hall_data:
+            raise ValueError(f"Screen {screen_id} not found")
+        timing_data = self.theatre.show_data(screen_id, show_time)
+        if timing_data is None:
+            raise ValueError(f"No {show_time} show for {movie_data['name']}")
+        return movie_id, movie_data, screen_id, timing_data
+
+    def _check_seats(self, uid, screen_id, show_time, timing_data, seats):
+        if not seats:
+            raise ValueError("No seats selected")
+        seats = [str(seat).upper() for seat in seats]
+        if len(set(seats)) != len(seats):
+            raise ValueError("The same seat was selected twice")
+
+        for seat in seats:
+            if timing_data['seat_map'].is_seat_booked(seat):
+                raise ValueError(f"Seat {seat} is already booked")
+        self.holds.check(screen_id, show_time, seats, uid)
+        return seats
+
+    def authenticate(self, uid, password):
+        user = next((user for user in self.login.login_data[1:] if user and user[0] == uid), None)
+        if user is None or user[1] != password:
+            raise ValueError("Invalid mobile number or password")
+        return {'uid': uid, 'name': self.login.user_names.get(uid)}
+
+    def list_movies(self):
+        movies = []
+        for movie_id, movie_data in sorted(self.theatre.movie_list.items()):
+            screen_id = movie_data['screen_id']
+            movies.append({
+                'id': movie_id,
+                'name': movie_data['name'],
+                'price': movie_data['price'],
+                'screen_id': screen_id,
+                'timings': self.theatre.schedule.next_shows(screen_id)
+            })
+        return movies
+
+    def availability(self, movie_id, show_time):
+        """Seat grid of one show: one string per row, '.' free, 'X' booked, 'H' held"""
+        self.theatre._refresh_seat_inventory()
+        movie_id, movie_data, screen_id, timing_data = self._show(movie_id, show_time)
+        seat_map = timing_data['seat_map']
+        held = self.holds.held(screen_id, show_time)
+
+        rows = []
+        for row_index, row_label in enumerate(timing_data['available_rows']):
+            row = ['X' if seat else '.' for seat in seat_map.row(row_index)]
+            for col_index, col_label in enumerate(timing_data['available_cols']):
+                if row[col_index] == '.' and f"{row_label}{col_label}" in held:
+                    row[col_index] = 'H'
+            rows.append(''.join(row))
+
+        return {
+            'movie_id': movie_id,
+            'screen_id': screen_id,
+            'show_time': show_time,
+            'available': seat_map.available - sum(1 for seat in held if not seat_map.is_seat_booked(seat)),
+            'capacity': seat_map.capacity,
+            'row_labels': timing_data['available_rows'],
+            'col_labels': timing_data['available_cols'],
+            'rows': rows
+        }
+
+    def hold(self, uid, movie_id, show_time, seats=None, count=None):
+        """Reserve seats for uid until they are booked, released or the hold expires.
+
+        Without seats, the best available count seats are chosen.
+        """
+        self._as_user(uid)
+        self.theatre._refresh_seat_inventory()
+        movie_id, movie_data, screen_id, timing_data = self._show(movie_id, show_time)
+        if seats is None:
+            held_by_others = [seat for seat, owner in self.holds.held(screen_id, show_time).items() if owner != uid]
+            seats = best_available(timing_data['seat_map'], int(count or 0), held_by_others)
+            if seats is None:
+                raise ValueError(f"Fewer than {count} seats are free for this show")
+        seats = self._check_seats(uid, screen_id, show_time, timing_data, seats)
+
+        expires = self.holds.hold(screen_id, show_time, seats, uid)
+        return {'screen_id': screen_id, 'show_time': show_time, 'seats': seats, 'expires_in': round(expires - self.holds.clock())}
+
+    def release(self, uid, movie_id, show_time, seats=None):
+        """Drop uid's holds on a show, or only the given seats"""
+        self._as_user(uid)
+        movie_id, movie_data, screen_id, timing_data = self._show(movie_id, show_time)
+        wanted = None if seats is None else {str(seat).upper() for seat in seats}
+        return {'seats': self.holds.release(screen_id, show_time, uid, wanted)}
+
+    def book(self, uid, movie_id, show_time, seats, name=None):
+        self._as_user(uid)
+        self.theatre._refresh_seat_inventory()
+        movie_id, movie_data, screen_id, timing_data = self._show(movie_id, show_time)
+        seats = self._check_seats(uid, screen_id, show_time, timing_data, seats)
+
+        total_price = movie_data['price'] * len(seats)
+        balance = self.login.check_balance(uid)
+        if balance < total_price:
+            raise ValueError(f"Insufficient balance: need ₹{total_price}, have ₹{balance}")
+
+        user_name = name or self.login.user_names.get(uid) or uid
+        self.login.user_names[uid] = user_name
+        new_balance = self.theatre._commit_booking(user_name, show_time, seats, movie_id, total_price)
+
+        return {
+            'booking_id': self.theatre.booking_history[-1]['BookingID'],
+            'movie': movie_data['name'],
+            'screen_id': screen_id,
+            'show_time': show_time,
+            'seats': seats,
+            'total_price': total_price,
+            'balance': new_balance
+        }
+
+    def book_batch(self, uid, orders, name=None):
+        """Book several shows in one all-or-nothing order; see Theatre.book_batch"""
+        self._as_user(uid)
+        self.theatre._refresh_seat_inventory()
+        if not isinstance(orders, list) or not all(isinstance(order, dict) for order in orders):
+            raise ValueError("orders must be a list of objects")
+
+        user_name = name or self.login.user_names.get(uid) or uid
+        self.login.user_names[uid] = user_name
+        records, new_balance = self.theatre.book_batch(user_name, orders)
+        return {
+            'bookings': [
+                {
+                    'booking_id': record['BookingID'],
+                    'movie': record['Movie_Name'],
+                    'show_time': record['Show_Timing'],
+                    'seats': parse_seat_list(record['Seat_Numbers']),
+                    'price': record['Total_Price']
+                }
+                for record in records
+            ],
+            'total_price': sum(record['Total_Price'] for record in records),
+            'balance': new_balance
+        }
+
+    def bookings(self, uid):
+        self._as_user(uid)
+        return self.theatre.active_bookings(uid)
+
+    def cancel(self, uid, booking_id):
+        self._as_user(uid)
+        booking = next((b for b in self.theatre.active_bookings(uid) if b['booking_id'] == booking_id), None)
+        if booking is None:
+            raise ValueError(f"No active booking {booking_id}")
+
+        new_balance = self.theatre._commit_cancellation(booking)
+        return {'booking_id': booking_id, 'refund': booking['price'], 'balance': new_balance}
+
+    def balance(self, uid):
+        self._as_user(uid)
+        return {'balance': self.login.check_balance(uid)}
+
+    def history(self, uid, limit=10, skip=0):
+        """Wallet transactions of uid, newest first"""
+        self._as_user(uid)
+        self.login.booking_log.sync()
+        return self.login.storage.latest_wallet_history(uid, int(limit), skip=int(skip))
+
+    def sync(self):
+        self.login.booking_log.sync()
+        self.holds.expire()
@@ -0,0 +1,86 @@
+import os
+import time
+
+from utils.storage import BOOKING_FIELDS
+
+
+class StartupSnapshot:
+    """Every table needed at startup, read once from storage and shared by Login and Theatre.
+
+    The snapshot remembers the storage version it was read at; is_current()
+    tells callers whether it can still be used or has to be reloaded.
+    Bookings and hall rows are only read when first needed, since a valid
+    hall snapshot makes replaying them unnecessary.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.timings = []
+        self.version = storage.data_version()
+
+        self.login_rows = self._timed('login', storage.load_login_rows)
+        self._bookings = None
+        self._hall = None
+        self._user_names = None
+        self.screens = self._timed('screens', storage.list_screens)
+        self.movies = self._timed('movies', storage.list_movies)
+
+        self.users = {row[0]: row for row in self.login_rows[1:] if row}
+        self.screens_by_id = {}
+        for row in self.screens:
+            self.screens_by_id.setdefault(row.get('ScreenID'), row)
+
+    @property
+    def bookings(self):
+        if self._bookings is None:
+            self._bookings = self._timed('bookings', self.storage.list_bookings)
+        return self._bookings
+
+    @property
+    def hall(self):
+        if self._hall is None:
+            self._hall = self._timed('hall', self.storage.load_hall)
+        return self._hall
+
+    @property
+    def user_names(self):
+        if self._user_names is None:
+            self._user_names = {}
+            for row in self.bookings:
+                if row.get('UserName') and row.get('UID'):
+                    self._user_names[row['UID']] = row['UserName']
+        return self._user_names
+
+    def _timed(self, name, loader):
+        start = time.perf_counter()
+        result = loader()
+        elapsed = time.perf_counter() - start
+
+        size = None
+        for file_name in self.storage.source_files().get(name, []):
+            if os.path.exists(file_name):
+                size = (size or 0) + os.path.getsize(file_name)
+        self.timings.append((name, len(result), size, elapsed))
+        return result
+
+    def is_current(self):
+        return self.storage.data_version() == self.version
+
+    def booking_rows(self):
+        """Bookings as header + value lists, the shape Login.booking_data has always had"""
+        return [list(BOOKING_FIELDS)] + [[row.get(field, '') for field in BOOKING_FIELDS] for row in self.bookings]
+
+    def report(self):
+        print("\n" + "="*60)
+        print("STARTUP LOAD".center(60))
+        print("="*60)
+        print(f"{'Source':<12} | {'Rows':>8} | {'Bytes':>12} | {'Time (ms)':>10}")
+        print("-"*60)
+        for name, rows, size, elapsed in self.timings:
+            size_str = f"{size:,}" if size is not None else '-'
+            print(f"{name:<12} | {rows:>8} | {size_str:>12} | {elapsed * 1000:>10.2f}")
+        print("-"*60)
+        total_size = sum(size or 0 for _, _, size, _ in self.timings)
+        total_time = sum(elapsed for _, _, _, elapsed in self.timings)
+        print(f"{'Total':<12} | {'':>8} | {total_size:>12,} | {total_time * 1000:>10.2f}")
+        print("="*60)
@@ -0,0 +1,1380 @@
+import csv
+import gzip
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+from operator import itemgetter
+
+from utils.locks import file_lock
+from utils.schedule import parse_show_key
+
+SCREEN_FIELDS = ['ScreenID', 'Rows', 'Columns', 'LastMaintenance', 'Status', 'Timings']
+MOVIE_FIELDS = ['MovieID', 'Title', 'ScreenID', 'Price', 'IsActive']
+LOGIN_FIELDS = ['username', 'password', 'WalletBalance']
+WALLET_FIELDS = ['Username', 'WalletBalance']
+WALLET_HISTORY_FIELDS = ['Date', 'Time', 'Username', 'Amount', 'Balance', 'Description']
+BOOKING_FIELDS = ['BookingID', 'Date', 'Time', 'UserName', 'UID', 'ScreenID', 'Show_Timing', 'Seat_Numbers',
+                  'Movie_Name', 'Movie_ID', 'Total_Price', 'Ticket_Status', 'Cancellation_Date']
+HALL_FIELDS = ['ScreenID', 'ShowTime', 'Row', 'SeatStatus']
+BOOKING_STATUS_FIELDS = ['BookingID', 'UID', 'Ticket_Status', 'Cancellation_Date']
+ARCHIVE_INDEX_FIELDS = ['BookingID', 'UID', 'UserName', 'Partition']
+
+
+def get_storage(login_file='csvs/login_details.csv', booking_file='csvs/booking_details.csv'):
+    """Create the storage backend selected by the TICKET_STORAGE environment variable"""
+    backend = os.environ.get('TICKET_STORAGE', 'csv').lower()
+    if backend == 'sqlite':
+        return SqliteStorage(login_file=login_file, booking_file=booking_file)
+    return CsvStorage(login_file=login_file, booking_file=booking_file)
+
+
+def show_date(show_time):
+    """ISO date of a dated show key, or None for undated keys"""
+    try:
+        day, _ = parse_show_key(show_time)
+    except ValueError:
+        return None
+    return day.isoformat() if day else None
+
+
+class BookingArchive:
+    """Bookings of finished shows, in one gzip-compressed CSV per show date.
+
+    An index file maps every archived BookingID to its user, the user's
+    name and its partition, so a single booking or one user's history is
+    read from only the partitions that hold it. Bookings of undated (older) shows are filed
+    under the date they were booked.
+    """
+
+    def __init__(self, archive_dir='csvs/archive'):
+        self.archive_dir = archive_dir
+        self.index_file = f'{archive_dir}/index.csv'
+        self._index = None
+
+    def partition_of(self, row):
+        return show_date(row.get('Show_Timing')) or (row.get('Date') or None)
+
+    def _partition_file(self, partition):
+        return f'{self.archive_dir}/bookings_{partition}.csv.gz'
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    for row in csv.DictReader(f):
+                        self._index[row['BookingID']] = row
+        return self._index
+
+    def read_partition(self, partition):
+        file_name = self._partition_file(partition)
+        if not os.path.exists(file_name):
+            return []
+        with gzip.open(file_name, 'rt', newline='') as f:
+            return [row for row in csv.DictReader(f) if row]
+
+    def add(self, rows):
+        """Merge rows into their date partitions, then record them in the index.
+
+        Partitions are rewritten through a temp file, and rows already in a
+        partition are not added twice, so repeating an interrupted archive
+        run is safe.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        by_partition = {}
+        for row in rows:
+            by_partition.setdefault(self.partition_of(row), []).append(row)
+
+        index_rows = []
+        for partition, partition_rows in sorted(by_partition.items()):
+            merged = {row['BookingID']: row for row in self.read_partition(partition)}
+            for row in partition_rows:
+                merged[row['BookingID']] = row
+                index_rows.append({
+                    'BookingID': row['BookingID'], 'UID': row.get('UID', ''),
+                    'UserName': row.get('UserName') or '', 'Partition': partition
+                })
+
+            file_name = self._partition_file(partition)
+            temp_file = f'{file_name}.tmp'
+            with gzip.open(temp_file, 'wt', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=BOOKING_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(merged.values())
+            os.replace(temp_file, file_name)
+
+        index = self._get_index()
+        if self._index_header() not in (None, ARCHIVE_INDEX_FIELDS):
+            # Index written before names were recorded: rewrite it with the current columns
+            for row in index_rows:
+                index[row['BookingID']] = row
+            temp_file = f'{self.index_file}.tmp'
+            with open(temp_file, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=ARCHIVE_INDEX_FIELDS, restval='', extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(index.values())
+            os.replace(temp_file, self.index_file)
+            return
+
+        file_exists = os.path.exists(self.index_file)
+        with open(self.index_file, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=ARCHIVE_INDEX_FIELDS)
+            if not file_exists or f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(row for row in index_rows if row['BookingID'] not in index)
+        for row in index_rows:
+            index[row['BookingID']] = row
+
+    def _index_header(self):
+        if not os.path.exists(self.index_file):
+            return None
+        with open(self.index_file, 'r', newline='') as f:
+            return next(csv.reader(f), None)
+
+    def get(self, booking_id):
+        entry = self._get_index().get(booking_id)
+        if entry is None:
+            return None
+        return next((row for row in self.read_partition(entry['Partition']) if row['BookingID'] == booking_id), None)
+
+    def user_rows(self, uid):
+        """Archived bookings of one user, oldest partition first"""
+        partitions = sorted({entry['Partition'] for entry in self._get_index().values() if entry['UID'] == uid})
+        rows = []
+        for partition in partitions:
+            rows.extend(row for row in self.read_partition(partition) if row.get('UID') == uid)
+        return rows
+
+    def booking_ids(self):
+        return set(self._get_index())
+
+    def user_names(self):
+        """UID -> name of every archived user, from their latest archived booking.
+
+        Names come from the index; partitions with entries indexed before
+        names were recorded are read for them instead.
+        """
+        names = {}
+        unnamed = set()
+        for entry in self._get_index().values():
+            if entry.get('UserName'):
+                names[entry['UID']] = entry['UserName']
+            elif entry.get('UID'):
+                unnamed.add(entry['Partition'])
+        for partition in sorted(unnamed):
+            for row in self.read_partition(partition):
+                if row.get('UserName') and row.get('UID'):
+                    names[row['UID']] = row['UserName']
+        return names
+
+    def partitions(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            file_name[len('bookings_'):-len('.csv.gz')] for file_name in os.listdir(self.archive_dir)
+            if file_name.startswith('bookings_') and file_name.endswith('.csv.gz')
+        )
+
+    def files(self):
+        """Partition files, oldest first"""
+        return [self._partition_file(partition) for partition in self.partitions()]
+
+    def scan(self, fields):
+        """Yield the values of the given fields for every archived booking, oldest partition first"""
+        for partition in self.partitions():
+            with gzip.open(self._partition_file(partition), 'rt', newline='') as f:
+                yield from _scan_rows(f, fields)
+
+
+def _scan_rows(f, fields, statuses=None, skip=None):
+    """Yield a tuple of the given fields' values for each row of an open CSV file.
+
+    Fields missing from the header read as ''. When the file has a BookingID
+    column, rows whose ID is in skip are left out and the latest status
+    update in statuses replaces Ticket_Status and Cancellation_Date. Rows
+    that need neither are picked with one itemgetter call each.
+    """
+    reader = csv.reader(f)
+    header = next(reader, [])
+    positions = [header.index(field) if field in header else len(header) for field in fields]
+    pick = itemgetter(*positions) if len(positions) > 1 else lambda values: (values[positions[0]],)
+    width = max(positions) + 1
+    id_position = header.index('BookingID') if 'BookingID' in header else None
+    if id_position is None or not (skip or statuses):
+        skip = statuses = None
+    overrides = [(fields.index(field), field) for field in ('Ticket_Status', 'Cancellation_Date') if field in fields]
+    for values in filter(None, reader):
+        if len(values) < width:
+            values = values + [''] * (width - len(values))
+        if statuses is None and skip is None:
+            yield pick(values)
+            continue
+        booking_id = values[id_position]
+        if skip and booking_id in skip:
+            continue
+        update = statuses.get(booking_id) if statuses else None
+        if update:
+            row = list(pick(values))
+            for index, field in overrides:
+                row[index] = update[field]
+            yield tuple(row)
+        else:
+            yield pick(values)
+
+
+def _with_archived(rows, archived_rows):
+    """Archived rows followed by hot rows, skipping archived copies of rows that are still hot"""
+    hot_ids = {row.get('BookingID') for row in rows}
+    return [row for row in archived_rows if row.get('BookingID') not in hot_ids] + rows
+
+
+class CsvStorage:
+    """Storage backend that keeps every table in a CSV file under csvs/"""
+
+    def __init__(self, login_file='csvs/login_details.csv', booking_file='csvs/booking_details.csv'):
+        self.login_file = login_file
+        self.booking_file = booking_file
+        self.bookings_dir = 'csvs/bookings'
+        self.screens_file = 'csvs/screens.csv'
+        self.movies_file = 'csvs/movies.csv'
+        self.wallet_file = 'csvs/user_wallets.csv'
+        self.wallet_position_file = 'csvs/user_wallets.ckpt'
+        self.wallet_history_file = 'csvs/wallet_history.csv'
+        self.wallet_history_dir = 'csvs/wallet_history'
+        self.hall_file = 'csvs/hall_data.csv'
+        self.hall_delta_file = 'csvs/hall_data.delta.csv'
+        self.hall_compact_threshold = 500
+        self._hall_delta_rows = None
+        self.booking_status_file = 'csvs/booking_status.csv'
+        self.status_compact_threshold = 200
+        self._statuses = None
+        self._statuses_state = None
+        self._booking_index = None
+        self._booking_index_state = None
+        self.archive = BookingArchive()
+
+    def source_files(self):
+        """Files read for each startup table, used for load reports and change detection"""
+        return {
+            'login': [self.login_file],
+            'bookings': [self.booking_file, self.booking_status_file],
+            'screens': [self.screens_file],
+            'movies': [self.movies_file],
+            'hall': [self.hall_file, self.hall_delta_file]
+        }
+
+    def data_version(self, names=None):
+        """Stat of the source files, optionally limited to some tables"""
+        version = []
+        for name, files in self.source_files().items():
+            if names is not None and name not in names:
+                continue
+            for file_name in files:
+                try:
+                    stat = os.stat(file_name)
+                    version.append((file_name, stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    version.append((file_name, None, None))
+        return tuple(version)
+
+    def state_token(self):
+        """Marker of the catalog, booking and hall state that stays valid across processes"""
+        return self.data_version(('bookings', 'screens', 'movies', 'hall'))
+
+    def _file_state(self, file_name):
+        """(inode, mtime, size) of a file, or None if it does not exist"""
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read_rows(self, file_name):
+        if not os.path.exists(file_name):
+            return []
+        with open(file_name, 'r') as f:
+            return [row for row in csv.DictReader(f) if row]
+
+    def _write_rows(self, file_name, rows, fieldnames):
+        with open(file_name, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def _write_temp(self, file_name, rows, fieldnames):
+        temp_file = f'{file_name}.tmp'
+        try:
+            self._write_rows(temp_file, rows, fieldnames)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        return temp_file
+
+    def _write_hall_temp(self, rows):
+        temp_file = f'{self.hall_file}.tmp'
+        try:
+            with open(temp_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(HALL_FIELDS)
+                writer.writerows(rows)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        return temp_file
+
+    def _append_rows(self, file_name, rows, fieldnames):
+        file_exists = os.path.exists(file_name)
+        with open(file_name, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            if not file_exists or f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def list_screens(self):
+        return self._read_rows(self.screens_file)
+
+    def get_screen(self, screen_id):
+        for row in self.list_screens():
+            if row.get('ScreenID') == screen_id:
+                return row
+        return None
+
+    def save_screens(self, rows):
+        self.commit_catalog(screens=rows)
+
+    def add_screen(self, row):
+        self._append_rows(self.screens_file, [row], SCREEN_FIELDS)
+
+    def list_movies(self):
+        return self._read_rows(self.movies_file)
+
+    def save_movies(self, rows):
+        self.commit_catalog(movies=rows)
+
+    def add_movie(self, row):
+        self._append_rows(self.movies_file, [row], MOVIE_FIELDS)
+
+    def commit_catalog(self, screens=None, movies=None, hall=None):
+        """Replace the given tables, leaving the ones passed as None untouched.
+
+        Every table is written to a temp file first and the temp files are
+        renamed over the originals only once all of them are complete, so a
+        failure while writing leaves the whole catalog as it was. The hall
+        lock is held throughout so a concurrent delta append or compaction
+        cannot slip in between the rename and the removal of the delta file.
+        """
+        with file_lock('hall'):
+            self._commit_catalog(screens, movies, hall)
+
+    def _commit_catalog(self, screens=None, movies=None, hall=None):
+        staged = []
+        try:
+            if screens is not None:
+                staged.append((self._write_temp(self.screens_file, screens, SCREEN_FIELDS), self.screens_file))
+            if movies is not None:
+                staged.append((self._write_temp(self.movies_file, movies, MOVIE_FIELDS), self.movies_file))
+            if hall is not None:
+                staged.append((self._write_hall_temp(hall), self.hall_file))
+            for temp_file, file_name in staged:
+                os.replace(temp_file, file_name)
+        finally:
+            for temp_file, _ in staged:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+        if hall is not None:
+            if os.path.exists(self.hall_delta_file):
+                os.remove(self.hall_delta_file)
+            self._hall_delta_rows = 0
+
+    def load_login_rows(self):
+        try:
+            with open(self.login_file, 'r') as f:
+                return list(csv.reader(f))
+        except FileNotFoundError:
+            return [['Username', 'Password']]
+
+    def save_login_rows(self, rows):
+        with open(self.login_file, 'w', newline='') as f:
+            csv.writer(f).writerows(rows)
+
+    def get_balance(self, username):
+        for row in self._read_rows(self.wallet_file):
+            if row.get('Username') == username:
+                try:
+                    return float(row['WalletBalance'])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return None
+
+    def save_balances(self, balances):
+        balances = dict(balances)
+        wallet_data = [row for row in self._read_rows(self.wallet_file) if row.get('Username')]
+
+        for record in wallet_data:
+            if record['Username'] in balances:
+                record['WalletBalance'] = str(balances.pop(record['Username']))
+
+        for username, balance in balances.items():
+            wallet_data.append({'Username': username, 'WalletBalance': str(balance)})
+
+        self._write_rows(self.wallet_file, [
+            {'Username': record['Username'], 'WalletBalance': record['WalletBalance']}
+            for record in wallet_data
+        ], WALLET_FIELDS)
+
+    def load_wallet_snapshot(self):
+        """Return (balances, ledger position) from the last wallet snapshot.
+
+        The position is None when the snapshot predates the ledger marker.
+        """
+        balances = {}
+        for row in self._read_rows(self.wallet_file):
+            try:
+                balances[row['Username']] = float(row['WalletBalance'])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        try:
+            with open(self.wallet_position_file, 'r') as f:
+                position = int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            position = None
+        return balances, position
+
+    def save_wallet_snapshot(self, balances, position):
+        temp_file = f'{self.wallet_file}.tmp'
+        self._write_rows(temp_file, [
+            {'Username': username, 'WalletBalance': str(balance)}
+            for username, balance in balances.items()
+        ], WALLET_FIELDS)
+        os.replace(temp_file, self.wallet_file)
+
+        temp_file = f'{self.wallet_position_file}.tmp'
+        with open(temp_file, 'w') as f:
+            f.write(str(position))
+        os.replace(temp_file, self.wallet_position_file)
+
+    def wallet_history_position(self):
+        try:
+            return os.path.getsize(self.wallet_history_file)
+        except OSError:
+            return 0
+
+    def wallet_version(self):
+        """Change marker for the ledger file, used to notice writes from other processes"""
+        try:
+            stat = os.stat(self.wallet_history_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def wallet_history_since(self, position):
+        """Return (rows, end position) for complete ledger lines after a byte offset"""
+        rows = []
+        if not os.path.exists(self.wallet_history_file):
+            return rows, 0
+
+        with open(self.wallet_history_file, 'rb') as f:
+            header_line = f.readline()
+            header = next(csv.reader([header_line.decode('utf-8')]), [])
+            position = max(position, len(header_line))
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                position += len(line)
+                values = next(csv.reader([line.decode('utf-8')]), [])
+                if values:
+                    rows.append(dict(zip(header, values)))
+        return rows, position
+
+    def append_wallet_history(self, transactions):
+        if not transactions:
+            return
+        self._partition_wallet_history()
+        self._append_rows(self.wallet_history_file, transactions, WALLET_HISTORY_FIELDS)
+
+        by_user = {}
+        for transaction in transactions:
+            by_user.setdefault(transaction['Username'], []).append(transaction)
+        for username, user_transactions in by_user.items():
+            self._append_rows(self._user_wallet_history_file(username), user_transactions, WALLET_HISTORY_FIELDS)
+
+    def wallet_history_mark(self, usernames):
+        """Sizes of the ledger files a sync is about to append to, for restore_wallet_history()"""
+        self._partition_wallet_history()
+        return {
+            'ledger': self._file_size(self.wallet_history_file),
+            'users': {username: self._file_size(self._user_wallet_history_file(username)) for username in usernames}
+        }
+
+    def restore_wallet_history(self, mark):
+        """Cut the ledger files back to a mark taken before a sync that failed part way.
+
+        Rows of the failed attempt may be partly written, so none are kept
+        and False is returned: the sync appends them all again, at the same
+        offsets.
+        """
+        self._truncate(self.wallet_history_file, mark['ledger'])
+        for username, size in mark['users'].items():
+            self._truncate(self._user_wallet_history_file(username), size)
+        return False
+
+    def _file_size(self, file_name):
+        try:
+            return os.path.getsize(file_name)
+        except OSError:
+            return None
+
+    def _truncate(self, file_name, size):
+        """Cut a file back to size bytes, or remove it if it did not exist (size None)"""
+        if size is None:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+            return
+        if (self._file_size(file_name) or 0) > size:
+            with open(file_name, 'r+b') as f:
+                f.truncate(size)
+
+    def _user_wallet_history_file(self, username):
+        return f'{self.wallet_history_dir}/{username}_wallet.csv'
+
+    def _partition_wallet_history(self):
+        """Split the shared history into per-user files the first time they are needed.
+
+        The files are written to a fresh temporary directory that is renamed
+        into place under a lock, so processes doing this at the same time
+        neither mix their files nor replace each other's directory.
+        """
+        if os.path.isdir(self.wallet_history_dir):
+            return
+
+        with file_lock('wallet_history'):
+            if os.path.isdir(self.wallet_history_dir):
+                return
+
+            by_user = {}
+            if os.path.exists(self.wallet_history_file):
+                with open(self.wallet_history_file, 'r') as f:
+                    reader = csv.DictReader(f)
+                    if not reader.fieldnames or 'Balance' not in reader.fieldnames:
+                        raise ValueError("Wallet history format is invalid")
+                    for row in reader:
+                        if row.get('Username'):
+                            by_user.setdefault(row['Username'], []).append(row)
+
+            parent, name = os.path.split(self.wallet_history_dir)
+            temp_dir = tempfile.mkdtemp(prefix=f'{name}.', suffix='.tmp', dir=parent or '.')
+            try:
+                for username, rows in by_user.items():
+                    self._write_rows(f'{temp_dir}/{username}_wallet.csv', rows, WALLET_HISTORY_FIELDS)
+                os.rename(temp_dir, self.wallet_history_dir)
+            except BaseException:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                raise
+
+    def wallet_history(self, username):
+        self._partition_wallet_history()
+        return self._read_rows(self._user_wallet_history_file(username))
+
+    def latest_wallet_history(self, username, limit, skip=0):
+        """Return up to limit of a user's transactions, newest first, reading the file backwards"""
+        self._partition_wallet_history()
+        file_name = self._user_wallet_history_file(username)
+        if not os.path.exists(file_name):
+            return []
+
+        wanted = skip + limit
+        block_size = 8192
+        with open(file_name, 'rb') as f:
+            header_line = f.readline()
+            header = next(csv.reader([header_line.decode('utf-8')]), [])
+            start = len(header_line)
+            position = f.seek(0, os.SEEK_END)
+            buffer = b''
+            lines = []
+            while position > start and len(lines) < wanted + 2:
+                read_size = min(block_size, position - start)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+                lines = buffer.split(b'\n')
+            if position > start:
+                # The first piece may be a partial line; it is only needed if it is complete
+                lines = lines[1:]
+
+        rows = []
+        for line in reversed(lines):
+            values = next(csv.reader([line.decode('utf-8')]), [])
+            if values:
+                rows.append(dict(zip(header, values)))
+        return rows[skip:wanted]
+
+    def load_booking_rows(self):
+        try:
+            with open(self.booking_file, 'r') as f:
+                return list(csv.reader(f))
+        except FileNotFoundError:
+            return [['Date', 'UserName', 'UID', 'Show_Timing', 'No_of_Seats', 'Seat_Numbers', 'Movie_Name', 'Ticket_Status']]
+
+    def save_booking_rows(self, rows):
+        with open(self.booking_file, 'w', newline='') as f:
+            csv.writer(f).writerows(rows)
+
+    def _load_statuses(self):
+        """Latest status update per BookingID from the status file, reread whenever the file changes.
+
+        Other processes append to (and compact away) the status file, so a
+        copy kept from an earlier read could show a cancelled booking as
+        still booked.
+        """
+        state = self._file_state(self.booking_status_file)
+        if self._statuses is None or state != self._statuses_state:
+            self._statuses = {}
+            for row in self._read_rows(self.booking_status_file):
+                self._statuses[row['BookingID']] = row
+            self._statuses_state = state
+        return self._statuses
+
+    def _apply_statuses(self, rows):
+        statuses = self._load_statuses()
+        if not statuses:
+            return rows
+        for row in rows:
+            update = statuses.get(row.get('BookingID'))
+            if update:
+                row['Ticket_Status'] = update['Ticket_Status']
+                row['Cancellation_Date'] = update['Cancellation_Date']
+        return rows
+
+    def list_bookings(self):
+        return self._apply_statuses(self._read_rows(self.booking_file))
+
+    def list_bookings_date(self, show_date):
+        """Bookings for the shows on one date; only lines containing the date's show-key prefix are parsed"""
+        prefix = f'{show_date.isoformat()} '
+        if not os.path.exists(self.booking_file):
+            return []
+        with open(self.booking_file, 'r', newline='') as f:
+            header = next(csv.reader([f.readline()]), [])
+            rows = [
+                row for row in csv.DictReader((line for line in f if prefix in line), fieldnames=header)
+                if (row.get('Show_Timing') or '').startswith(prefix)
+            ]
+        return self._apply_statuses(rows)
+
+    def scan_bookings(self, fields):
+        """Yield the values of the given fields for every booking, archived ones first, with current statuses.
+
+        Rows are plain lists read straight from the files, for reports that
+        walk all bookings without building a dict per row. A booking that is
+        both archived and still in the hot file (an interrupted archive run)
+        is yielded once.
+        """
+        yield from self.archive.scan(fields)
+        if not os.path.exists(self.booking_file):
+            return
+        with open(self.booking_file, 'r', newline='') as f:
+            yield from _scan_rows(f, fields, self._load_statuses(), self.archive.booking_ids())
+
+    def booking_sources(self):
+        """(file name, opener, statuses, skip) per booking CSV, archived partitions first.
+
+        For readers that parse the files themselves instead of calling
+        scan_bookings(): statuses and skip are the status updates and the
+        archived BookingIDs that scan_bookings() applies to the hot file.
+        """
+        sources = [(file_name, gzip.open, None, None) for file_name in self.archive.files()]
+        if os.path.exists(self.booking_file):
+            sources.append((self.booking_file, open, self._load_statuses(), self.archive.booking_ids()))
+        return sources
+
+    def archived_user_names(self):
+        return self.archive.user_names()
+
+    def user_bookings(self, uid, archived=False):
+        """Bookings of one user; archived=True adds the ones moved to the archive"""
+        rows = self._apply_statuses(self._read_rows(f'{self.bookings_dir}/{uid}_bookings.csv'))
+        if archived:
+            rows = _with_archived(rows, self.archive.user_rows(uid))
+        return rows
+
+    def _build_booking_index(self):
+        """Map each BookingID to (UID, byte offset of its row in booking_details.csv)"""
+        self._booking_index = {}
+        self._booking_index_state = None
+        self._index_booking_rows(0)
+        return self._booking_index
+
+    def _index_booking_rows(self, start):
+        """Add complete rows from byte offset start (0 for the whole file) to the BookingID index"""
+        index = self._booking_index
+        end = start
+        if os.path.exists(self.booking_file):
+            with open(self.booking_file, 'rb') as f:
+                header = next(csv.reader([f.readline().decode('utf-8')]), [])
+                offset = max(start, f.tell())
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    values = next(csv.reader([line.decode('utf-8')]), [])
+                    if values:
+                        row = dict(zip(header, values))
+                        index[row.get('BookingID')] = (row.get('UID'), offset)
+                    offset += len(line)
+                end = offset
+        state = self._file_state(self.booking_file)
+        self._booking_index_state = (state[0], end) if state else None
+
+    def _get_booking_index(self):
+        """The BookingID index, caught up with rows other processes appended since it was built.
+
+        Appended rows are indexed from where the index left off; a file that
+        was replaced (compaction, archiving) or shrank is indexed again.
+        """
+        if self._booking_index is None:
+            return self._build_booking_index()
+        state = self._file_state(self.booking_file)
+        indexed = self._booking_index_state
+        if state is None or indexed is None or state[0] != indexed[0] or state[2] < indexed[1]:
+            return self._build_booking_index()
+        if state[2] > indexed[1]:
+            self._index_booking_rows(indexed[1])
+        return self._booking_index
+
+    def get_booking(self, booking_id):
+        """Look up one booking through the BookingID index without scanning the file"""
+        entry = self._get_booking_index().get(booking_id)
+        if entry is None:
+            return self.archive.get(booking_id)
+
+        with open(self.booking_file, 'rb') as f:
+            header = next(csv.reader([f.readline().decode('utf-8')]), [])
+            f.seek(entry[1])
+            values = next(csv.reader([f.readline().decode('utf-8')]), [])
+        row = dict(zip(header, values))
+        if row.get('BookingID') != booking_id:
+            self._booking_index = None
+            return next((r for r in self.list_bookings() if r.get('BookingID') == booking_id), None)
+        return self._apply_statuses([row])[0]
+
+    def append_bookings(self, records):
+        """Append bookings to booking_details.csv, then to their owners' files.
+
+        A sync that failed part way may have stored some of them already:
+        those are not added to booking_details.csv again, and are only added
+        to an owner's file that does not have them yet.
+        """
+        if not records:
+            return
+
+        index = self._get_booking_index()
+        stored = {record['BookingID'] for record in records if record['BookingID'] in index}
+        file_exists = os.path.exists(self.booking_file)
+        with open(self.booking_file, 'ab') as f:
+            if not file_exists or f.tell() == 0:
+                f.write(self._csv_line(BOOKING_FIELDS))
+            for record in records:
+                if record['BookingID'] in stored:
+                    continue
+                index[record['BookingID']] = (record['UID'], f.tell())
+                f.write(self._csv_line([record.get(field, '') for field in BOOKING_FIELDS]))
+            end = f.tell()
+        self._booking_index_state = (self._file_state(self.booking_file)[0], end)
+
+        by_user = {}
+        for record in records:
+            by_user.setdefault(record['UID'], []).append(record)
+
+        os.makedirs(self.bookings_dir, exist_ok=True)
+        for uid, user_records in by_user.items():
+            file_name = f'{self.bookings_dir}/{uid}_bookings.csv'
+            if any(record['BookingID'] in stored for record in user_records):
+                known = {row.get('BookingID') for row in self._read_rows(file_name)}
+                user_records = [record for record in user_records if record['BookingID'] not in known]
+            self._append_rows(file_name, user_records, BOOKING_FIELDS)
+
+    def _csv_line(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue().encode('utf-8')
+
+    def update_booking_statuses(self, updates):
+        """Record status changes as rows in the status file instead of rewriting the booking files.
+
+        Each update is a dict with BOOKING_STATUS_FIELDS. The owning user is
+        resolved through the BookingID index when it is not given.
+        """
+        if not updates:
+            return
+
+        index = self._get_booking_index()
+        rows = []
+        for update in updates:
+            row = {field: update.get(field, '') for field in BOOKING_STATUS_FIELDS}
+            if not row['UID'] and row['BookingID'] in index:
+                row['UID'] = index[row['BookingID']][0]
+            rows.append(row)
+
+        self._append_rows(self.booking_status_file, rows, BOOKING_STATUS_FIELDS)
+        statuses = self._load_statuses()
+
+        if len(statuses) >= self.status_compact_threshold:
+            self.compact_bookings()
+
+    def update_booking_status(self, booking_id, uid, status, cancellation_date=''):
+        self.update_booking_statuses([{
+            'BookingID': booking_id,
+            'UID': uid,
+            'Ticket_Status': status,
+            'Cancellation_Date': cancellation_date
+        }])
+
+    def compact_bookings(self):
+        """Fold the status file into the booking files and remove it"""
+        statuses = self._load_statuses()
+        if not statuses:
+            return
+
+        files = {self.booking_file}
+        for row in statuses.values():
+            if row.get('UID'):
+                files.add(f'{self.bookings_dir}/{row["UID"]}_bookings.csv')
+
+        for file_name in files:
+            if not os.path.exists(file_name):
+                continue
+            temp_file = f'{file_name}.tmp'
+            try:
+                self._write_rows(temp_file, self._apply_statuses(self._read_rows(file_name)), BOOKING_FIELDS)
+                os.replace(temp_file, file_name)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+        if os.path.exists(self.booking_status_file):
+            os.remove(self.booking_status_file)
+        self._statuses = {}
+        self._booking_index = None
+
+    def archive_bookings(self, before):
+        """Move bookings for shows dated before the given date into the archive; returns how many moved.
+
+        Both booking_details.csv and the per-user files are trimmed. Statuses
+        are folded in first so archived rows carry their final status. The
+        archive is written before the hot files are rewritten, so an
+        interruption leaves a booking in both places, never in neither.
+        """
+        self.compact_bookings()
+        cutoff = before.isoformat()
+
+        def finished(row):
+            partition = self.archive.partition_of(row)
+            return bool(row.get('BookingID')) and partition is not None and partition < cutoff
+
+        moved = {}
+        rewrites = {}
+        files = [self.booking_file]
+        if os.path.isdir(self.bookings_dir):
+            files.extend(
+                os.path.join(self.bookings_dir, file_name)
+                for file_name in sorted(os.listdir(self.bookings_dir))
+                if file_name.endswith('_bookings.csv')
+            )
+        for file_name in files:
+            rows = self._read_rows(file_name)
+            kept = [row for row in rows if not finished(row)]
+            if len(kept) == len(rows):
+                continue
+            rewrites[file_name] = kept
+            for row in rows:
+                if finished(row):
+                    moved.setdefault(row['BookingID'], row)
+        if not moved:
+            return 0
+
+        self.archive.add(list(moved.values()))
+        for file_name, rows in rewrites.items():
+            os.replace(self._write_temp(file_name, rows, BOOKING_FIELDS), file_name)
+        self._booking_index = None
+        return len(moved)
+
+    def drop_hall_before(self, before):
+        """Remove stored seat rows of dated shows before the given date; returns how many were removed"""
+        cutoff = before.isoformat()
+        with file_lock('hall'):
+            rows = self._load_hall()
+            kept = []
+            for row in rows:
+                day = show_date(row[1])
+                if day is None or day >= cutoff:
+                    kept.append(row)
+            if len(kept) != len(rows):
+                self._commit_catalog(hall=kept)
+        return len(rows) - len(kept)
+
+    def _read_hall_file(self, file_name):
+        return [
+            (row['ScreenID'], row['ShowTime'], row['Row'], row['SeatStatus'])
+            for row in self._read_rows(file_name)
+        ]
+
+    def load_hall(self):
+        """Return hall seat rows as (screen_id, show_time, row, seat_status) tuples.
+
+        The snapshot in hall_data.csv is overlaid with the row updates that
+        have been appended to the delta file since the last compaction.
+        """
+        with file_lock('hall'):
+            return self._load_hall()
+
+    def _load_hall(self):
+        rows = {}
+        for row in self._read_hall_file(self.hall_file):
+            rows[row[:3]] = row
+        delta = self._read_hall_file(self.hall_delta_file)
+        self._hall_delta_rows = len(delta)
+        for row in delta:
+            rows[row[:3]] = row
+        return list(rows.values())
+
+    def load_hall_date(self, show_date):
+        """Hall rows of the shows on one date (keyed by schedule.show_key()).
+
+        Lines without the date's show-key prefix are skipped before they are
+        parsed, so only that date's rows are ever split into fields.
+        """
+        prefix = f'{show_date.isoformat()} '
+        rows = {}
+        with file_lock('hall'):
+            for file_name in (self.hall_file, self.hall_delta_file):
+                if not os.path.exists(file_name):
+                    continue
+                with open(file_name, 'r', newline='') as f:
+                    header = next(csv.reader([f.readline()]), [])
+                    for row in csv.DictReader((line for line in f if prefix in line), fieldnames=header):
+                        if (row.get('ShowTime') or '').startswith(prefix):
+                            rows[(row['ScreenID'], row['ShowTime'], row['Row'])] = (
+                                row['ScreenID'], row['ShowTime'], row['Row'], row['SeatStatus']
+                            )
+        return list(rows.values())
+
+    def save_hall(self, rows):
+        """Write a full hall snapshot and discard the delta file"""
+        self.commit_catalog(hall=rows)
+
+    def update_hall_rows(self, rows):
+        """Append changed seat rows to the delta file, compacting when it grows too large.
+
+        The append and the compaction run under the hall lock, so rows
+        appended by another process are never lost to a compaction that
+        read the delta file before they were written.
+        """
+        if not rows:
+            return
+
+        with file_lock('hall'):
+            file_exists = os.path.exists(self.hall_delta_file)
+            with open(self.hall_delta_file, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if not file_exists or f.tell() == 0:
+                    writer.writerow(HALL_FIELDS)
+                writer.writerows(rows)
+
+            if self._hall_delta_rows is None:
+                self._hall_delta_rows = len(self._read_rows(self.hall_delta_file))
+            else:
+                self._hall_delta_rows += len(rows)
+
+            if self._hall_delta_rows >= self.hall_compact_threshold:
+                self._commit_catalog(hall=self._load_hall())
+
+    def compact_hall(self):
+        """Fold the delta file into a fresh hall_data.csv snapshot"""
+        with file_lock('hall'):
+            self._commit_catalog(hall=self._load_hall())
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS screens (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    "ScreenID" TEXT, "Rows" TEXT, "Columns" TEXT, "LastMaintenance" TEXT, "Status" TEXT, "Timings" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_screens_id ON screens ("ScreenID");
+CREATE TABLE IF NOT EXISTS movies (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    "MovieID" TEXT, "Title" TEXT, "ScreenID" TEXT, "Price" TEXT, "IsActive" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_movies_screen ON movies ("ScreenID");
+CREATE TABLE IF NOT EXISTS users (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT, password TEXT, wallet_balance TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users (username);
+CREATE TABLE IF NOT EXISTS wallets ("Username" TEXT PRIMARY KEY, "WalletBalance" REAL);
+CREATE TABLE IF NOT EXISTS wallet_history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    "Date" TEXT, "Time" TEXT, "Username" TEXT, "Amount" TEXT, "Balance" TEXT, "Description" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_wallet_history_user ON wallet_history ("Username", seq);
+CREATE TABLE IF NOT EXISTS bookings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    "BookingID" TEXT, "Date" TEXT, "Time" TEXT, "UserName" TEXT, "UID" TEXT, "ScreenID" TEXT,
+    "Show_Timing" TEXT, "Seat_Numbers" TEXT, "Movie_Name" TEXT, "Movie_ID" TEXT, "Total_Price" TEXT,
+    "Ticket_Status" TEXT, "Cancellation_Date" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_id ON bookings ("BookingID");
+CREATE INDEX IF NOT EXISTS idx_bookings_uid ON bookings ("UID", seq);
+CREATE INDEX IF NOT EXISTS idx_bookings_show ON bookings ("Show_Timing");
+CREATE TABLE IF NOT EXISTS hall (
+    "ScreenID" TEXT, "ShowTime" TEXT, "Row" TEXT, "SeatStatus" TEXT,
+    PRIMARY KEY ("ScreenID", "ShowTime", "Row")
+);
+CREATE INDEX IF NOT EXISTS idx_hall_show ON hall ("ShowTime");
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', '0');
+"""
+
+# Every change to the catalog, bookings or hall bumps meta.generation, which state_token() reports
+GENERATION_TRIGGERS = ''.join(
+    f'CREATE TRIGGER IF NOT EXISTS {table}_{operation.lower()}_generation AFTER {operation} ON {table} '
+    "BEGIN UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'; END;\n"
+    for table in ('screens', 'movies', 'bookings', 'hall')
+    for operation in ('INSERT', 'UPDATE', 'DELETE')
+)
+
+
+def _columns(fields):
+    return ', '.join(f'"{field}"' for field in fields)
+
+
+def _show_key_range(show_date):
+    """Bounds of the show keys on one date, for an indexed range scan ('!' sorts right after ' ')"""
+    return f'{show_date.isoformat()} ', f'{show_date.isoformat()}!'
+
+
+def _placeholders(fields):
+    return ', '.join('?' for _ in fields)
+
+
+SELECT_SCREENS = f'SELECT {_columns(SCREEN_FIELDS)} FROM screens ORDER BY seq'
+SELECT_SCREEN = f'SELECT {_columns(SCREEN_FIELDS)} FROM screens WHERE "ScreenID" = ? ORDER BY seq LIMIT 1'
+INSERT_SCREEN = f'INSERT INTO screens ({_columns(SCREEN_FIELDS)}) VALUES ({_placeholders(SCREEN_FIELDS)})'
+SELECT_MOVIES = f'SELECT {_columns(MOVIE_FIELDS)} FROM movies ORDER BY seq'
+INSERT_MOVIE = f'INSERT INTO movies ({_columns(MOVIE_FIELDS)}) VALUES ({_placeholders(MOVIE_FIELDS)})'
+SELECT_USERS = 'SELECT username, password, wallet_balance FROM users ORDER BY seq'
+INSERT_USER = 'INSERT INTO users (username, password, wallet_balance) VALUES (?, ?, ?)'
+SELECT_BALANCE = 'SELECT "WalletBalance" FROM wallets WHERE "Username" = ?'
+SELECT_BALANCES = 'SELECT "Username", "WalletBalance" FROM wallets'
+SELECT_META = 'SELECT value FROM meta WHERE key = ?'
+UPSERT_META = 'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)'
+SELECT_WALLET_POSITION = 'SELECT COALESCE(MAX(seq), 0) FROM wallet_history'
+SELECT_WALLET_HISTORY_SINCE = (f'SELECT seq, {_columns(WALLET_HISTORY_FIELDS)} FROM wallet_history '
+                               'WHERE seq > ? ORDER BY seq')
+UPSERT_BALANCE = ('INSERT INTO wallets ("Username", "WalletBalance") VALUES (?, ?) '
+                  'ON CONFLICT ("Username") DO UPDATE SET "WalletBalance" = excluded."WalletBalance"')
+INSERT_WALLET_HISTORY = (f'INSERT INTO wallet_history ({_columns(WALLET_HISTORY_FIELDS)}) '
+                         f'VALUES ({_placeholders(WALLET_HISTORY_FIELDS)})')
+SELECT_WALLET_HISTORY = (f'SELECT {_columns(WALLET_HISTORY_FIELDS)} FROM wallet_history '
+                         'WHERE "Username" = ? ORDER BY seq')
+SELECT_LATEST_WALLET_HISTORY = (f'SELECT {_columns(WALLET_HISTORY_FIELDS)} FROM wallet_history '
+                                'WHERE "Username" = ? ORDER BY seq DESC LIMIT ? OFFSET ?')
+SELECT_BOOKINGS = f'SELECT {_columns(BOOKING_FIELDS)} FROM bookings ORDER BY seq'
+SELECT_BOOKINGS_DATE = (f'SELECT {_columns(BOOKING_FIELDS)} FROM bookings '
+                        'WHERE "Show_Timing" >= ? AND "Show_Timing" < ? ORDER BY seq')
+SELECT_USER_BOOKINGS = f'SELECT {_columns(BOOKING_FIELDS)} FROM bookings WHERE "UID" = ? ORDER BY seq'
+INSERT_BOOKING = f'INSERT INTO bookings ({_columns(BOOKING_FIELDS)}) VALUES ({_placeholders(BOOKING_FIELDS)})'
+SELECT_BOOKING = f'SELECT {_columns(BOOKING_FIELDS)} FROM bookings WHERE "BookingID" = ? LIMIT 1'
+SELECT_BOOKING_EXISTS = 'SELECT 1 FROM bookings WHERE "BookingID" = ? LIMIT 1'
+DELETE_BOOKING = 'DELETE FROM bookings WHERE "BookingID" = ?'
+UPDATE_BOOKING_STATUS = 'UPDATE bookings SET "Ticket_Status" = ?, "Cancellation_Date" = ? WHERE "BookingID" = ?'
+SELECT_HALL = f'SELECT {_columns(HALL_FIELDS)} FROM hall'
+SELECT_HALL_DATE = f'SELECT {_columns(HALL_FIELDS)} FROM hall WHERE "ShowTime" >= ? AND "ShowTime" < ?'
+DELETE_HALL_BEFORE = ('DELETE FROM hall WHERE "ShowTime" GLOB \'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] *\' '
+                      'AND "ShowTime" < ?')
+UPSERT_HALL = f'INSERT OR REPLACE INTO hall ({_columns(HALL_FIELDS)}) VALUES ({_placeholders(HALL_FIELDS)})'
+
+
+class SqliteStorage:
+    """Storage backend backed by a single SQLite database in WAL mode.
+
+    Lookups use indexed tables and every query is a constant parameterized
+    statement, so sqlite3's per-connection statement cache reuses the
+    prepared statements. The database is seeded from the CSV files the first
+    time it is created. The connection may be used from a thread other than
+    the one that opened it (the socket server's worker thread), but only by
+    one thread at a time.
+    """
+
+    def __init__(self, db_file='csvs/ticket_booking.db', login_file='csvs/login_details.csv',
+                 booking_file='csvs/booking_details.csv'):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA + GENERATION_TRIGGERS)
+        self.archive = BookingArchive()
+
+        if not self.conn.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone():
+            self._import_csvs(CsvStorage(login_file=login_file, booking_file=booking_file))
+
+    def _import_csvs(self, source):
+        with self.conn:
+            self.conn.executemany(INSERT_SCREEN, [self._values(r, SCREEN_FIELDS) for r in source.list_screens()])
+            self.conn.executemany(INSERT_MOVIE, [self._values(r, MOVIE_FIELDS) for r in source.list_movies()])
+            self.conn.executemany(INSERT_USER, [self._user_values(r) for r in source.load_login_rows()[1:] if r])
+            for row in source._read_rows(source.wallet_file):
+                try:
+                    self.conn.execute(UPSERT_BALANCE, (row['Username'], float(row['WalletBalance'])))
+                except (ValueError, KeyError, TypeError):
+                    continue
+            history = source._read_rows(source.wallet_history_file)
+            self.conn.executemany(INSERT_WALLET_HISTORY, [self._values(r, WALLET_HISTORY_FIELDS) for r in history])
+            bookings = source.list_bookings()
+            seen = {row.get('BookingID') for row in bookings}
+            if os.path.isdir(source.bookings_dir):
+                for file_name in sorted(os.listdir(source.bookings_dir)):
+                    if not file_name.endswith('_bookings.csv'):
+                        continue
+                    user_rows = source._read_rows(os.path.join(source.bookings_dir, file_name))
+                    for row in source._apply_statuses(user_rows):
+                        if row.get('BookingID') not in seen:
+                            seen.add(row.get('BookingID'))
+                            bookings.append(row)
+            bookings.sort(key=lambda row: (row.get('Date') or '', row.get('Time') or ''))
+            self.conn.executemany(INSERT_BOOKING, [self._values(r, BOOKING_FIELDS) for r in bookings])
+            self.conn.executemany(UPSERT_HALL, source.load_hall())
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported', '1')")
+
+    def source_files(self):
+        return {}
+
+    def data_version(self, names=None):
+        """data_version moves on commits from other connections, total_changes on our own"""
+        return self.conn.execute('PRAGMA data_version').fetchone()[0], self.conn.total_changes
+
+    def state_token(self):
+        return self.conn.execute(SELECT_META, ('generation',)).fetchone()[0]
+
+    def _values(self, row, fields):
+        return tuple('' if row.get(field) is None else str(row.get(field)) for field in fields)
+
+    def _user_values(self, row):
+        row = list(row) + [None] * (3 - len(row))
+        return row[0], row[1], row[2]
+
+    def _rows(self, query, params, fields):
+        return [dict(zip(fields, row)) for row in self.conn.execute(query, params)]
+
+    def list_screens(self):
+        return self._rows(SELECT_SCREENS, (), SCREEN_FIELDS)
+
+    def get_screen(self, screen_id):
+        rows = self._rows(SELECT_SCREEN, (screen_id,), SCREEN_FIELDS)
+        return rows[0] if rows else None
+
+    def save_screens(self, rows):
+        self.commit_catalog(screens=rows)
+
+    def add_screen(self, row):
+        with self.conn:
+            self.conn.execute(INSERT_SCREEN, self._values(row, SCREEN_FIELDS))
+
+    def list_movies(self):
+        return self._rows(SELECT_MOVIES, (), MOVIE_FIELDS)
+
+    def save_movies(self, rows):
+        self.commit_catalog(movies=rows)
+
+    def add_movie(self, row):
+        with self.conn:
+            self.conn.execute(INSERT_MOVIE, self._values(row, MOVIE_FIELDS))
+
+    def commit_catalog(self, screens=None, movies=None, hall=None):
+        """Replace the given tables in one transaction"""
+        with self.conn:
+            if screens is not None:
+                self.conn.execute('DELETE FROM screens')
+                self.conn.executemany(INSERT_SCREEN, [self._values(r, SCREEN_FIELDS) for r in screens])
+            if movies is not None:
+                self.conn.execute('DELETE FROM movies')
+                self.conn.executemany(INSERT_MOVIE, [self._values(r, MOVIE_FIELDS) for r in movies])
+            if hall is not None:
+                self.conn.execute('DELETE FROM hall')
+                self.conn.executemany(UPSERT_HALL, hall)
+
+    def load_login_rows(self):
+        rows = [list(LOGIN_FIELDS)]
+        for username, password, balance in self.conn.execute(SELECT_USERS):
+            rows.append([username, password] + ([balance] if balance is not None else []))
+        return rows
+
+    def save_login_rows(self, rows):
+        with self.conn:
+            self.conn.execute('DELETE FROM users')
+            self.conn.executemany(INSERT_USER, [self._user_values(r) for r in rows[1:] if r])
+
+    def get_balance(self, username):
+        row = self.conn.execute(SELECT_BALANCE, (username,)).fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    def save_balances(self, balances):
+        with self.conn:
+            self.conn.executemany(UPSERT_BALANCE, [(u, float(b)) for u, b in balances.items()])
+
+    def load_wallet_snapshot(self):
+        balances = {username: float(balance) for username, balance in self.conn.execute(SELECT_BALANCES)
+                    if balance is not None}
+        row = self.conn.execute(SELECT_META, ('wallet_position',)).fetchone()
+        return balances, int(row[0]) if row else None
+
+    def save_wallet_snapshot(self, balances, position):
+        with self.conn:
+            self.conn.executemany(UPSERT_BALANCE, [(u, float(b)) for u, b in balances.items()])
+            self.conn.execute(UPSERT_META, ('wallet_position', str(position)))
+
+    def wallet_history_position(self):
+        return self.conn.execute(SELECT_WALLET_POSITION).fetchone()[0]
+
+    def wallet_version(self):
+        """PRAGMA data_version only changes when another connection commits"""
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def wallet_history_since(self, position):
+        rows = []
+        for row in self.conn.execute(SELECT_WALLET_HISTORY_SINCE, (position,)):
+            position = row[0]
+            rows.append(dict(zip(WALLET_HISTORY_FIELDS, row[1:])))
+        return rows, position
+
+    def wallet_history_mark(self, usernames):
+        return {'ledger': self.wallet_history_position()}
+
+    def restore_wallet_history(self, mark):
+        """A sync inserts its ledger rows in one transaction, so they are either all stored or none are"""
+        return self.wallet_history_position() > mark['ledger']
+
+    def append_wallet_history(self, transactions):
+        with self.conn:
+            self.conn.executemany(INSERT_WALLET_HISTORY, [self._values(t, WALLET_HISTORY_FIELDS) for t in transactions])
+
+    def wallet_history(self, username):
+        return self._rows(SELECT_WALLET_HISTORY, (username,), WALLET_HISTORY_FIELDS)
+
+    def latest_wallet_history(self, username, limit, skip=0):
+        return self._rows(SELECT_LATEST_WALLET_HISTORY, (username, limit, skip), WALLET_HISTORY_FIELDS)
+
+    def load_booking_rows(self):
+        return [list(BOOKING_FIELDS)] + [list(row) for row in self.conn.execute(SELECT_BOOKINGS)]
+
+    def save_booking_rows(self, rows):
+        header = rows[0] if rows else BOOKING_FIELDS
+        with self.conn:
+            self.conn.execute('DELETE FROM bookings')
+            self.conn.executemany(INSERT_BOOKING, [
+                self._values(dict(zip(header, row)), BOOKING_FIELDS) for row in rows[1:] if row
+            ])
+
+    def list_bookings(self):
+        return self._rows(SELECT_BOOKINGS, (), BOOKING_FIELDS)
+
+    def list_bookings_date(self, show_date):
+        return self._rows(SELECT_BOOKINGS_DATE, _show_key_range(show_date), BOOKING_FIELDS)
+
+    def _scan(self, query, all_fields, fields, skip=None):
+        positions = [all_fields.index(field) if field in all_fields else None for field in fields]
+        id_position = all_fields.index('BookingID') if skip else None
+        for values in self.conn.execute(query):
+            if id_position is not None and values[id_position] in skip:
+                continue
+            yield tuple('' if position is None or values[position] is None else values[position] for position in positions)
+
+    def scan_bookings(self, fields):
+        """Yield the values of the given fields for every booking, archived ones first"""
+        yield from self.archive.scan(fields)
+        yield from self._scan(SELECT_BOOKINGS, BOOKING_FIELDS, fields, self.archive.booking_ids())
+
+    def booking_sources(self):
+        """Bookings are table rows here, so readers go through scan_bookings()"""
+        return None
+
+    def archived_user_names(self):
+        return self.archive.user_names()
+
+    def user_bookings(self, uid, archived=False):
+        rows = self._rows(SELECT_USER_BOOKINGS, (uid,), BOOKING_FIELDS)
+        if archived:
+            rows = _with_archived(rows, self.archive.user_rows(uid))
+        return rows
+
+    def append_bookings(self, records):
+        """Insert bookings, skipping any a sync that failed part way already stored"""
+        with self.conn:
+            records = [r for r in records if not self.conn.execute(SELECT_BOOKING_EXISTS, (r['BookingID'],)).fetchone()]
+            self.conn.executemany(INSERT_BOOKING, [self._values(r, BOOKING_FIELDS) for r in records])
+
+    def get_booking(self, booking_id):
+        rows = self._rows(SELECT_BOOKING, (booking_id,), BOOKING_FIELDS)
+        return rows[0] if rows else self.archive.get(booking_id)
+
+    def archive_bookings(self, before):
+        """Move bookings for shows dated before the given date into the archive; returns how many moved"""
+        cutoff = before.isoformat()
+        finished = []
+        for row in self.list_bookings():
+            partition = self.archive.partition_of(row)
+            if partition and partition < cutoff:
+                finished.append(row)
+        if not finished:
+            return 0
+
+        self.archive.add(finished)
+        with self.conn:
+            self.conn.executemany(DELETE_BOOKING, [(row['BookingID'],) for row in finished])
+        return len(finished)
+
+    def update_booking_statuses(self, updates):
+        with self.conn:
+            self.conn.executemany(UPDATE_BOOKING_STATUS, [
+                (update['Ticket_Status'], update.get('Cancellation_Date', ''), update['BookingID'])
+                for update in updates
+            ])
+
+    def update_booking_status(self, booking_id, uid, status, cancellation_date=''):
+        self.update_booking_statuses([{
+            'BookingID': booking_id,
+            'UID': uid,
+            'Ticket_Status': status,
+            'Cancellation_Date': cancellation_date
+        }])
+
+    def compact_bookings(self):
+        """Statuses are updated in place through the BookingID index"""
+        return None
+
+    def load_hall(self):
+        return [tuple(row) for row in self.conn.execute(SELECT_HALL)]
+
+    def load_hall_date(self, show_date):
+        return [tuple(row) for row in self.conn.execute(SELECT_HALL_DATE, _show_key_range(show_date))]
+
+    def drop_hall_before(self, before):
+        with self.conn:
+            return self.conn.execute(DELETE_HALL_BEFORE, (before.isoformat(),)).rowcount
+
+    def save_hall(self, rows):
+        self.commit_catalog(hall=rows)
+
+    def update_hall_rows(self, rows):
+        with self.conn:
+            self.conn.executemany(UPSERT_HALL, rows)
+
+    def compact_hall(self):
+        """Rows are updated in place, so there is no delta to fold"""
+        return None
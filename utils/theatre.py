@@ -1,23 +1,51 @@
-from datetime import datetime
+from contextlib import ExitStack
+from datetime import date, datetime
 import csv
 import os
 import ast
 import uuid
 
+from utils.allocator import best_available
+from utils.catalog import Catalog
+from utils.hall_snapshot import read_hall_snapshot, write_hall_snapshot
+from utils.holds import HoldTable
+from utils.locks import file_lock, show_lock, wallet_lock
+from utils.replay import movie_id_index, replay_bookings
+from utils.schedule import Schedule, parse_show_key, selling_dates
+from utils.seat_inventory import SeatInventory
+from utils.seat_map import SeatMap
+from utils.seat_render import SeatGridRenderer
+
 class Theatre:
 
     _seat_tracker = {} 
 
     def __init__(self, login_instance):
         self.login = login_instance
+        self.catalog = Catalog(self.login.storage)
         self.hall_data = {}
+        self._dirty_shows = set()
         self.booking_history = []
         self.current_user = None
-        self._load_movies()
-        self._load_screens()
-        self._load_booking_history()
-        self._load_hall_data() 
+        self.hall_snapshot_file = 'csvs/hall_state.bin'
+        self._loaded_dates = set()
+        snapshot = None
+        if not self._load_hall_snapshot():
+            snapshot = self.login.current_snapshot()
+            self._load_movies(snapshot.movies)
+            self._load_screens(snapshot.screens)
+        self.schedule = Schedule(self.screens)
+        self.seat_inventory = SeatInventory()
+        self.attach_seat_inventory()
+        self.load_date(date.today(), snapshot.bookings if snapshot else None)
         self._init_seat_tracker()
+        self.login.booking_log.hall_state = self
+        self.holds = HoldTable()
+        self.seat_renderer = SeatGridRenderer()
+        try:
+            self.holds.recover()
+        except Exception as e:
+            print(f"[Warning] Could not recover seat holds: {str(e)}")
         self.wallet_history_file = 'csvs/wallet_history.csv'
         self._init_wallet_history_file()
         self.booking_fields = ['BookingID','Date','Time','UserName','UID','ScreenID','Show_Timing','Seat_Numbers','Movie_Name','Movie_ID','Total_Price','Ticket_Status','Cancellation_Date']
@@ -39,106 +67,167 @@ class Theatre:
                     cols = screen_data['dimensions']['cols']
                     self._seat_tracker[key] = rows * cols
 
-    def save_hall_data(self):
+    def _load_hall_snapshot(self):
+        """Restore catalog and seat maps from the binary snapshot if storage has not changed since it was written"""
         try:
-            with open('csvs/hall_data.csv', 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['ScreenID', 'ShowTime', 'Row', 'SeatStatus'])
-                
-                for screen_id, screen_data in self.hall_data.items():
-                    for show_time, timing_data in screen_data['seating'].items():
-                        for row, seats in timing_data['alpha_dict'].items():
-                            writer.writerow([
-                                screen_id,
-                                show_time,
-                                row,
-                                ','.join(str(s) for s in seats)
-                            ])
+            state = read_hall_snapshot(self.hall_snapshot_file, self.login.storage.state_token())
+        except Exception as e:
+            print(f"[Warning] Could not read hall snapshot: {str(e)}")
+            return False
+        if state is None:
+            return False
+        self.movie_list, self.screens, self.hall_data = state
+        return True
+
+    def attach_seat_inventory(self, rebuild=False):
+        """Map seat state onto the shared inventory file so seat flips are visible to other processes"""
+        try:
+            self.seat_inventory.attach(self.hall_data, rebuild=rebuild)
+        except Exception as e:
+            print(f"[Warning] Seat inventory unavailable, using private seat maps: {str(e)}")
+
+    def _refresh_seat_inventory(self):
+        if self.seat_inventory.is_stale():
+            self.attach_seat_inventory(rebuild=False)
+
+    def checkpoint(self):
+        """Bring storage up to date and write a binary hall snapshot matching it"""
+        self.login.booking_log.sync()
+        self.save_hall_data()
+        try:
+            write_hall_snapshot(
+                self.hall_snapshot_file,
+                self.login.storage.state_token(),
+                self.movie_list,
+                self.screens,
+                self.hall_data
+            )
+        except Exception as e:
+            print(f"[Warning] Could not write hall snapshot: {str(e)}")
+
+    def mark_show_dirty(self, screen_id, show_time):
+        self._dirty_shows.add((screen_id, show_time))
+
+    def hall_rows(self, full=False, exclude=()):
+        """Storage rows for changed shows, or for every show when full=True, skipping screens in exclude"""
+        rows = []
+        for screen_id, screen_data in self.hall_data.items():
+            if screen_id in exclude:
+                continue
+            for show_time, timing_data in screen_data['seating'].items():
+                if not full and (screen_id, show_time) not in self._dirty_shows:
+                    continue
+                seat_map = timing_data['seat_map']
+                for row_index, row in enumerate(timing_data['available_rows']):
+                    rows.append((
+                        screen_id,
+                        show_time,
+                        row,
+                        seat_map.row_tokens(row_index)
+                    ))
+        return rows
+
+    def mark_hall_saved(self):
+        """Forget dirty shows after a full hall snapshot was written elsewhere"""
+        self._dirty_shows.clear()
+
+    def save_hall_data(self, full=False):
+        """Persist seat rows of changed shows, or a full snapshot when full=True"""
+        try:
+            rows = self.hall_rows(full)
+            if full:
+                self.login.storage.save_hall(rows)
+            else:
+                self.login.storage.update_hall_rows(rows)
+            self._dirty_shows.clear()
         except Exception as e:
             print(f"Error saving hall data: {str(e)}")
 
-    def _load_hall_data(self):
+    def apply_seat_changes(self, seat_changes):
+        """Apply logged seat bookings and releases and persist the affected shows.
+
+        Seat maps backed by the shared inventory are not touched: the process
+        that logged an event flipped those bytes under the show lock, and a
+        replayed release could free a seat sold again since. Their current
+        state is what gets persisted. Returns the changes for shows this
+        theatre does not hold in memory.
+        """
+        unknown = []
+        for change in seat_changes:
+            screen_id = change['screen_id']
+            show_time = change['show_time']
+            if screen_id not in self.hall_data or show_time not in self.hall_data[screen_id]['seating']:
+                unknown.append(change)
+                continue
+
+            timing_data = self.hall_data[screen_id]['seating'][show_time]
+            self.mark_show_dirty(screen_id, show_time)
+            if timing_data['seat_map'].shared:
+                continue
+            for seat in change['seats']:
+                try:
+                    if change.get('release'):
+                        timing_data['seat_map'].free_seat(seat)
+                    else:
+                        timing_data['seat_map'].book_seat(seat)
+                except (ValueError, IndexError):
+                    continue
+
+        self.save_hall_data()
+        return unknown
+
+    def _load_hall_data(self, hall_rows=None):
         try:
-            if not os.path.exists('csvs/hall_data.csv'):
-                return
-                
-            with open('csvs/hall_data.csv', 'r') as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    return
-                    
-                for row in reader:
-                    screen_id = row['ScreenID']
-                    show_time = row['ShowTime']
-                    row_char = row['Row']
-                    seats = row['SeatStatus'].split(',')
+            if hall_rows is None:
+                hall_rows = self.login.storage.load_hall()
+            for screen_id, show_time, row_char, seat_status_str in hall_rows:
+                if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
+                    timing_data = self.hall_data[screen_id]['seating'][show_time]
+                    seat_map = timing_data['seat_map']
+                    row_index = ord(row_char.upper()) - 65
+                    if not 0 <= row_index < seat_map.rows:
+                        continue
                     
-                    if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
-                        seat_status = []
-                        for s in seats:
-                            if s == 'X':
-                                seat_status.append('X')
-                            else:
-                                try:
-                                    seat_status.append(int(s))
-                                except ValueError:
-                                    seat_status.append(0)
-                        
-                        timing_data = self.hall_data[screen_id]['seating'][show_time]
-                        timing_data['alpha_dict'][row_char] = seat_status
-                        
-                        available = sum(1 for s in seat_status if s == 0)
-                        timing_data['ticket_count'] = available
-                        
-                        booked_seats = sum(1 for s in seat_status if s == 'X')
-                        self.hall_data[screen_id]['seating'][show_time]['ticket_count'] = (
-                            self.hall_data[screen_id]['dimensions']['rows'] * 
-                            self.hall_data[screen_id]['dimensions']['cols'] - 
-                            booked_seats
-                        )
+                    seat_map.load_row_tokens(row_index, seat_status_str)
         except Exception as e:
             print(f"[Warning] Could not load hall data: {str(e)}")
 
-    def _load_movies(self):
+    def _load_movies(self, movie_rows=None):
         self.movie_list = {}
-        movies_file = 'csvs/movies.csv'
         
-        if os.path.exists(movies_file):
-            with open(movies_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('IsActive', '').lower() == 'yes':
-                        movie_id = int(row['MovieID'])
-                        self.movie_list[movie_id] = {
-                            "name": row['Title'],
-                            "price": float(row['Price']),
-                            "screen_id": row['ScreenID'],
-                        }
-
-    def _load_screens(self):
+        if movie_rows is None:
+            movie_rows = self.catalog.movies()
+        for row in movie_rows:
+            if row.get('IsActive', '').lower() == 'yes':
+                movie_id = int(row['MovieID'])
+                self.movie_list[movie_id] = {
+                    "name": row['Title'],
+                    "price": float(row['Price']),
+                    "screen_id": row['ScreenID'],
+                }
+
+    def _load_screens(self, screen_rows=None):
         self.screens = {}
-        screens_file = 'csvs/screens.csv'
         
-        if os.path.exists(screens_file):
-            with open(screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('Status', '').lower() == 'active':
-                        screen_id = row['ScreenID']
-                        rows = int(row['Rows'])
-                        cols = int(row['Columns'])
-                        
-                        timings = row.get('Timings', '').split(';') if 'Timings' in row else []
-                        if not timings and 'ShowTimes' in row:
-                            timings = row['ShowTimes'].split(';')
-                        
-                        self.screens[screen_id] = {
-                            "rows": rows,
-                            "columns": cols,
-                            "last_maintenance": row.get('LastMaintenance', ''),
-                            "timings": timings
-                        }
-                        self._init_screen_seating(screen_id, rows, cols, timings)
+        if screen_rows is None:
+            screen_rows = self.catalog.screens()
+        for row in screen_rows:
+            if row.get('Status', '').lower() == 'active':
+                screen_id = row['ScreenID']
+                rows = int(row['Rows'])
+                cols = int(row['Columns'])
+                
+                timings = row.get('Timings', '').split(';') if 'Timings' in row else []
+                if not timings and 'ShowTimes' in row:
+                    timings = row['ShowTimes'].split(';')
+                
+                self.screens[screen_id] = {
+                    "rows": rows,
+                    "columns": cols,
+                    "last_maintenance": row.get('LastMaintenance', ''),
+                    "timings": timings
+                }
+                self._init_screen_seating(screen_id, rows, cols, [])
 
 
     def _init_screen_seating(self, screen_id, rows, cols, timings):
@@ -154,95 +243,106 @@ class Theatre:
         for time in timings:
             if time not in self.hall_data[screen_id]['seating']:
                 self.hall_data[screen_id]['seating'][time] = {
-                    'alpha_dict': {row: [0]*cols for row in available_rows},
+                    'seat_map': SeatMap(rows, cols),
                     'booked_seats': {},
-                    'ticket_count': rows * cols,
                     'available_rows': available_rows,
                     'available_cols': available_cols
                 }
 
-    def _load_booking_history(self):
-        """Load booking history from file and reconstruct all active bookings"""
-        if not os.path.exists(self.login.file2):
+    def load_date(self, show_date, booking_rows=None):
+        """Set up the seat maps of every show on show_date the first time that date is used.
+
+        Seat state for the new shows comes from their stored hall rows and
+        the bookings made for them. Shows with no stored rows get them
+        written right away, under the booking log lock, so a sync in another
+        process that has not loaded this date still finds rows to update.
+        Unless booking_rows is given, only that date's bookings are read.
+        """
+        if show_date in self._loaded_dates:
             return
 
-        with open(self.login.file2, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if len(row) < 9:
-                    continue
-                    
-                self.booking_history.append(row)
-                
-                if row.get('Ticket_Status', '').lower() != 'booked':
-                    continue
-                    
-                screen_id = row.get('ScreenID')
-                show_time = row.get('Show_Timing')
-                seats_str = row.get('Seat_Numbers', '[]')
-                user_id = row.get('UID')
-                movie_name = row.get('Movie_Name')
-                
+        self.login.booking_log.sync()
+        added = set()
+        with file_lock('booking_log'):
+            for screen_id, screen in self.screens.items():
+                seating = self.hall_data.get(screen_id, {}).get('seating', {})
+                keys = [key for key in self.schedule.shows_on(screen_id, show_date) if key not in seating]
+                if keys:
+                    self._init_screen_seating(screen_id, screen['rows'], screen['columns'], keys)
+                    added.update((screen_id, key) for key in keys)
+
+            if added:
+                hall_rows = [row for row in self.login.storage.load_hall_date(show_date) if row[:2] in added]
+                self._load_hall_data(hall_rows)
+                if booking_rows is None:
+                    booking_rows = self.login.storage.list_bookings_date(show_date)
+                replay_bookings(
+                    (row for row in booking_rows if (row.get('ScreenID'), row.get('Show_Timing')) in added),
+                    self.hall_data,
+                    movie_id_index(self.movie_list)
+                )
+                stored = {row[:2] for row in hall_rows}
+                for screen_id, show_time in added - stored:
+                    self.mark_show_dirty(screen_id, show_time)
+                self.save_hall_data()
+
+        self._loaded_dates.add(show_date)
+        if added:
+            self.attach_seat_inventory()
+
+    def add_screen_shows(self, screen_id, rows, cols, timings):
+        """Schedule a new screen's daily timings and set up its shows on every date already loaded"""
+        self.screens[screen_id] = {
+            "rows": rows,
+            "columns": cols,
+            "last_maintenance": datetime.now().strftime('%Y-%m-%d'),
+            "timings": timings
+        }
+        self.schedule.set_times(screen_id, timings)
+        self._init_screen_seating(screen_id, rows, cols, [])
+        for show_date in sorted(self._loaded_dates):
+            for show_time in self.schedule.shows_on(screen_id, show_date):
+                if show_time not in self.hall_data[screen_id]['seating']:
+                    self._init_screen_seating(screen_id, rows, cols, [show_time])
+                    self.mark_show_dirty(screen_id, show_time)
+
+    def remove_screen_shows(self, screen_id):
+        self.schedule.remove(screen_id)
+        self.screens.pop(screen_id, None)
+        self.hall_data.pop(screen_id, None)
+
+    def archive_finished_shows(self):
+        """Move bookings and stored seat rows of shows before today out of the hot storage files.
+
+        Returns (bookings archived, hall rows removed). Past dates are also
+        dropped from memory.
+        """
+        today = date.today()
+        self.login.booking_log.sync()
+        with file_lock('booking_log'):
+            archived = self.login.storage.archive_bookings(today)
+            removed = self.login.storage.drop_hall_before(today)
+
+        for screen_id, screen_data in self.hall_data.items():
+            for show_time in list(screen_data['seating']):
                 try:
-                    seats = ast.literal_eval(seats_str) if seats_str.startswith('[') else [seats_str]
-                except:
-                    continue
-                    
-                if screen_id not in self.hall_data:
-                    screen_info = self._get_screen_info(screen_id)
-                    if screen_info:
-                        rows = int(screen_info['Rows'])
-                        cols = int(screen_info['Columns'])
-                        self._init_screen_seating(screen_id, rows, cols, [show_time])
-                    
-                if (screen_id not in self.hall_data or 
-                    show_time not in self.hall_data[screen_id]['seating']):
-                    continue
-                    
-                timing_data = self.hall_data[screen_id]['seating'][show_time]
-                
-                movie_id = None
-                for mid, movie in self.movie_list.items():
-                    if movie['name'] == movie_name:
-                        movie_id = mid
-                        break
-                
-                if not movie_id:
+                    show_date = parse_show_key(show_time)[0]
+                except ValueError:
                     continue
-                    
-                for seat in seats:
-                    try:
-                        row_char = seat[0].upper()
-                        col_str = seat[1:]
-                        col_index = timing_data['available_cols'].index(col_str)
-                        
-                        timing_data['alpha_dict'][row_char][col_index] = 'X'
-                        timing_data['ticket_count'] -= 1
-                        
-                        timing_data['booked_seats'][seat] = {
-                            'user_name': row.get('UserName'),
-                            'movie_id': movie_id,
-                            'seat': seat,
-                            'show_time': show_time,
-                            'user_id': user_id,
-                            'price_paid': float(row.get('Total_Price', 0)) / len(seats),
-                            'screen_id': screen_id,
-                            'booking_date': row.get('Date')
-                        }
-                    except (ValueError, IndexError):
-                        continue
-
-    def _get_screen_info(self, screen_id):
-        """Get screen info from screens.csv"""
-        screens_file = 'csvs/screens.csv'
-        if os.path.exists(screens_file):
-            with open(screens_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('ScreenID') == screen_id:
-                        return row
-        return None
-
+                if show_date is not None and show_date < today:
+                    del screen_data['seating'][show_time]
+                    self._dirty_shows.discard((screen_id, show_time))
+        self._loaded_dates = {show_date for show_date in self._loaded_dates if show_date >= today}
+        return archived, removed
+
+    def show_data(self, screen_id, show_time):
+        """Seating of one show, loading its date first if needed; None if the screen has no such show"""
+        if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
+            return self.hall_data[screen_id]['seating'][show_time]
+        if not self.schedule.is_scheduled(screen_id, show_time):
+            return None
+        self.load_date(parse_show_key(show_time)[0])
+        return self.hall_data.get(screen_id, {}).get('seating', {}).get(show_time)
 
     def seats(self, screen_id, rows, cols):
         self.available_rows = [chr(65 + i) for i in range(rows)]
@@ -261,14 +361,14 @@ class Theatre:
         for time in timings:
             if time not in self.hall_data[screen_id]['seating']:
                 self.hall_data[screen_id]['seating'][time] = {
-                    'alpha_dict': {row: [0]*cols for row in self.available_rows},
+                    'seat_map': SeatMap(rows, cols),
                     'booked_seats': {},
-                    'ticket_count': rows * cols,
                     'available_rows': self.available_rows,
                     'available_cols': self.available_cols
                 }
 
     def display_seats(self):
+        self._refresh_seat_inventory()
         print("\nAvailable Movies:")
         for key, val in self.movie_list.items():
             print(f"{key}. {val['name']} (Screen: {val['screen_id']})")
@@ -290,61 +390,223 @@ class Theatre:
             
             for show_time, timing_data in self.hall_data[screen_id]['seating'].items():
                 print(f"\n{show_time} Show:")
-                print("  ", " ".join(f"{col:>2}" for col in timing_data['available_cols']))
-                
-                for row_label in timing_data['available_rows']:
-                    seats = timing_data['alpha_dict'][row_label]
-                    print(f"{row_label}:", " ".join(' X' if seat == 'X' else ' .' for seat in seats))
+                self.seat_renderer.show(screen_id, show_time, timing_data)
 
         except ValueError:
             print("Please enter a valid number.")
 
 
-    def update_booking_csv(self, name, uid, show_time, seats, movie_id, status, total_price=None):
+    def _build_booking_record(self, name, uid, show_time, seats, movie_id, status, total_price=None):
+        movie_name = self.movie_list[movie_id]['name']
+        screen_id = self.movie_list[movie_id]['screen_id']
+        
+        return {
+            'BookingID': str(uuid.uuid4()),
+            'Date': datetime.today().strftime('%Y-%m-%d'),
+            'Time': datetime.today().strftime('%H:%M:%S'),
+            'UserName': name,
+            'UID': uid,
+            'ScreenID': screen_id,
+            'Show_Timing': show_time,
+            'Seat_Numbers': str(seats),
+            'Movie_Name': movie_name,
+            'Movie_ID': movie_id,
+            'Total_Price': total_price,
+            'Ticket_Status': status,
+            'Cancellation_Date': '' if status.lower() != 'cancelled' else datetime.today().strftime('%Y-%m-%d')
+        }
+
+    def _reload_show(self, screen_id, show_time):
+        """Re-read one show's seat state from shared storage; called with the show lock held"""
+        if self.seat_inventory.is_attached():
+            self._refresh_seat_inventory()
+            return
+
+        self.login.booking_log.sync()
+        timing_data = self.hall_data[screen_id]['seating'][show_time]
+        seat_map = timing_data['seat_map']
+        for row_screen, row_show, row_char, seat_status_str in self.login.storage.load_hall():
+            if row_screen == screen_id and row_show == show_time:
+                row_index = ord(row_char.upper()) - 65
+                if 0 <= row_index < seat_map.rows:
+                    seat_map.load_row_tokens(row_index, seat_status_str)
+
+    def _auto_select_seats(self, screen_id, show_time, n, uid):
+        """Offer the best n seats together and hold them if the user accepts; None to pick by hand"""
+        held_by_others = [seat for seat, owner in self.holds.held(screen_id, show_time).items() if owner != uid]
+        seats = best_available(self.hall_data[screen_id]['seating'][show_time]['seat_map'], n, held_by_others)
+        if seats is None:
+            print("Not enough free seats to choose automatically.")
+            return None
+
         try:
-            movie_name = self.movie_list[movie_id]['name']
-            screen_id = self.movie_list[movie_id]['screen_id']
+            self.holds.hold(screen_id, show_time, seats, uid)
+        except ValueError as e:
+            print(f"{str(e)}. Please choose seats yourself.")
+            return None
+
+        print(f"\nBest available seats: {', '.join(seats)}")
+        if input("Take these seats? (y/n): ").lower() != 'y':
+            self.holds.release(screen_id, show_time, uid, seats)
+            return None
+        return seats
+
+    def _commit_booking(self, user_name, show_time, seats, movie_id, total_price):
+        """Persist a confirmed booking as one booking log event and apply it in memory.
+
+        The show is locked across processes and its seats are re-read inside
+        the lock, so two kiosks cannot sell the same seat.
+        """
+        uid = self.login.current_user
+        movie_data = self.movie_list[movie_id]
+        screen_id = movie_data['screen_id']
+
+        with show_lock(screen_id, show_time):
+            self._reload_show(screen_id, show_time)
+            timing_data = self.hall_data[screen_id]['seating'][show_time]
+            seat_map = timing_data['seat_map']
+
+            for seat in seats:
+                if seat_map.is_seat_booked(seat):
+                    raise ValueError(f"Seat {seat} is no longer available")
+            self.holds.check(screen_id, show_time, seats, uid)
+
+            with wallet_lock(uid):
+                balance = self.login.check_balance(uid)
+                if balance < total_price:
+                    raise ValueError(f"Insufficient balance: need ₹{total_price}, have ₹{balance}")
+                new_balance = balance - total_price
+                booking_record = self._build_booking_record(user_name, uid, show_time, seats, movie_id, 'booked', total_price)
+                transaction = self.login._wallet_transaction(uid, -total_price, new_balance, "Purchase")
+
+                appended = self.login.booking_log.append({
+                    'type': 'booking',
+                    'booking': booking_record,
+                    'seats': {'screen_id': screen_id, 'show_time': show_time, 'seats': seats},
+                    'wallet': transaction
+                })
+                self.login.set_balance(uid, new_balance, appended)
+            self._mark_booked(user_name, uid, show_time, seats, movie_id)
+
+        self.holds.release(screen_id, show_time, uid, seats)
+        self.mark_show_dirty(screen_id, show_time)
+        self.booking_history.append(booking_record)
+        return new_balance
+
+    def _mark_booked(self, user_name, uid, show_time, seats, movie_id):
+        movie_data = self.movie_list[movie_id]
+        screen_id = movie_data['screen_id']
+        timing_data = self.hall_data[screen_id]['seating'][show_time]
+
+        for seat in seats:
+            timing_data['seat_map'].book_seat(seat)
             
-            booking_record = {
-                'BookingID': str(uuid.uuid4()),
-                'Date': datetime.today().strftime('%Y-%m-%d'),
-                'Time': datetime.today().strftime('%H:%M:%S'),
-                'UserName': name,
-                'UID': uid,
-                'ScreenID': screen_id,
-                'Show_Timing': show_time,
-                'Seat_Numbers': str(seats),
-                'Movie_Name': movie_name,
-                'Movie_ID': movie_id,
-                'Total_Price': total_price,
-                'Ticket_Status': status,
-                'Cancellation_Date': '' if status.lower() != 'cancelled' else datetime.today().strftime('%Y-%m-%d')
+            timing_data['booked_seats'][seat] = {
+                'user_name': user_name,
+                'movie_id': movie_id,
+                'seat': seat,
+                'show_time': show_time,
+                'user_id': uid,
+                'price_paid': movie_data["price"],
+                'screen_id': screen_id
             }
 
-            user_file = f'csvs/bookings/{uid}_bookings.csv'
-            os.makedirs('csvs/bookings', exist_ok=True)
-            file_exists = os.path.exists(user_file)
-            with open(user_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=self.booking_fields)
-                if not file_exists or f.tell() == 0:
-                    writer.writeheader()
-                writer.writerow(booking_record)
-
-            main_file = self.login.file2
-            file_exists = os.path.exists(main_file)
-            with open(main_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=self.booking_fields)
-                if not file_exists or f.tell() == 0:
-                    writer.writeheader()
-                writer.writerow(booking_record)
-
-            self.booking_history.append(booking_record)
-
-        except Exception as e:
-            print(f"Error updating booking records: {str(e)}")
-            raise
+    def book_batch(self, user_name, orders):
+        """Book several shows at once as one all-or-nothing commit.
+
+        orders is a list of dicts with 'movie_id', 'show_time' and either
+        'seats' (a list of labels) or 'count' (seats picked by
+        best_available). Every show involved is locked, in a fixed order so
+        two batches cannot deadlock, and every line is validated before
+        anything is written. The whole batch is then logged as a single
+        event with one wallet debit, so a failure anywhere leaves no booking,
+        seat or wallet change behind. Returns (booking_records, new_balance).
+        """
+        uid = self.login.current_user
+        if not orders:
+            raise ValueError("The order is empty")
+
+        lines = []
+        for i, order in enumerate(orders, 1):
+            try:
+                movie_id = int(order.get('movie_id'))
+            except (TypeError, ValueError):
+                raise ValueError(f"Order line {i}: invalid movie number {order.get('movie_id')}")
+            if movie_id not in self.movie_list:
+                raise ValueError(f"Order line {i}: movie {movie_id} not found")
+            screen_id = self.movie_list[movie_id]['screen_id']
+            show_time = order.get('show_time')
+            if self.show_data(screen_id, show_time) is None:
+                raise ValueError(f"Order line {i}: no {show_time} show on screen {screen_id}")
+            lines.append((i, movie_id, screen_id, show_time, order))
+
+        with ExitStack() as stack:
+            for screen_id, show_time in sorted({(line[2], line[3]) for line in lines}):
+                stack.enter_context(show_lock(screen_id, show_time))
+                self._reload_show(screen_id, show_time)
+
+            taken = {}
+            records = []
+            seat_changes = []
+            total_price = 0
+            for i, movie_id, screen_id, show_time, order in lines:
+                seat_map = self.hall_data[screen_id]['seating'][show_time]['seat_map']
+                in_batch = taken.setdefault((screen_id, show_time), set())
+                held_by_others = {seat for seat, owner in self.holds.held(screen_id, show_time).items() if owner != uid}
+
+                if order.get('seats'):
+                    seats = [str(seat).upper() for seat in order['seats']]
+                    for seat in seats:
+                        try:
+                            booked = seat_map.is_seat_booked(seat)
+                        except (ValueError, IndexError):
+                            raise ValueError(f"Order line {i}: invalid seat {seat}")
+                        if booked or seat in in_batch or seat in held_by_others:
+                            raise ValueError(f"Order line {i}: seat {seat} is not available")
+                        in_batch.add(seat)
+                else:
+                    try:
+                        count = int(order.get('count') or 0)
+                    except (TypeError, ValueError):
+                        count = 0
+                    if count <= 0:
+                        raise ValueError(f"Order line {i}: give a seat list or a positive seat count")
+                    seats = best_available(seat_map, count, held_by_others | in_batch)
+                    if seats is None:
+                        raise ValueError(f"Order line {i}: fewer than {count} seats are free at {show_time}")
+                    in_batch.update(seats)
+
+                price = self.movie_list[movie_id]['price'] * len(seats)
+                total_price += price
+                records.append(self._build_booking_record(user_name, uid, show_time, seats, movie_id, 'booked', price))
+                seat_changes.append({'screen_id': screen_id, 'show_time': show_time, 'seats': seats})
+
+            stack.enter_context(wallet_lock(uid))
+            balance = self.login.check_balance(uid)
+            if balance < total_price:
+                raise ValueError(f"Insufficient balance: the order costs ₹{total_price}, balance is ₹{balance}")
+
+            new_balance = balance - total_price
+            transaction = self.login._wallet_transaction(uid, -total_price, new_balance, f"Batch purchase ({len(records)} bookings)")
+            appended = self.login.booking_log.append({
+                'type': 'batch',
+                'bookings': records,
+                'seat_changes': seat_changes,
+                'wallet': transaction
+            })
+            self.login.set_balance(uid, new_balance, appended)
+
+            for record, change in zip(records, seat_changes):
+                self._mark_booked(user_name, uid, change['show_time'], change['seats'], record['Movie_ID'])
+
+        for change in seat_changes:
+            self.holds.release(change['screen_id'], change['show_time'], uid, change['seats'])
+            self.mark_show_dirty(change['screen_id'], change['show_time'])
+        self.booking_history.extend(records)
+        return records, new_balance
 
     def book_ticket(self):
+        self._refresh_seat_inventory()
         print("\nAvailable Movies:")
         sorted_movies = sorted(self.movie_list.items(), key=lambda x: x[0])
         
@@ -382,12 +644,9 @@ class Theatre:
         timing_data = self.hall_data[screen_id]['seating'][show_time]
         available_rows = timing_data['available_rows']
         available_cols = timing_data['available_cols']
+        seat_map = timing_data['seat_map']
         
-        actual_available = sum(
-            seat == 0 
-            for row in timing_data['alpha_dict'].values() 
-            for seat in row
-        )
+        actual_available = seat_map.available
         
         while True:
             try:
@@ -436,14 +695,24 @@ class Theatre:
         booked_seats_list = []
         selected_seats = set()
         
+        uid = self.login.current_user
+
+        if input("Pick the best available seats automatically? (y/n): ").lower() == 'y':
+            auto_seats = self._auto_select_seats(screen_id, show_time, n, uid)
+            if auto_seats:
+                booked_seats_list = auto_seats
+                selected_seats = set(auto_seats)
+                booked = n
+        
         while booked < n:
+            held_by_others = {
+                seat: 'H' for seat, owner in self.holds.held(screen_id, show_time).items()
+                if owner != uid and not seat_map.is_seat_booked(seat)
+            }
             print(f"\n--- Seating for '{movie_data['name']}' at {show_time} ---")
-            print("   ", " ".join(f"{col:>2}" for col in available_cols))
-            for row_label in available_rows:
-                seats = timing_data['alpha_dict'][row_label]
-                print(f"{row_label}:", " ".join(' X' if seat == 'X' else ' .' for seat in seats))
+            self.seat_renderer.show(screen_id, show_time, timing_data, held_by_others)
             
-            print("\nSeats marked 'X' are booked, '.' are available")
+            print("\nSeats marked 'X' are booked, 'H' are held by another customer, '.' are available")
             print(f"Available rows: {', '.join(available_rows)}")
             print(f"Available columns: {', '.join(available_cols)}")
 
@@ -456,15 +725,20 @@ class Theatre:
                     continue
                     
                 seat_num = f"{row}{col}"
-                col_index = available_cols.index(col)
                 
                 if seat_num in selected_seats:
                     print("You've already selected this seat in current booking. Choose another.")
                     continue
                     
-                if timing_data['alpha_dict'][row][col_index] == 'X':
+                if seat_map.is_seat_booked(seat_num):
                     print("Seat already booked for this show time. Choose another.")
                     continue
+
+                try:
+                    self.holds.hold(screen_id, show_time, [seat_num], uid)
+                except ValueError as e:
+                    print(f"{str(e)}. Choose another.")
+                    continue
                     
                 selected_seats.add(seat_num)
                 booked_seats_list.append(seat_num)
@@ -483,51 +757,8 @@ class Theatre:
             
             if confirm == 'y':
                 try:
-                    new_balance = self.login.add_to_wallet(self.login.current_user, -total_price, description="Purchase")
+                    new_balance = self._commit_booking(user_name, show_time, booked_seats_list, movie_id, total_price)
                     print(f"\n₹{total_price} deducted. New balance: ₹{new_balance}")
-                    
-                    for seat in booked_seats_list:
-                        row_char = seat[0].upper()
-                        col_str = seat[1:]
-                        col_index = available_cols.index(col_str)
-                        
-                        if timing_data['alpha_dict'][row_char][col_index] == 0:
-                            timing_data['alpha_dict'][row_char][col_index] = 'X'
-                            timing_data['ticket_count'] -= 1
-                        
-                        timing_data['booked_seats'][seat] = {
-                            'user_name': user_name,
-                            'movie_id': movie_id,
-                            'seat': seat,
-                            'show_time': show_time,
-                            'user_id': self.login.current_user,
-                            'price_paid': movie_data["price"],
-                            'screen_id': screen_id
-                        }
-                    
-                    self.update_booking_csv(
-                        name=user_name,
-                        uid=self.login.current_user,
-                        show_time=show_time,
-                        seats=booked_seats_list,
-                        movie_id=movie_id,
-                        status='booked',
-                        total_price=total_price
-                    )
-
-                    self.booking_history.append({
-                        'Date': datetime.today().strftime('%Y-%m-%d'),
-                        'UserName': user_name,
-                        'UID': self.login.current_user,
-                        'ScreenID': screen_id,
-                        'Show_Timing': show_time,
-                        'Seat_Numbers': booked_seats_list,
-                        'Movie_Name': movie_data['name'],
-                        'Total_Price': total_price,
-                        'Ticket_Status': 'booked'
-                    })
-
-                    self.save_hall_data() 
 
                     print("\n" + "="*50)
                     print("BOOKING CONFIRMED".center(50))
@@ -542,15 +773,13 @@ class Theatre:
                     break
                     
                 except Exception as e:
+                    self.holds.release(screen_id, show_time, uid, booked_seats_list)
                     print(f"\nError processing booking: {str(e)}")
-                    try:
-                        self.login.add_to_wallet(self.login.current_user, total_price)
-                        print("Booking failed. Full refund issued.")
-                    except:
-                        print("Critical error: Could not issue refund. Please contact support.")
+                    print("Booking failed. No amount was deducted.")
                     break
             
             elif confirm == 'n':
+                self.holds.release(screen_id, show_time, uid, booked_seats_list)
                 print("Booking cancelled. Seats released.")
                 break
             
@@ -558,41 +787,41 @@ class Theatre:
                 print("Please enter 'y' or 'n'")
 
 
-    def cancel_ticket(self):
+    def active_bookings(self, uid):
+        """Booked (not cancelled) tickets of one user, newest first"""
+        self.login.booking_log.sync()
         user_bookings = []
-        user_file = f'csvs/bookings/{self.login.current_user}_bookings.csv'
         
-        if not os.path.exists(user_file):
-            print("\nYou have no active bookings to cancel.")
-            return
-        
-        with open(user_file, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row['Ticket_Status'].lower() == 'booked':
-                    try:
-                        seats = ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']]
-                        user_bookings.append({
-                            'booking_id': row['BookingID'],
-                            'date': row['Date'],
-                            'movie': row['Movie_Name'],
-                            'movie_id': int(row['Movie_ID']),
-                            'screen': row['ScreenID'],
-                            'time': row['Show_Timing'],
-                            'seats': seats,
-                            'price': float(row['Total_Price']),
-                            'status': row['Ticket_Status'],
-                            'booking_date': row.get('Date')
-                        })
-                    except Exception as e:
-                        print(f"Error processing booking {row.get('BookingID', 'unknown')}: {str(e)}")
-                        continue
+        for row in self.login.storage.user_bookings(uid):
+            if row['Ticket_Status'].lower() == 'booked':
+                try:
+                    seats = ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']]
+                    user_bookings.append({
+                        'booking_id': row['BookingID'],
+                        'date': row['Date'],
+                        'movie': row['Movie_Name'],
+                        'movie_id': int(row['Movie_ID']),
+                        'screen': row['ScreenID'],
+                        'time': row['Show_Timing'],
+                        'seats': seats,
+                        'price': float(row['Total_Price']),
+                        'status': row['Ticket_Status'],
+                        'booking_date': row.get('Date')
+                    })
+                except Exception as e:
+                    print(f"Error processing booking {row.get('BookingID', 'unknown')}: {str(e)}")
+                    continue
+
+        user_bookings.sort(key=lambda x: x.get('booking_date', ''), reverse=True)
+        return user_bookings
+
+    def cancel_ticket(self):
+        self._refresh_seat_inventory()
+        user_bookings = self.active_bookings(self.login.current_user)
 
         if not user_bookings:
             print("\nYou have no active bookings to cancel.")
             return
-        
-        user_bookings.sort(key=lambda x: x.get('booking_date', ''), reverse=True)
 
         print("\nYour Active Bookings:")
         print("=" * 130)
@@ -631,63 +860,17 @@ class Theatre:
             print("Cancellation aborted.")
             return
 
-        screen_id = booking['screen']
-        show_time = booking['time']
-        
-        if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
-            timing_data = self.hall_data[screen_id]['seating'][show_time]
-            for seat in booking['seats']:
-                try:
-                    row_char = seat[0].upper()
-                    col_str = seat[1:]
-                    col_index = timing_data['available_cols'].index(col_str)
-                    if timing_data['alpha_dict'][row_char][col_index] == 'X':
-                        timing_data['alpha_dict'][row_char][col_index] = 0
-                        timing_data['ticket_count'] += 1
-                        timing_data['booked_seats'].pop(seat, None)
-                except (ValueError, KeyError):
-                    print(f"Warning: Could not free seat {seat}")
-
         refund_amount = booking['price']
-        new_balance = self.login.add_to_wallet(
-            self.login.current_user,
-            refund_amount,
-            description=f"Refund for {booking['movie']}"
-        )
-
         try:
-            user_file = f'csvs/bookings/{self.login.current_user}_bookings.csv'
-            if os.path.exists(user_file):
-                temp_file = f'{user_file}.tmp'
-                with open(user_file, 'r') as infile, open(temp_file, 'w', newline='') as outfile:
-                    reader = csv.DictReader(infile)
-                    writer = csv.DictWriter(outfile, fieldnames=self.booking_fields)
-                    writer.writeheader()
-                    for row in reader:
-                        if row['BookingID'] == booking['booking_id']:
-                            row.update({
-                                'Ticket_Status': 'cancelled',
-                                'Cancellation_Date': datetime.today().strftime('%Y-%m-%d')
-                            })
-                        writer.writerow(row)
-                os.replace(temp_file, user_file)
-
-            main_file = self.login.file2
-            if os.path.exists(main_file):
-                temp_file = f'{main_file}.tmp'
-                with open(main_file, 'r') as infile, open(temp_file, 'w', newline='') as outfile:
-                    reader = csv.DictReader(infile)
-                    writer = csv.DictWriter(outfile, fieldnames=self.booking_fields)
-                    writer.writeheader()
-                    for row in reader:
-                        if row['BookingID'] == booking['booking_id']:
-                            row.update({
-                                'Ticket_Status': 'cancelled',
-                                'Cancellation_Date': datetime.today().strftime('%Y-%m-%d')
-                            })
-                        writer.writerow(row)
-                os.replace(temp_file, main_file)
+            new_balance = self._commit_cancellation(booking)
+        except Exception as e:
+            print(f"\nError during cancellation update: {str(e)}")
+            return
 
+        print(f"₹{refund_amount:.2f} added to wallet successfully.")
+        print(f"New balance: ₹{new_balance:.2f}")
+
+        try:
             print("\n" + "="*60)
             print("CANCELLATION COMPLETED".center(60))
             print("="*60)
@@ -699,43 +882,80 @@ class Theatre:
             print(f"{'New Balance:':<15} ₹{new_balance:.2f}")
             print("="*60)
 
-            self.save_hall_data()
-
         except Exception as e:
-            # print(f"\nError during cancellation update: {str(e)}")
-            if 'temp_file' in locals() and os.path.exists(temp_file):
-                os.remove(temp_file)
+            print(f"\nError during cancellation update: {str(e)}")
+
+    def _commit_cancellation(self, booking):
+        """Record a cancellation as one status event in the booking log and free the seats in memory"""
+        uid = self.login.current_user
+        screen_id = booking['screen']
+        show_time = booking['time']
+
+        with show_lock(screen_id, show_time):
+            self.login.booking_log.sync()
+            current = self.login.storage.get_booking(booking['booking_id'])
+            if current is not None and current.get('Ticket_Status', '').lower() != 'booked':
+                raise ValueError(f"Booking {booking['booking_id']} is already {current['Ticket_Status']}")
+
+            with wallet_lock(uid):
+                new_balance = self.login.check_balance(uid) + booking['price']
+                transaction = self.login._wallet_transaction(uid, booking['price'], new_balance, f"Refund for {booking['movie']}")
+
+                appended = self.login.booking_log.append({
+                    'type': 'cancellation',
+                    'status': {
+                        'BookingID': booking['booking_id'],
+                        'UID': uid,
+                        'Ticket_Status': 'cancelled',
+                        'Cancellation_Date': datetime.today().strftime('%Y-%m-%d')
+                    },
+                    'seats': {'screen_id': screen_id, 'show_time': show_time, 'seats': booking['seats'], 'release': True},
+                    'wallet': transaction
+                })
+                self.login.set_balance(uid, new_balance, appended)
+
+            if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
+                self._refresh_seat_inventory()
+                timing_data = self.hall_data[screen_id]['seating'][show_time]
+                for seat in booking['seats']:
+                    try:
+                        timing_data['seat_map'].free_seat(seat)
+                        timing_data['booked_seats'].pop(seat, None)
+                    except (ValueError, IndexError):
+                        print(f"Warning: Could not free seat {seat}")
+                self.mark_show_dirty(screen_id, show_time)
+
+        return new_balance
 
 
     def view_ticket_details(self):
         """Display booked tickets in serialized order with detailed view option"""
         try:
-            user_file = f'csvs/bookings/{self.login.current_user}_bookings.csv'
+            self.login.booking_log.sync()
+            rows = self.login.storage.user_bookings(self.login.current_user)
             
-            if not os.path.exists(user_file):
+            if not rows:
                 print("\nNo booked tickets found.")
                 return
                 
             bookings = []
-            with open(user_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['Ticket_Status'].lower() == 'booked':
-                        try:
-                            bookings.append({
-                                'booking_id': row['BookingID'],
-                                'date': row['Date'],
-                                'time': row['Time'],
-                                'movie': row['Movie_Name'],
-                                'screen': row['ScreenID'],
-                                'show_time': row['Show_Timing'],
-                                'seats': ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']],
-                                'price': float(row['Total_Price']),
-                                'movie_id': row['Movie_ID']
-                            })
-                        except Exception as e:
-                            print(f"Error processing booking {row.get('BookingID', 'unknown')}: {str(e)}")
-                            continue
+            for row in rows:
+                if row['Ticket_Status'].lower() == 'booked':
+                    try:
+                        bookings.append({
+                            'booking_id': row['BookingID'],
+                            'date': row['Date'],
+                            'time': row['Time'],
+                            'movie': row['Movie_Name'],
+                            'screen': row['ScreenID'],
+                            'show_time': row['Show_Timing'],
+                            'seats': ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']],
+                            'price': float(row['Total_Price']),
+                            'movie_id': row['Movie_ID']
+                        })
+                    except Exception as e:
+                        print(f"Error processing booking {row.get('BookingID', 'unknown')}: {str(e)}")
+                        continue
 
             if not bookings:
                 print("\nNo active bookings found.")
@@ -803,78 +1023,50 @@ class Theatre:
             if screen_id in self.hall_data and show_time in self.hall_data[screen_id]['seating']:
                 print("\nSeat Map:")
                 timing_data = self.hall_data[screen_id]['seating'][show_time]
-                print("   ", " ".join(f"{col:>2}" for col in timing_data['available_cols']))
-                
-                user_seats = set(booking['seats'])
-                
-                for row_label in timing_data['available_rows']:
-                    seats = timing_data['alpha_dict'][row_label]
-                    seat_display = []
-                    for col_idx, seat in enumerate(seats):
-                        seat_pos = f"{row_label}{timing_data['available_cols'][col_idx]}"
-                        if seat_pos in user_seats:
-                            seat_display.append(' O')
-                        elif seat == 'X':
-                            seat_display.append(' X')
-                        else:
-                            seat_display.append(' .')
-                    print(f"{row_label}:", " ".join(seat_display))
+                self.seat_renderer.show(screen_id, show_time, timing_data, {seat: 'O' for seat in booking['seats']})
         
         print("="*60)
         input("\nPress Enter to return to the menu...")
 
 
-    def check_remaining_seats(self):
+    def availability_summary(self):
+        """Available and total seats of every show, read from the seat maps' counters without any file I/O"""
+        movie_names = {}
+        for movie in self.movie_list.values():
+            movie_names.setdefault(movie['screen_id'], movie['name'])
+
         seats_data = []
+        for screen_id in sorted(self.hall_data.keys()):
+            if not screen_id.startswith('SC'):
+                continue
+            for show_time, timing_data in self.hall_data[screen_id]['seating'].items():
+                seat_map = timing_data['seat_map']
+                seats_data.append({
+                    'screen_id': screen_id,
+                    'movie': movie_names.get(screen_id, "No movie assigned"),
+                    'show_time': show_time,
+                    'available_seats': seat_map.available,
+                    'total_capacity': seat_map.capacity,
+                    'seat_map': seat_map
+                })
+        return seats_data
+
+    def check_remaining_seats(self):
+        self._refresh_seat_inventory()
         
-        print("\n" + "="*75)
-        print("AVAILABLE SEATS".center(75))
-        print("="*75)
-        print(f"{'Screen':<8} | {'Movie':<25} | {'Time':<8} | {'Available':<10} | {'Capacity':<10}")
-        print("-"*75)
+        print("\n" + "="*83)
+        print("AVAILABLE SEATS".center(83))
+        print("="*83)
+        print(f"{'Screen':<8} | {'Movie':<25} | {'Show':<16} | {'Available':<10} | {'Capacity':<10}")
+        print("-"*83)
         
         try:
-            self._load_hall_data()
-            
-            for screen_id in sorted(self.hall_data.keys()):
-                if not screen_id.startswith('SC'):
-                    continue
-                    
-                screen_info = self.hall_data[screen_id]
-                rows = screen_info['dimensions']['rows']
-                cols = screen_info['dimensions']['cols']
-                total_capacity = rows * cols
-                
-                current_movies = [
-                    movie for movie in self.movie_list.values() 
-                    if movie['screen_id'] == screen_id
-                ]
-                
-                for show_time, timing_data in screen_info['seating'].items():
-                    available_seats = 0
-                    for row in timing_data['alpha_dict'].values():
-                        available_seats += row.count(0)
-                    
-                    timing_data['ticket_count'] = available_seats
-                    
-                    movie_name = "No movie assigned"
-                    for movie in current_movies:
-                        movie_name = movie['name']
-                        break
-                        
-                    seats_data.append({
-                        'screen_id': screen_id,
-                        'movie': movie_name,
-                        'show_time': show_time,
-                        'available_seats': available_seats,
-                        'total_capacity': total_capacity,
-                        'seat_map': timing_data['alpha_dict']
-                    })
-                    
-                    print(f"{screen_id:<8} | {movie_name[:24]:<25} | {show_time:<8} | "
-                        f"{available_seats:<10} | {total_capacity:<10}")
+            seats_data = self.availability_summary()
+            for info in seats_data:
+                print(f"{info['screen_id']:<8} | {info['movie'][:24]:<25} | {info['show_time']:<16} | "
+                    f"{info['available_seats']:<10} | {info['total_capacity']:<10}")
             
-            print("="*75)
+            print("="*83)
             return seats_data
             
         except Exception as e:
@@ -882,30 +1074,54 @@ class Theatre:
             return []
 
     def _print_seats_info(self, seats_info):
-        print("\n" + "="*75)
-        print("AVAILABLE SEATS".center(75))
-        print("="*75)
-        print(f"{'Screen':<8} | {'Movie':<25} | {'Time':<8} | {'Available':<10} | {'Capacity':<10}")
-        print("-"*75)
+        print("\n" + "="*83)
+        print("AVAILABLE SEATS".center(83))
+        print("="*83)
+        print(f"{'Screen':<8} | {'Movie':<25} | {'Show':<16} | {'Available':<10} | {'Capacity':<10}")
+        print("-"*83)
         
         for info in seats_info:
             print(f"{info['screen_id']:<8} | {info['movie_name'][:24]:<25} | "
-                f"{info['show_time']:<8} | {info['available_seats']:<10} | "
+                f"{info['show_time']:<16} | {info['available_seats']:<10} | "
                 f"{info['total_capacity']:<10}")
         
-        print("="*75)
+        print("="*83)
         
 
 
+    def _select_show_date(self):
+        """Ask for a day in the selling window; None if cancelled"""
+        dates = selling_dates()
+        print("\nShow Dates:\n")
+        for i, show_date in enumerate(dates, 1):
+            label = "Today" if i == 1 else show_date.strftime('%A')
+            print(f"  {i:>2}. {show_date.strftime('%d-%m-%Y')} ({label})")
+
+        while True:
+            user_input = input(f"Select date (1-{len(dates)}, or '0' to cancel): ").strip()
+            if user_input == '0':
+                print("\nDate selection cancelled.")
+                return None
+            if user_input.isdigit() and 1 <= int(user_input) <= len(dates):
+                return dates[int(user_input) - 1]
+            print(f"\nError: Please select between 1 and {len(dates)}")
+
     def get_movie_timing(self, screen_id):
         if screen_id not in self.hall_data:
             return None
-            
-        timings = list(self.hall_data[screen_id]['seating'].keys())
+
+        show_date = self._select_show_date()
+        if show_date is None:
+            return None
+
+        now = datetime.now()
+        after = now.hour * 60 + now.minute if show_date == now.date() else None
+        timings = self.schedule.shows_on(screen_id, show_date, after)
 
         if not timings:
-            print("No show timings available for this screen")
+            print("No more shows on this screen for that date")
             return None
+        self.load_date(show_date)
         
         while True:
             try:
@@ -954,9 +1170,10 @@ class Theatre:
 
     def view_history(self):
         try:
-            user_file = f'csvs/bookings/{self.login.current_user}_bookings.csv'
+            self.login.booking_log.sync()
+            rows = self.login.storage.user_bookings(self.login.current_user, archived=True)
             
-            if not os.path.exists(user_file):
+            if not rows:
                 print("\nNo booking history found.")
                 return
                 
@@ -964,28 +1181,22 @@ class Theatre:
             print(f"BOOKING HISTORY FOR: {self.login.current_user}".center(120))
             print("="*120)
             
-            with open(user_file, 'r') as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    print("\nNo valid booking records found.")
-                    return
+            print(f"\n{'Booking ID':<12} | {'Date':<12} | {'Movie':<25} | {'Screen':<8} | {'Time':<8} | "
+                f"{'Seats':<20} | {'Price':<10} | {'Status':<12} | {'Cancelled On':<12}")
+            print("-"*120)
+            
+            for row in rows:
+                try:
+                    seats = ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']]
+                    seats_display = ', '.join(seats) if isinstance(seats, list) else row['Seat_Numbers']
                     
-                print(f"\n{'Booking ID':<12} | {'Date':<12} | {'Movie':<25} | {'Screen':<8} | {'Time':<8} | "
-                    f"{'Seats':<20} | {'Price':<10} | {'Status':<12} | {'Cancelled On':<12}")
-                print("-"*120)
-                
-                for row in reader:
-                    try:
-                        seats = ast.literal_eval(row['Seat_Numbers']) if row['Seat_Numbers'].startswith('[') else [row['Seat_Numbers']]
-                        seats_display = ', '.join(seats) if isinstance(seats, list) else row['Seat_Numbers']
-                        
-                        print(f"{row['BookingID'][:12]:<12} | {row['Date']:<12} | {row['Movie_Name'][:24]:<25} | "
-                            f"{row['ScreenID']:<8} | {row['Show_Timing']:<8} | {seats_display[:19]:<20} | "
-                            f"₹{float(row['Total_Price']):<9.2f} | {row['Ticket_Status'].capitalize():<12} | "
-                            f"{row.get('Cancellation_Date', '-'):<12}")
-                    except Exception as e:
-                        print(f"\nError processing record: {str(e)}")
-                        continue
+                    print(f"{row['BookingID'][:12]:<12} | {row['Date']:<12} | {row['Movie_Name'][:24]:<25} | "
+                        f"{row['ScreenID']:<8} | {row['Show_Timing']:<8} | {seats_display[:19]:<20} | "
+                        f"₹{float(row['Total_Price']):<9.2f} | {row['Ticket_Status'].capitalize():<12} | "
+                        f"{row.get('Cancellation_Date', '-'):<12}")
+                except Exception as e:
+                    print(f"\nError processing record: {str(e)}")
+                    continue
                         
             print("="*120)
             
@@ -1107,6 +1318,7 @@ class Theatre:
             elif choice == '9':  
                 self.view_ticket_details() 
             elif choice == '10':
+                self.checkpoint()
                 print("Exiting the system. Thank you!")
                 return
             else:
@@ -0,0 +1,124 @@
+from utils.locks import file_lock
+
+DEFAULT_BALANCE = 1000
+
+
+class WalletLedger:
+    """In-memory wallet balances backed by the append-only wallet history.
+
+    The wallet history is the ledger: every transaction row carries the
+    balance it produced, computed here from the signed amount when the row
+    is recorded, so a balance another process logged from a stale view
+    cannot overwrite changes made in between. The balance table (user_wallets.csv or the wallets
+    table) is only a snapshot, written every snapshot_interval transactions
+    together with the ledger position it covers. On startup the snapshot is
+    loaded and the ledger tail after that position is replayed on top of it.
+    """
+
+    def __init__(self, storage, snapshot_interval=100):
+        self.storage = storage
+        self.snapshot_interval = snapshot_interval
+        self._unsnapshotted = 0
+
+        self.balances, self.position = self.storage.load_wallet_snapshot()
+        if self.position is None:
+            self._mark_snapshot()
+        else:
+            self.refresh()
+        self.version = self.storage.wallet_version()
+
+    def _mark_snapshot(self):
+        """Adopt a snapshot written before the ledger existed and record the ledger position it covers.
+
+        Such snapshots were kept in step with the wallet history, so they
+        cover the whole ledger as it is now. The position is saved straight
+        away, under the lock sync() appends to the ledger with, so the next
+        start replays whatever is appended from here on instead of
+        adopting the old snapshot again.
+        """
+        with file_lock('booking_log'):
+            self.balances, self.position = self.storage.load_wallet_snapshot()
+            if self.position is not None:
+                self.refresh()
+                return
+            self.position = self.storage.wallet_history_position()
+            self.snapshot()
+
+    def _apply(self, transaction):
+        username = transaction.get('Username')
+        if not username:
+            return
+        try:
+            self.balances[username] = float(transaction['Balance'])
+        except (ValueError, KeyError, TypeError):
+            try:
+                self.balances[username] = self.balances.get(username, DEFAULT_BALANCE) + float(transaction['Amount'])
+            except (ValueError, KeyError, TypeError):
+                pass
+
+    def refresh(self):
+        """Replay ledger entries written since the last known position"""
+        rows, self.position = self.storage.wallet_history_since(self.position)
+        for row in rows:
+            self._apply(row)
+        self._unsnapshotted += len(rows)
+        return len(rows)
+
+    def refresh_if_changed(self):
+        """Pick up ledger writes made by another process; returns True if there were any"""
+        version = self.storage.wallet_version()
+        if version == self.version:
+            return False
+        self.refresh()
+        self.version = self.storage.wallet_version()
+        return True
+
+    def balance(self, username):
+        return self.balances.get(username)
+
+    def record(self, transactions):
+        """Append transactions to the ledger and apply them to the balance table.
+
+        Each transaction's Balance is set from its Amount and the balance
+        before it; callers hold the booking log lock, so rows are recorded
+        one process at a time, and call snapshot_if_due() once the rows are
+        safely part of a finished sync.
+        """
+        if not transactions:
+            return
+
+        self.refresh()
+        balances = {}
+        for transaction in transactions:
+            username = transaction.get('Username')
+            try:
+                amount = float(transaction['Amount'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if username:
+                balances[username] = balances.get(username, self.balances.get(username, DEFAULT_BALANCE)) + amount
+                transaction['Balance'] = balances[username]
+
+        self.storage.append_wallet_history(transactions)
+        for transaction in transactions:
+            self._apply(transaction)
+        self.position = self.storage.wallet_history_position()
+        self.version = self.storage.wallet_version()
+        self._unsnapshotted += len(transactions)
+
+    def reload(self):
+        """Rebuild balances from the snapshot and the ledger, after ledger rows were cut off"""
+        self.balances, self.position = self.storage.load_wallet_snapshot()
+        self._unsnapshotted = 0
+        self.refresh()
+        self.version = self.storage.wallet_version()
+
+    def snapshot_if_due(self):
+        """Snapshot once snapshot_interval transactions were recorded since the last one"""
+        if self._unsnapshotted >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write every balance and the ledger position it reflects"""
+        self.storage.save_wallet_snapshot(dict(self.balances), self.position)
+        self._unsnapshotted = 0